@@ -0,0 +1,17 @@
+import hmac
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException
+
+from app.core.settings import Settings, get_settings
+
+
+def require_debug_token(
+    x_debug_token: Optional[str] = Header(default=None),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    # Without a configured token the operator routes do not exist at all.
+    if not settings.debug_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, settings.debug_token):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
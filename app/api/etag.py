@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(tag: str) -> str:
+    return f'W/"{tag}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    if not header:
+        return False
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, tag: str) -> Optional[Response]:
+    """Return a bodyless 304 when the client already holds ``tag``.
+
+    Otherwise set ``response``'s ETag from ``tag`` and return ``None`` so
+    the route builds the full body. Routes read the tag before building
+    the body, so a concurrent write can only make the tag older than the
+    body, which costs the client one extra full response.
+    """
+    etag = make_etag(tag)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
@@ -1,6 +1,18 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, game, health, logs, progress, questions, ranking, users
+from app.api.routes import (
+    auth,
+    debug,
+    export,
+    game,
+    health,
+    logs,
+    progress,
+    questions,
+    ranking,
+    stats,
+    users,
+)
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
@@ -9,5 +21,8 @@ api_router.include_router(questions.router)
 api_router.include_router(game.router)
 api_router.include_router(progress.router)
 api_router.include_router(ranking.router)
+api_router.include_router(stats.router)
 api_router.include_router(logs.router)
+api_router.include_router(export.router)
 api_router.include_router(health.router)
+api_router.include_router(debug.router)
@@ -0,0 +1,70 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.admin import require_debug_token
+from app.models.schemas import (
+    EventPipelineOut,
+    MemoryDiffOut,
+    MemoryReportOut,
+    MemorySnapshotOut,
+    MessageOut,
+)
+from app.services.debug_service import (
+    DEFAULT_SAMPLE_SIZE,
+    MAX_SAMPLE_SIZE,
+    DebugService,
+    get_debug_service,
+)
+
+
+router = APIRouter(
+    prefix="/debug", tags=["debug"], dependencies=[Depends(require_debug_token)]
+)
+
+
+@router.get("/memory", response_model=MemoryReportOut)
+def memory_report(
+    sample_size: int = Query(default=DEFAULT_SAMPLE_SIZE, ge=1, le=MAX_SAMPLE_SIZE),
+    service: DebugService = Depends(get_debug_service),
+) -> MemoryReportOut:
+    return service.memory_report(sample_size)
+
+
+@router.post("/memory/snapshots", response_model=MemorySnapshotOut)
+def take_snapshot(
+    service: DebugService = Depends(get_debug_service),
+) -> MemorySnapshotOut:
+    return service.take_snapshot()
+
+
+@router.get("/memory/snapshots", response_model=List[MemorySnapshotOut])
+def list_snapshots(
+    service: DebugService = Depends(get_debug_service),
+) -> List[MemorySnapshotOut]:
+    return service.list_snapshots()
+
+
+@router.get("/memory/snapshots/diff", response_model=MemoryDiffOut)
+def diff_snapshots(
+    base: int,
+    target: Optional[int] = None,
+    limit: int = Query(default=25, ge=1, le=500),
+    service: DebugService = Depends(get_debug_service),
+) -> MemoryDiffOut:
+    return service.diff_snapshots(base, target, limit)
+
+
+@router.delete("/memory/snapshots", response_model=MessageOut)
+def clear_snapshots(
+    service: DebugService = Depends(get_debug_service),
+) -> MessageOut:
+    service.clear_snapshots()
+    return MessageOut(detail="Snapshots cleared and allocation tracing stopped")
+
+
+@router.get("/events", response_model=EventPipelineOut)
+def event_metrics(
+    service: DebugService = Depends(get_debug_service),
+) -> EventPipelineOut:
+    return service.event_metrics()
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api.admin import require_debug_token
+from app.services.export_service import ExportService, get_export_service
+
+# Exports include every player's email, so they are operator-only.
+router = APIRouter(
+    prefix="/export", tags=["export"], dependencies=[Depends(require_debug_token)]
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.get("/ranking")
+def export_ranking(
+    since: Optional[datetime] = None,
+    service: ExportService = Depends(get_export_service),
+) -> StreamingResponse:
+    return StreamingResponse(service.ranking(since), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/profiles")
+def export_profiles(
+    since: Optional[datetime] = None,
+    service: ExportService = Depends(get_export_service),
+) -> StreamingResponse:
+    return StreamingResponse(service.profiles(since), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/logs")
+def export_logs(
+    since: Optional[datetime] = None,
+    kind: Optional[Literal["error", "game-session"]] = None,
+    service: ExportService = Depends(get_export_service),
+) -> StreamingResponse:
+    return StreamingResponse(service.logs(since, kind), media_type=NDJSON_MEDIA_TYPE)
@@ -1,6 +1,16 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from app.models.schemas import ErrorLogIn, GameSessionLogIn, MessageOut
+from fastapi import APIRouter, Depends, Query
+
+from app.api.admin import require_debug_token
+from app.models.schemas import (
+    ErrorGroupOut,
+    ErrorLogIn,
+    GameSessionLogIn,
+    LogQueryOut,
+    MessageOut,
+)
 from app.services.log_service import LogService, get_log_service
 
 router = APIRouter(prefix="/logs", tags=["logs"])
@@ -20,3 +30,34 @@ def log_game_session(
     service: LogService = Depends(get_log_service),
 ) -> MessageOut:
     return service.log_game_session(payload)
+
+
+# Clients post logs freely; reading them back is operator-only because
+# entries and error samples carry user ids, session payloads and context.
+@router.get(
+    "/query", response_model=LogQueryOut, dependencies=[Depends(require_debug_token)]
+)
+def query_logs(
+    kind: Literal["error", "game-session"] = "game-session",
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    service: LogService = Depends(get_log_service),
+) -> LogQueryOut:
+    return service.query(kind, user_id, session_id, since, until, cursor, limit)
+
+
+@router.get(
+    "/errors/top",
+    response_model=List[ErrorGroupOut],
+    dependencies=[Depends(require_debug_token)],
+)
+def top_errors(
+    limit: int = Query(default=20, ge=1, le=500),
+    sort: Literal["count", "last_seen"] = "count",
+    service: LogService = Depends(get_log_service),
+) -> List[ErrorGroupOut]:
+    return service.top_errors(limit, sort)
@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends
+from typing import Literal, Union
 
-from app.models.schemas import ProgressOut, ProgressUpdateIn
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.api.etag import not_modified
+from app.models.schemas import ProgressDeltaOut, ProgressOut, ProgressUpdateIn
 from app.services.progress_service import ProgressService, get_progress_service
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 
 
-@router.post("/update", response_model=ProgressOut)
+@router.post("/update", response_model=Union[ProgressOut, ProgressDeltaOut])
 def update_progress(
     payload: ProgressUpdateIn,
+    view: Literal["full", "delta"] = "full",
     service: ProgressService = Depends(get_progress_service),
-) -> ProgressOut:
-    return service.update(payload.user_id, payload.xp_delta, payload.progress)
+) -> Union[ProgressOut, ProgressDeltaOut]:
+    return service.update(
+        payload.user_id, payload.xp_delta, payload.progress, delta=view == "delta"
+    )
 
 
 @router.get("/{user_id}", response_model=ProgressOut)
 def get_progress(
     user_id: str,
+    request: Request,
+    response: Response,
     service: ProgressService = Depends(get_progress_service),
-) -> ProgressOut:
+) -> Union[ProgressOut, Response]:
+    cached = not_modified(request, response, service.get_tag(user_id))
+    if cached is not None:
+        return cached
     return service.get(user_id)
@@ -1,8 +1,9 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
-from app.models.schemas import QuestionOut
+from app.api.serialization import json_records
+from app.models.schemas import QuestionOut, QuestionRow
 from app.services.question_service import QuestionService, get_question_service
 
 router = APIRouter(prefix="/questions", tags=["questions"])
@@ -12,13 +13,13 @@ router = APIRouter(prefix="/questions", tags=["questions"])
 def list_questions(
     level: int = Query(..., ge=1),
     service: QuestionService = Depends(get_question_service),
-) -> List[QuestionOut]:
-    return service.list_by_level(level)
+) -> Response:
+    return json_records(List[QuestionRow], service.list_by_level(level))
 
 
 @router.get("/{question_id}", response_model=QuestionOut)
 def get_question(
     question_id: str,
     service: QuestionService = Depends(get_question_service),
-) -> QuestionOut:
-    return service.get_question(question_id)
+) -> Response:
+    return json_records(QuestionRow, service.get_question(question_id))
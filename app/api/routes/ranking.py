@@ -1,9 +1,22 @@
-from typing import List, Optional
+import asyncio
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, Response, WebSocket
+from fastapi.responses import StreamingResponse
 
-from app.models.schemas import RankingEntryOut, RankingUpdateIn
+from app.api.serialization import json_records
+from app.models.schemas import (
+    RankingBatchOut,
+    RankingBatchUpdateIn,
+    RankingEntryOut,
+    RankingEntryRow,
+    RankingUpdateIn,
+)
 from app.services.auth_service import AuthService, get_auth_service
+from app.services.leaderboard_service import (
+    LeaderboardBroadcaster,
+    get_leaderboard_broadcaster,
+)
 from app.services.ranking_service import RankingService, get_ranking_service
 
 router = APIRouter(prefix="/ranking", tags=["ranking"])
@@ -17,11 +30,19 @@ def update_ranking(
     return service.update(payload.user_id, payload.xp, payload.level, payload.display_name)
 
 
+@router.post("/update-batch", response_model=RankingBatchOut)
+def update_ranking_batch(
+    payload: RankingBatchUpdateIn,
+    service: RankingService = Depends(get_ranking_service),
+) -> RankingBatchOut:
+    return service.update_batch(payload.updates, payload.include_positions)
+
+
 @router.get("/global", response_model=List[RankingEntryOut])
 def get_global(
     service: RankingService = Depends(get_ranking_service),
-) -> List[RankingEntryOut]:
-    return service.global_ranking()
+) -> Response:
+    return json_records(List[RankingEntryRow], service.global_ranking())
 
 
 @router.get("/me", response_model=RankingEntryOut)
@@ -32,3 +53,56 @@ def get_me(
 ) -> RankingEntryOut:
     email = auth_service.get_authenticated_email(authorization)
     return service.get_me(email)
+
+
+@router.get("/stream")
+async def stream_ranking(
+    broadcaster: LeaderboardBroadcaster = Depends(get_leaderboard_broadcaster),
+) -> StreamingResponse:
+    async def events() -> AsyncIterator[str]:
+        subscription = broadcaster.subscribe()
+        try:
+            async for message in broadcaster.messages(subscription):
+                if message is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"data: {message}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.websocket("/ws")
+async def ranking_socket(
+    websocket: WebSocket,
+    broadcaster: LeaderboardBroadcaster = Depends(get_leaderboard_broadcaster),
+) -> None:
+    await websocket.accept()
+    subscription = broadcaster.subscribe()
+
+    async def send() -> None:
+        async for message in broadcaster.messages(subscription):
+            if message is not None:
+                await websocket.send_text(message)
+
+    async def receive() -> None:
+        # Incoming frames are ignored; reading only detects the disconnect.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.ensure_future(send())
+    receiver = asyncio.ensure_future(receive())
+    try:
+        # Whichever side stops first ends the connection, so a failed send
+        # does not leave the socket open with nothing writing to it.
+        done, _ = await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+        if receiver not in done:
+            sender.result()
+    finally:
+        for task in (sender, receiver):
+            task.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        broadcaster.unsubscribe(subscription)
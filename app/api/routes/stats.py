@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models.schemas import GlobalStatsOut
+from app.services.stats_service import StatsService, get_stats_service
+from app.storage.stats import HOURLY_RETENTION
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/global", response_model=GlobalStatsOut)
+def get_global_stats(
+    hours: int = Query(default=24, ge=1, le=HOURLY_RETENTION),
+    service: StatsService = Depends(get_stats_service),
+) -> GlobalStatsOut:
+    return service.global_stats(hours)
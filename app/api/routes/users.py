@@ -1,11 +1,52 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional, Union
 
-from app.models.schemas import ProfileOut, UserCreateIn, UserStatsOut, UserUpdateIn
+from fastapi import APIRouter, Depends, Query, Request, Response
+
+from app.api.etag import not_modified
+from app.api.serialization import json_records
+from app.models.schemas import (
+    GameHistoryOut,
+    PlayerSearchResultOut,
+    ProfileBatchOut,
+    ProfileOut,
+    ProfileRow,
+    UserBatchGetIn,
+    UserBatchUpdateIn,
+    UserCreateIn,
+    UserStatsOut,
+    UserUpdateIn,
+)
+from app.services.search_service import SearchService, get_search_service
 from app.services.user_service import UserService, get_user_service
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+@router.post("/batch-get", response_model=ProfileBatchOut)
+def batch_get_users(
+    payload: UserBatchGetIn,
+    service: UserService = Depends(get_user_service),
+) -> ProfileBatchOut:
+    return service.batch_get(payload.user_ids)
+
+
+@router.patch("/batch", response_model=ProfileBatchOut)
+def batch_update_users(
+    payload: UserBatchUpdateIn,
+    service: UserService = Depends(get_user_service),
+) -> ProfileBatchOut:
+    return service.batch_update(payload.updates)
+
+
+@router.get("/search", response_model=List[PlayerSearchResultOut])
+def search_users(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    service: SearchService = Depends(get_search_service),
+) -> List[PlayerSearchResultOut]:
+    return service.search(q, limit)
+
+
 @router.post("/{user_id}", response_model=ProfileOut)
 def create_user(
     user_id: str,
@@ -18,9 +59,14 @@ def create_user(
 @router.get("/{user_id}", response_model=ProfileOut)
 def get_user(
     user_id: str,
+    request: Request,
+    response: Response,
     service: UserService = Depends(get_user_service),
-) -> ProfileOut:
-    return service.get_profile(user_id)
+) -> Union[ProfileOut, Response]:
+    cached = not_modified(request, response, service.get_tag(user_id))
+    if cached is not None:
+        return cached
+    return json_records(ProfileRow, service.get_profile(user_id), response.headers)
 
 
 @router.patch("/{user_id}", response_model=ProfileOut)
@@ -35,6 +81,21 @@ def update_user(
 @router.get("/{user_id}/stats", response_model=UserStatsOut)
 def get_user_stats(
     user_id: str,
+    request: Request,
+    response: Response,
     service: UserService = Depends(get_user_service),
-) -> UserStatsOut:
+) -> Union[UserStatsOut, Response]:
+    cached = not_modified(request, response, service.get_tag(user_id))
+    if cached is not None:
+        return cached
     return service.get_stats(user_id)
+
+
+@router.get("/{user_id}/games", response_model=GameHistoryOut)
+def get_user_games(
+    user_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    service: UserService = Depends(get_user_service),
+) -> GameHistoryOut:
+    return service.get_games(user_id, cursor, limit)
@@ -0,0 +1,33 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+_SKIPPED_HEADERS = frozenset({"content-length", "content-type"})
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def json_records(
+    schema: Any, records: Any, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """Validate ``records`` once against ``schema`` and render them as JSON.
+
+    Routes keep their ``response_model`` for the OpenAPI schema, but a
+    returned ``Response`` bypasses FastAPI's second validation and copy of
+    the payload. ``headers`` are copied from a dependency-injected response
+    so values such as ``ETag`` survive.
+    """
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(records))
+    response = Response(body, media_type=JSON_MEDIA_TYPE)
+    if headers:
+        for key, value in headers.items():
+            if key.lower() not in _SKIPPED_HEADERS:
+                response.headers[key] = value
+    return response
@@ -0,0 +1,220 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+DEDUPE_WINDOW = 65_536
+MAX_ATTEMPTS = 3
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class Event:
+    __slots__ = ("seq", "kind", "key", "payload", "published_at")
+
+    def __init__(
+        self, seq: int, kind: str, key: str, payload: Dict[str, Any], published_at: float
+    ) -> None:
+        self.seq = seq
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.published_at = published_at
+
+
+class ConsumerStats:
+    __slots__ = ("kind", "name", "processed", "skipped", "failed", "last_error")
+
+    def __init__(self, kind: str, name: str) -> None:
+        self.kind = kind
+        self.name = name
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+
+    def copy(self) -> "ConsumerStats":
+        clone = ConsumerStats(self.kind, self.name)
+        clone.processed = self.processed
+        clone.skipped = self.skipped
+        clone.failed = self.failed
+        clone.last_error = self.last_error
+        return clone
+
+
+class PipelineMetrics:
+    __slots__ = (
+        "capacity",
+        "pending",
+        "published",
+        "processed",
+        "blocked_publishes",
+        "lag_seconds",
+        "last_lag_seconds",
+        "max_lag_seconds",
+        "consumers",
+    )
+
+    def __init__(
+        self,
+        capacity: int,
+        pending: int,
+        published: int,
+        processed: int,
+        blocked_publishes: int,
+        lag_seconds: float,
+        last_lag_seconds: float,
+        max_lag_seconds: float,
+        consumers: List[ConsumerStats],
+    ) -> None:
+        self.capacity = capacity
+        self.pending = pending
+        self.published = published
+        self.processed = processed
+        self.blocked_publishes = blocked_publishes
+        self.lag_seconds = lag_seconds
+        self.last_lag_seconds = last_lag_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.consumers = consumers
+
+
+class _Consumer:
+    __slots__ = ("name", "handler", "stats", "applied")
+
+    def __init__(self, kind: str, name: str, handler: Handler) -> None:
+        self.name = name
+        self.handler = handler
+        self.stats = ConsumerStats(kind, name)
+        self.applied: "OrderedDict[str, None]" = OrderedDict()
+
+
+class EventPipeline:
+    """In-process event queue drained by one worker thread.
+
+    Events are delivered in publish order, and every consumer of a kind
+    sees them in that order. ``publish`` blocks while the queue is full,
+    which pushes back on producers instead of growing memory. Consumers
+    are idempotent per event key: a key applied within the last
+    ``DEDUPE_WINDOW`` events is skipped, so a re-published event is not
+    counted twice. A consumer that raises is retried up to
+    ``MAX_ATTEMPTS`` times, then counted as failed.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = max(1, capacity)
+        self._queue: "queue.Queue[Optional[Event]]" = queue.Queue(self._capacity)
+        self._consumers: Dict[str, List[_Consumer]] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._seq = 0
+        self._processed = 0
+        self._blocked_publishes = 0
+        self._current: Optional[Event] = None
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    def subscribe(self, kind: str, name: str, handler: Handler) -> None:
+        """Register ``handler`` for ``kind``; a consumer with the same name is replaced."""
+        with self._lock:
+            consumers = self._consumers.setdefault(kind, [])
+            for consumer in consumers:
+                if consumer.name == name:
+                    consumer.handler = handler
+                    return
+            consumers.append(_Consumer(kind, name, handler))
+
+    def publish(self, kind: str, key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._seq += 1
+            event = Event(self._seq, kind, key, payload, time.monotonic())
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="event-pipeline", daemon=True
+                )
+                self._worker.start()
+        if self._queue.full():
+            with self._lock:
+                self._blocked_publishes += 1
+        self._queue.put(event)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every published event is processed; ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Process what is queued, then stop the worker."""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def metrics(self) -> PipelineMetrics:
+        now = time.monotonic()
+        with self._lock:
+            current = self._current
+            return PipelineMetrics(
+                capacity=self._capacity,
+                pending=self._queue.qsize(),
+                published=self._seq,
+                processed=self._processed,
+                blocked_publishes=self._blocked_publishes,
+                lag_seconds=now - current.published_at if current is not None else 0.0,
+                last_lag_seconds=self._last_lag,
+                max_lag_seconds=self._max_lag,
+                consumers=[
+                    consumer.stats.copy()
+                    for consumers in self._consumers.values()
+                    for consumer in consumers
+                ],
+            )
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self._process(event)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, event: Event) -> None:
+        with self._lock:
+            self._current = event
+            lag = time.monotonic() - event.published_at
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            consumers = list(self._consumers.get(event.kind, ()))
+        for consumer in consumers:
+            self._deliver(consumer, event)
+        with self._lock:
+            self._current = None
+            self._processed += 1
+
+    def _deliver(self, consumer: _Consumer, event: Event) -> None:
+        if event.key in consumer.applied:
+            consumer.stats.skipped += 1
+            return
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                consumer.handler(event.payload)
+                break
+            except Exception as error:
+                if attempt == MAX_ATTEMPTS:
+                    consumer.stats.failed += 1
+                    consumer.stats.last_error = f"{event.key}: {error!r}"
+                    return
+        consumer.stats.processed += 1
+        consumer.applied[event.key] = None
+        if len(consumer.applied) > DEDUPE_WINDOW:
+            consumer.applied.popitem(last=False)
@@ -0,0 +1,39 @@
+import hashlib
+import re
+from typing import Optional
+
+_UUID = re.compile(
+    r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+)
+_HEX = re.compile(r"\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{16,}\b")
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_LOCATION = re.compile(r":\d+(?::\d+)?(?=\)|\s|$)")
+_QUERY = re.compile(r"\?[^\s):]*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    message = _UUID.sub("<uuid>", message)
+    message = _HEX.sub("<hex>", message)
+    message = _QUOTED.sub("<str>", message)
+    message = _NUMBER.sub("<n>", message)
+    return _WHITESPACE.sub(" ", message).strip()
+
+
+def normalize_stack(stack: Optional[str]) -> str:
+    if not stack:
+        return ""
+    frames = []
+    for line in stack.splitlines():
+        line = _LOCATION.sub("", line)
+        line = _QUERY.sub("", line)
+        line = normalize_message(line)
+        if line:
+            frames.append(line)
+    return "\n".join(frames)
+
+
+def fingerprint_error(message: str, stack: Optional[str]) -> str:
+    normalized = normalize_message(message) + "\n" + normalize_stack(stack)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
@@ -0,0 +1,248 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from app.core.security import decode_b64url
+from app.core.settings import Settings
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# DER prefix of the DigestInfo structure for SHA-256 (RFC 8017, section 9.2).
+_SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+KeysetFetcher = Callable[[], Dict[str, Any]]
+
+
+class InvalidIdToken(Exception):
+    pass
+
+
+class KeysetUnavailable(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class RsaPublicKey:
+    n: int
+    e: int
+
+    def verify_sha256(self, message: bytes, signature: bytes) -> bool:
+        size = (self.n.bit_length() + 7) // 8
+        if len(signature) != size:
+            return False
+        value = int.from_bytes(signature, "big")
+        if value >= self.n:
+            return False
+        decoded = pow(value, self.e, self.n).to_bytes(size, "big")
+        suffix = _SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+        padding = size - len(suffix) - 3
+        if padding < 8:
+            return False
+        expected = b"\x00\x01" + b"\xff" * padding + b"\x00" + suffix
+        return hmac.compare_digest(decoded, expected)
+
+
+def parse_jwks(document: Dict[str, Any]) -> Dict[str, RsaPublicKey]:
+    keys = {}
+    for jwk in document.get("keys", []):
+        if jwk.get("kty") != "RSA" or "kid" not in jwk:
+            continue
+        keys[jwk["kid"]] = RsaPublicKey(
+            n=int.from_bytes(decode_b64url(jwk["n"]), "big"),
+            e=int.from_bytes(decode_b64url(jwk["e"]), "big"),
+        )
+    return keys
+
+
+def file_fetcher(path: str) -> KeysetFetcher:
+    def fetch() -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    return fetch
+
+
+def url_fetcher(url: str, timeout: float = 5.0) -> KeysetFetcher:
+    def fetch() -> Dict[str, Any]:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read())
+
+    return fetch
+
+
+class CachedKeyset:
+    """JWKS cache that serves the current keys while refreshing in the background.
+
+    The first lookup loads synchronously. Afterwards a stale keyset triggers a
+    single background refresh, and an unknown ``kid`` (key rotation) forces a
+    synchronous reload. Every fetch attempt, successful or not, starts a
+    ``min_reload_seconds`` window in which lookups do not fetch again, so
+    tokens with junk ``kid`` values or an unreachable JWKS endpoint cannot
+    make each request wait on the network. Only a missing keyset raises
+    ``KeysetUnavailable``; once keys are held, an unknown ``kid`` whose
+    reload fails is reported as unknown.
+    """
+
+    def __init__(
+        self,
+        fetcher: KeysetFetcher,
+        refresh_seconds: float = 3600.0,
+        min_reload_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._fetcher = fetcher
+        self._refresh_seconds = refresh_seconds
+        self._min_reload_seconds = min_reload_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys: Optional[Dict[str, RsaPublicKey]] = None
+        self._loaded_at = 0.0
+        self._attempted_at = float("-inf")
+        self._refreshing = False
+
+    def get(self, kid: str) -> Optional[RsaPublicKey]:
+        if self._keys is None:
+            if not self._claim_attempt():
+                raise KeysetUnavailable("Keyset fetch failed recently")
+            self._load()
+        elif self._clock() - self._loaded_at >= self._refresh_seconds and self._claim_attempt():
+            self._refresh_in_background()
+        keys = self._keys
+        key = keys.get(kid) if keys is not None else None
+        if key is None and self._claim_attempt():
+            try:
+                self._load()
+            except KeysetUnavailable:
+                # The keys already held still stand; a kid missing from
+                # them is the token's fault, not an outage.
+                return None
+            key = self._keys.get(kid) if self._keys is not None else None
+        return key
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._attempted_at = self._clock()
+        self._load()
+
+    def _claim_attempt(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            if now - self._attempted_at < self._min_reload_seconds:
+                return False
+            self._attempted_at = now
+            return True
+
+    def _load(self) -> None:
+        try:
+            keys = parse_jwks(self._fetcher())
+        except Exception as exc:
+            raise KeysetUnavailable(str(exc)) from exc
+        with self._lock:
+            self._keys = keys
+            self._loaded_at = self._clock()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._load()
+        except Exception:
+            # Keep serving the previous keys; retried once the window passes.
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class GoogleIdTokenVerifier:
+    def __init__(
+        self,
+        keyset: CachedKeyset,
+        audiences: Sequence[str],
+        cache_size: int = 4096,
+        leeway_seconds: int = 60,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._keyset = keyset
+        self._audiences = frozenset(audiences)
+        self._cache_size = cache_size
+        self._leeway_seconds = leeway_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._verified: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+    def verify(self, id_token: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(id_token.encode("utf-8")).digest()
+        now = self._clock()
+        with self._lock:
+            claims = self._verified.get(digest)
+            if claims is not None:
+                if claims["exp"] + self._leeway_seconds > now:
+                    self._verified.move_to_end(digest)
+                    return claims
+                del self._verified[digest]
+        claims = self._verify_signature_and_claims(id_token, now)
+        with self._lock:
+            self._verified[digest] = claims
+            while len(self._verified) > self._cache_size:
+                self._verified.popitem(last=False)
+        return claims
+
+    def _verify_signature_and_claims(self, id_token: str, now: float) -> Dict[str, Any]:
+        parts = id_token.split(".")
+        if len(parts) != 3:
+            raise InvalidIdToken("Malformed token")
+        try:
+            header = json.loads(decode_b64url(parts[0]))
+            claims = json.loads(decode_b64url(parts[1]))
+            signature = decode_b64url(parts[2])
+        except (TypeError, ValueError):
+            raise InvalidIdToken("Malformed token")
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidIdToken("Malformed token")
+        if header.get("alg") != "RS256":
+            raise InvalidIdToken("Unsupported algorithm")
+        key = self._keyset.get(str(header.get("kid")))
+        if key is None:
+            raise InvalidIdToken("Unknown signing key")
+        signed = (parts[0] + "." + parts[1]).encode("ascii")
+        if not key.verify_sha256(signed, signature):
+            raise InvalidIdToken("Invalid signature")
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise InvalidIdToken("Invalid issuer")
+        audience = claims.get("aud")
+        audiences = audience if isinstance(audience, list) else [audience]
+        if not self._audiences.intersection(audiences):
+            raise InvalidIdToken("Invalid audience")
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at + self._leeway_seconds <= now:
+            raise InvalidIdToken("Token expired")
+        if not claims.get("email") or claims.get("email_verified") is False:
+            raise InvalidIdToken("Email not verified")
+        return claims
+
+
+def build_google_verifier(settings: Settings) -> Optional[GoogleIdTokenVerifier]:
+    if not settings.google_client_ids:
+        return None
+    if settings.google_jwks_path:
+        fetcher = file_fetcher(settings.google_jwks_path)
+    else:
+        fetcher = url_fetcher(settings.google_jwks_url)
+    keyset = CachedKeyset(fetcher, refresh_seconds=settings.google_jwks_refresh_seconds)
+    return GoogleIdTokenVerifier(
+        keyset,
+        settings.google_client_ids,
+        cache_size=settings.google_token_cache_size,
+    )
@@ -0,0 +1,179 @@
+import ast
+import operator
+import re
+from fractions import Fraction
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Type, Union
+
+Number = Union[int, Fraction]
+
+MAX_FORMULA_LENGTH = 256
+MAX_FORMULA_NODES = 64
+MAX_EXPONENT = 64
+MAX_VALUE_BITS = 4096
+MAX_ANSWER_LENGTH = 64
+
+# Integer, decimal (either separator) or simple fraction, e.g. "05", "-5.0",
+# "2,5" or "10/2". No exponents: "1e999999" must not cost a bignum.
+_NUMBER = re.compile(r"([+-]?)(\d+)(?:[.,](\d+))?(?:/(\d+))?")
+
+
+class FormulaError(ValueError):
+    pass
+
+
+def _power(base: Number, exponent: Number) -> Number:
+    if not isinstance(exponent, int) and exponent.denominator != 1:
+        raise FormulaError("Exponents must be integers")
+    if abs(exponent) > MAX_EXPONENT:
+        raise FormulaError("Exponent is too large")
+    return Fraction(base) ** int(exponent)
+
+
+def _divide(left: Number, right: Number) -> Number:
+    if right == 0:
+        raise FormulaError("Division by zero")
+    return Fraction(left) / right
+
+
+_BINARY: Dict[Type[ast.operator], Callable[[Number, Number], Number]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _divide,
+    ast.Pow: _power,
+}
+_UNARY: Dict[Type[ast.unaryop], Callable[[Number], Number]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _bounded(value: Number) -> Number:
+    # Nested powers can otherwise build numbers with billions of digits.
+    if isinstance(value, int):
+        bits = value.bit_length()
+    else:
+        bits = max(value.numerator.bit_length(), value.denominator.bit_length())
+    if bits > MAX_VALUE_BITS:
+        raise FormulaError("Formula value is too large")
+    return value
+
+
+def _evaluate(node: ast.AST) -> Number:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise FormulaError("Only numeric literals are allowed")
+        return value if isinstance(value, int) else Fraction(repr(value))
+    if isinstance(node, ast.BinOp):
+        apply = _BINARY.get(type(node.op))
+        if apply is None:
+            raise FormulaError(f"Operator {type(node.op).__name__} is not allowed")
+        return _bounded(apply(_evaluate(node.left), _evaluate(node.right)))
+    if isinstance(node, ast.UnaryOp):
+        apply_unary = _UNARY.get(type(node.op))
+        if apply_unary is None:
+            raise FormulaError(f"Operator {type(node.op).__name__} is not allowed")
+        return apply_unary(_evaluate(node.operand))
+    raise FormulaError(f"{type(node).__name__} is not allowed in formulas")
+
+
+@lru_cache(maxsize=4096)
+def evaluate_formula(formula: str) -> Fraction:
+    """Evaluate an arithmetic formula exactly.
+
+    Only numeric literals, ``+ - * / **`` and unary signs are accepted; the
+    expression is walked as an AST and never passed to ``eval``.
+    """
+    if len(formula) > MAX_FORMULA_LENGTH:
+        raise FormulaError("Formula is too long")
+    try:
+        tree = ast.parse(formula.replace("^", "**"), mode="eval")
+    except SyntaxError as exc:
+        raise FormulaError(f"Invalid formula: {exc.msg}") from exc
+    if sum(1 for _ in ast.walk(tree)) > MAX_FORMULA_NODES:
+        raise FormulaError("Formula is too complex")
+    return Fraction(_evaluate(tree.body))
+
+
+def parse_number(text: str) -> Optional[Fraction]:
+    if len(text) > MAX_ANSWER_LENGTH:
+        return None
+    match = _NUMBER.fullmatch(text)
+    if match is None:
+        return None
+    sign, whole, decimals, denominator = match.groups()
+    if decimals:
+        value = Fraction(int(whole + decimals), 10 ** len(decimals))
+    else:
+        value = Fraction(int(whole))
+    if denominator is not None:
+        if int(denominator) == 0:
+            return None
+        value /= int(denominator)
+    return -value if sign == "-" else value
+
+
+def normalize_answer(answer: str) -> str:
+    return answer.strip().lower()
+
+
+class Grader:
+    """Checks answers against one question's expected value.
+
+    Correct answers usually match the canonical text or are plain integers,
+    so both are decided without building a ``Fraction``.
+    """
+
+    __slots__ = ("text", "value", "integer", "tolerance")
+
+    def __init__(
+        self, text: str, value: Optional[Fraction], tolerance: Optional[Fraction]
+    ) -> None:
+        self.text = text
+        self.value = value
+        self.tolerance = tolerance
+        self.integer: Optional[int] = None
+        if value is not None and value.denominator == 1 and not tolerance:
+            self.integer = value.numerator
+
+    def grade(self, answer: str) -> bool:
+        answer = answer.strip()
+        if answer == self.text:
+            return True
+        if self.value is None:
+            return answer.lower() == self.text
+        if self.integer is not None and answer.isdecimal() and len(answer) <= MAX_ANSWER_LENGTH:
+            return int(answer) == self.integer
+        given = parse_number(answer)
+        if given is None:
+            return False
+        if self.tolerance:
+            return abs(given - self.value) <= self.tolerance
+        return given == self.value
+
+
+@lru_cache(maxsize=4096)
+def compile_grader(
+    answer: str, formula: Optional[str] = None, tolerance: Optional[float] = None
+) -> Grader:
+    """Build the shared grader for an answer, formula and tolerance.
+
+    The formula wins when it evaluates; otherwise the stored answer is
+    parsed as a number, and non-numeric answers fall back to a
+    case-insensitive text match.
+    """
+    text = normalize_answer(answer)
+    value: Optional[Fraction] = None
+    if formula:
+        try:
+            value = evaluate_formula(formula)
+        except FormulaError:
+            value = None
+    if value is None:
+        value = parse_number(text)
+    if value is not None and value.denominator == 1:
+        text = str(value.numerator)
+    allowed = Fraction(repr(float(tolerance))) if tolerance else None
+    return Grader(text, value, allowed)
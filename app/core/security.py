@@ -3,11 +3,29 @@ import hashlib
 import hmac
 import json
 import secrets
+import time
+from dataclasses import dataclass
 from typing import Optional
 
+SIGNED_SESSION_PREFIX = "v1."
 
-def hash_password(password: str, salt: bytes) -> bytes:
-    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 100_000)
+PASSWORD_HASH_ALGORITHM = "pbkdf2_sha256"
+DEFAULT_PASSWORD_ITERATIONS = 100_000
+LEGACY_PASSWORD_ITERATIONS = 100_000
+
+
+@dataclass(frozen=True)
+class PasswordHash:
+    algorithm: str
+    iterations: int
+    salt: bytes
+    digest: bytes
+
+
+def hash_password(
+    password: str, salt: bytes, iterations: int = DEFAULT_PASSWORD_ITERATIONS
+) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
 
 
 def generate_salt() -> bytes:
@@ -25,26 +43,132 @@ def decode_b64(raw: str) -> bytes:
 def verify_password(password: str, salt_b64: str, pw_hash_b64: str) -> bool:
     salt = decode_b64(salt_b64)
     expected = decode_b64(pw_hash_b64)
-    actual = hash_password(password, salt)
+    actual = hash_password(password, salt, LEGACY_PASSWORD_ITERATIONS)
     return hmac.compare_digest(actual, expected)
 
 
+def create_password_hash(password: str, iterations: int = DEFAULT_PASSWORD_ITERATIONS) -> str:
+    salt = generate_salt()
+    digest = hash_password(password, salt, iterations)
+    return "$".join(
+        (PASSWORD_HASH_ALGORITHM, str(iterations), encode_b64(salt), encode_b64(digest))
+    )
+
+
+def parse_password_hash(encoded: str) -> Optional[PasswordHash]:
+    parts = encoded.split("$")
+    if len(parts) != 4 or parts[0] != PASSWORD_HASH_ALGORITHM:
+        return None
+    try:
+        iterations = int(parts[1])
+        salt = decode_b64(parts[2])
+        digest = decode_b64(parts[3])
+    except ValueError:
+        return None
+    if iterations <= 0:
+        return None
+    return PasswordHash(parts[0], iterations, salt, digest)
+
+
+def verify_password_hash(password: str, encoded: str) -> bool:
+    parsed = parse_password_hash(encoded)
+    if parsed is None:
+        return False
+    actual = hash_password(password, parsed.salt, parsed.iterations)
+    return hmac.compare_digest(actual, parsed.digest)
+
+
+def time_password_hash(iterations: int, rounds: int = 3) -> float:
+    salt = generate_salt()
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hash_password("calibration-password", salt, iterations)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def calibrate_password_iterations(
+    target_seconds: float, probe_iterations: int = 20_000, step: int = 1_000
+) -> int:
+    # PBKDF2 cost is linear in the iteration count, so one timed probe is
+    # enough to extrapolate; round down to a readable multiple of `step`.
+    per_iteration = time_password_hash(probe_iterations) / probe_iterations
+    iterations = int(target_seconds / per_iteration) // step * step
+    return max(step, iterations)
+
+
 def create_session_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def create_reset_token() -> str:
-    return secrets.token_urlsafe(24)
+@dataclass(frozen=True)
+class SessionClaims:
+    token_id: str
+    user_id: str
+    email: str
+    provider: str
+    expires_at: int
+
+
+def encode_b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_b64url(raw: str) -> bytes:
+    return base64.urlsafe_b64decode((raw + "=" * (-len(raw) % 4)).encode("ascii"))
+
+
+def _sign(secret: bytes, message: bytes) -> bytes:
+    return hmac.new(secret, message, hashlib.sha256).digest()
+
+
+def is_signed_session_token(token: str) -> bool:
+    return token.startswith(SIGNED_SESSION_PREFIX)
 
 
-def unsafe_decode_email_from_jwt(id_token: str) -> Optional[str]:
+def create_signed_session_token(
+    secret: bytes,
+    user_id: str,
+    email: str,
+    provider: str,
+    ttl_seconds: int,
+    now: Optional[float] = None,
+) -> str:
+    issued_at = int(now if now is not None else time.time())
+    claims = [secrets.token_urlsafe(9), user_id, email, provider, issued_at + ttl_seconds]
+    body = SIGNED_SESSION_PREFIX + encode_b64url(
+        json.dumps(claims, separators=(",", ":")).encode("utf-8")
+    )
+    return body + "." + encode_b64url(_sign(secret, body.encode("ascii")))
+
+
+def verify_signed_session_token(
+    secret: bytes, token: str, now: Optional[float] = None
+) -> Optional[SessionClaims]:
+    body, _, signature = token.rpartition(".")
+    if not body.startswith(SIGNED_SESSION_PREFIX) or not signature:
+        return None
     try:
-        parts = id_token.split(".")
-        if len(parts) != 3:
+        expected = _sign(secret, body.encode("ascii"))
+        if not hmac.compare_digest(expected, decode_b64url(signature)):
             return None
-        payload = parts[1]
-        payload += "=" * (-len(payload) % 4)
-        data = json.loads(base64.urlsafe_b64decode(payload.encode("ascii")))
-        return data.get("email")
-    except Exception:
+        token_id, user_id, email, provider, expires_at = json.loads(
+            decode_b64url(body[len(SIGNED_SESSION_PREFIX) :])
+        )
+    except (TypeError, ValueError):
         return None
+    if expires_at <= (now if now is not None else time.time()):
+        return None
+    return SessionClaims(
+        token_id=token_id,
+        user_id=user_id,
+        email=email,
+        provider=provider,
+        expires_at=expires_at,
+    )
+
+
+def create_reset_token() -> str:
+    return secrets.token_urlsafe(24)
+
@@ -0,0 +1,100 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+SESSION_MODE_OPAQUE = "opaque"
+SESSION_MODE_SIGNED = "signed"
+
+_ENV_PREFIX = "MYTHICMATH_"
+
+
+@dataclass(frozen=True)
+class Settings:
+    session_mode: str = SESSION_MODE_OPAQUE
+    session_secret: str = ""
+    session_ttl_seconds: int = 7 * 24 * 3600
+    google_client_ids: Tuple[str, ...] = ()
+    google_jwks_path: str = ""
+    google_jwks_url: str = "https://www.googleapis.com/oauth2/v3/certs"
+    google_jwks_refresh_seconds: int = 3600
+    google_token_cache_size: int = 4096
+    password_hash_iterations: int = 100_000
+    store_shards: int = 16
+    leaderboard_top_n: int = 100
+    leaderboard_tick_ms: int = 250
+    trace_sample_rate: float = 0.0
+    trace_file: str = ""
+    trace_buffer_size: int = 1000
+    debug_token: str = ""
+    admission_limit: int = 40
+    capture_file: str = ""
+    capture_sample_rate: float = 1.0
+    event_queue_size: int = 10_000
+    game_history_limit: int = 200
+    error_log_retention: int = 100_000
+    max_lessons: int = 10_000
+    change_queue_size: int = 100_000
+
+
+def _env(name: str, default: str) -> str:
+    return os.environ.get(_ENV_PREFIX + name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(_ENV_PREFIX + name)
+    if raw is None or raw == "":
+        return default
+    return int(raw)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(_ENV_PREFIX + name)
+    if raw is None or raw == "":
+        return default
+    return float(raw)
+
+
+def _env_list(name: str) -> Tuple[str, ...]:
+    raw = os.environ.get(_ENV_PREFIX + name, "")
+    return tuple(item.strip() for item in raw.split(",") if item.strip())
+
+
+def load_settings() -> Settings:
+    return Settings(
+        session_mode=_env("SESSION_MODE", SESSION_MODE_OPAQUE).lower(),
+        session_secret=_env("SESSION_SECRET", ""),
+        session_ttl_seconds=_env_int("SESSION_TTL_SECONDS", Settings.session_ttl_seconds),
+        google_client_ids=_env_list("GOOGLE_CLIENT_IDS"),
+        google_jwks_path=_env("GOOGLE_JWKS_PATH", ""),
+        google_jwks_url=_env("GOOGLE_JWKS_URL", Settings.google_jwks_url),
+        google_jwks_refresh_seconds=_env_int(
+            "GOOGLE_JWKS_REFRESH_SECONDS", Settings.google_jwks_refresh_seconds
+        ),
+        google_token_cache_size=_env_int(
+            "GOOGLE_TOKEN_CACHE_SIZE", Settings.google_token_cache_size
+        ),
+        password_hash_iterations=_env_int(
+            "PASSWORD_HASH_ITERATIONS", Settings.password_hash_iterations
+        ),
+        store_shards=_env_int("STORE_SHARDS", Settings.store_shards),
+        leaderboard_top_n=_env_int("LEADERBOARD_TOP_N", Settings.leaderboard_top_n),
+        leaderboard_tick_ms=_env_int("LEADERBOARD_TICK_MS", Settings.leaderboard_tick_ms),
+        trace_sample_rate=_env_float("TRACE_SAMPLE_RATE", Settings.trace_sample_rate),
+        trace_file=_env("TRACE_FILE", ""),
+        trace_buffer_size=_env_int("TRACE_BUFFER_SIZE", Settings.trace_buffer_size),
+        debug_token=_env("DEBUG_TOKEN", ""),
+        admission_limit=_env_int("ADMISSION_LIMIT", Settings.admission_limit),
+        capture_file=_env("CAPTURE_FILE", ""),
+        capture_sample_rate=_env_float("CAPTURE_SAMPLE_RATE", Settings.capture_sample_rate),
+        event_queue_size=_env_int("EVENT_QUEUE_SIZE", Settings.event_queue_size),
+        game_history_limit=_env_int("GAME_HISTORY_LIMIT", Settings.game_history_limit),
+        error_log_retention=_env_int("ERROR_LOG_RETENTION", Settings.error_log_retention),
+        max_lessons=_env_int("MAX_LESSONS", Settings.max_lessons),
+        change_queue_size=_env_int("CHANGE_QUEUE_SIZE", Settings.change_queue_size),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return load_settings()
@@ -0,0 +1,61 @@
+import sys
+import threading
+from array import array
+from collections import deque
+from mmap import mmap
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Set
+
+# Types that are either shared process-wide or not heap memory owned by the
+# object being measured.
+_OPAQUE = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+    mmap,
+    type(threading.Lock()),
+    type(threading.RLock()),
+)
+_SEQUENCES = (list, tuple, set, frozenset, deque)
+
+
+def _slot_names(cls: type) -> Set[str]:
+    names: Set[str] = set()
+    for klass in cls.__mro__:
+        slots = vars(klass).get("__slots__", ())
+        names.update((slots,) if isinstance(slots, str) else slots)
+    return names
+
+
+def deep_sizeof(obj: Any, seen: Set[int]) -> int:
+    """Approximate bytes reachable from ``obj`` that are not yet in ``seen``.
+
+    ``seen`` is shared across calls so objects referenced by several
+    sampled entries (session layouts, interned strings) count once.
+    """
+    total = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        marker = id(current)
+        if marker in seen or isinstance(current, _OPAQUE):
+            continue
+        seen.add(marker)
+        total += sys.getsizeof(current)
+        if isinstance(current, (str, bytes, bytearray, int, float, bool, array)):
+            continue
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, _SEQUENCES):
+            pending.extend(current)
+        else:
+            attributes = getattr(current, "__dict__", None)
+            if attributes is not None:
+                pending.append(attributes)
+            for name in _slot_names(type(current)):
+                if name != "__dict__" and hasattr(current, name):
+                    pending.append(getattr(current, name))
+    return total
@@ -0,0 +1,292 @@
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from app.core.settings import Settings, get_settings
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+SERVICE_NAME = "mythicmath-api"
+SCOPE_NAME = "app.core.tracing"
+
+EXPORT_QUEUE_SIZE = 10_000
+EXPORT_BATCH_SIZE = 256
+EXPORT_BATCH_SECONDS = 1.0
+
+T = TypeVar("T")
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+    )
+
+    def __init__(
+        self, name: str, trace_id: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_error(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Trace:
+    """Spans finished so far for one sampled request.
+
+    Shared by reference with threadpool workers, which run in copies of the
+    request context; ``list.append`` keeps concurrent finishes safe.
+    """
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self) -> None:
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: List[Span] = []
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SCOPE_NAME},
+                            "spans": [span.to_otlp() for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+_active_trace: ContextVar[Optional[Trace]] = ContextVar("active_trace", default=None)
+_active_span: ContextVar[Optional[Span]] = ContextVar("active_span", default=None)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL) -> Iterator[Optional[Span]]:
+    """Open a child span of the current one; a no-op outside sampled traces."""
+    trace = _active_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _active_span.get()
+    current = Span(name, trace.trace_id, parent.span_id if parent else None, kind)
+    token = _active_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.set_error(exc)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _active_span.reset(token)
+        trace.spans.append(current)
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    def decorate(func: Callable[..., T]) -> Callable[..., T]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            # Unsampled requests pay for one context variable lookup.
+            if _active_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def trace_methods(*private: str) -> Callable[[type], type]:
+    """Class decorator giving each public method a ``Class.method`` span.
+
+    Private helpers are only traced when named in ``private``, so trivial
+    formatting helpers do not flood traces with spans.
+    """
+
+    def decorate(cls: type) -> type:
+        for attribute, value in list(vars(cls).items()):
+            if not inspect.isfunction(value):
+                continue
+            if attribute.startswith("_") and attribute not in private:
+                continue
+            setattr(cls, attribute, traced(f"{cls.__name__}.{attribute}")(value))
+        return cls
+
+    return decorate
+
+
+class InMemoryExporter:
+    def __init__(self, max_traces: int = 1000) -> None:
+        self._traces: Deque[Dict[str, Any]] = deque(maxlen=max_traces)
+
+    def export(self, trace: Trace) -> None:
+        self._traces.append(trace.to_otlp())
+
+    def traces(self) -> List[Dict[str, Any]]:
+        return list(self._traces)
+
+    def clear(self) -> None:
+        self._traces.clear()
+
+    def close(self) -> None:
+        # Nothing is buffered outside the deque.
+        pass
+
+
+class FileExporter:
+    """Appends one OTLP/JSON document per trace, as the OTel file exporter does.
+
+    ``export`` runs at the end of every sampled request, inside the event
+    loop, so it only queues the trace. A writer thread serializes traces
+    and appends them in batches. When the queue is full, new traces are
+    dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, path: str, max_pending: int = EXPORT_QUEUE_SIZE) -> None:
+        self._path = path
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(max_pending)
+        self.dropped = 0
+        self._writer = threading.Thread(target=self._write_loop, name="trace-export", daemon=True)
+        self._writer.start()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        batch: List[Trace] = []
+        deadline = time.monotonic() + EXPORT_BATCH_SECONDS
+        running = True
+        while running:
+            try:
+                trace = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                pass
+            else:
+                if trace is None:
+                    running = False
+                else:
+                    batch.append(trace)
+            if batch and (
+                not running
+                or len(batch) >= EXPORT_BATCH_SIZE
+                or time.monotonic() >= deadline
+            ):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + EXPORT_BATCH_SECONDS
+
+    def _flush(self, batch: List[Trace]) -> None:
+        lines = "".join(
+            json.dumps(trace.to_otlp(), separators=(",", ":")) + "\n" for trace in batch
+        )
+        with open(self._path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class Tracer:
+    def __init__(self, sample_rate: float, exporter: Any) -> None:
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    @contextmanager
+    def trace(self, name: str, kind: int = SPAN_KIND_SERVER) -> Iterator[Optional[Span]]:
+        """Start a root span, deciding once per trace whether to sample it."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace()
+        trace_token = _active_trace.set(trace)
+        try:
+            with span(name, kind) as root:
+                yield root
+        finally:
+            _active_trace.reset(trace_token)
+            self.exporter.export(trace)
+
+
+def build_tracer(settings: Settings) -> Tracer:
+    if settings.trace_file:
+        exporter: Any = FileExporter(os.path.expanduser(settings.trace_file))
+    else:
+        exporter = InMemoryExporter(settings.trace_buffer_size)
+    return Tracer(settings.trace_sample_rate, exporter)
+
+
+@lru_cache(maxsize=None)
+def get_tracer() -> Tracer:
+    return build_tracer(get_settings())
+
+
+def close_tracer() -> None:
+    if get_tracer.cache_info().currsize:
+        get_tracer().exporter.close()
+    get_tracer.cache_clear()
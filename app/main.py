@@ -1,10 +1,71 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from app.api.router import api_router
+from app.core.settings import get_settings
+from app.core.tracing import close_tracer
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.capture import CaptureMiddleware, close_traffic_recorder
+from app.middleware.tracing import TracingMiddleware
+from app.services.auth_service import get_auth_service, get_google_verifier
+from app.services.debug_service import get_debug_service
+from app.services.export_service import get_export_service
+from app.services.game_service import get_game_service
+from app.services.leaderboard_service import get_leaderboard_broadcaster
+from app.services.log_service import get_log_service
+from app.services.progress_service import get_progress_service
+from app.services.question_service import get_question_service
+from app.services.ranking_service import get_ranking_service
+from app.services.search_service import get_search_service
+from app.services.stats_service import get_stats_service
+from app.services.user_service import get_user_service
+from app.storage.memory import reset_store
+
+_SERVICE_PROVIDERS = (
+    get_auth_service,
+    get_google_verifier,
+    get_debug_service,
+    get_export_service,
+    get_game_service,
+    get_leaderboard_broadcaster,
+    get_log_service,
+    get_progress_service,
+    get_question_service,
+    get_ranking_service,
+    get_search_service,
+    get_stats_service,
+    get_user_service,
+)
+
+
+def reset_dependencies() -> None:
+    close_traffic_recorder()
+    close_tracer()
+    for provider in _SERVICE_PROVIDERS:
+        provider.cache_clear()
+    get_settings.cache_clear()
+    reset_store()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # The store and services are built lazily by their providers on first
+    # use; the lifespan only owns their teardown.
+    try:
+        yield
+    finally:
+        reset_dependencies()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="MythicMath API")
+    app = FastAPI(title="MythicMath API", lifespan=lifespan)
+    # Added last, so tracing wraps admission and records shed requests.
+    app.add_middleware(AdmissionMiddleware)
+    app.add_middleware(TracingMiddleware)
+    # Outermost, so captured arrival times include requests that are shed.
+    app.add_middleware(CaptureMiddleware)
     app.include_router(api_router)
     return app
 
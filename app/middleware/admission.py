@@ -0,0 +1,211 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.settings import get_settings
+
+INITIAL_SERVICE_SECONDS = 0.05
+SERVICE_TIME_WEIGHT = 0.2
+
+
+@dataclass(frozen=True)
+class AdmissionClass:
+    """Limits for one group of routes.
+
+    ``concurrency`` and ``reserve`` are fractions of the global limit:
+    a class may run at most ``concurrency`` of it and may not start while
+    fewer than ``reserve`` of it are free, which keeps headroom for
+    classes with a higher ``priority``.
+    """
+
+    name: str
+    priority: int
+    concurrency: float
+    reserve: float
+    max_queue: int
+    max_wait_seconds: float
+
+
+GAMEPLAY = AdmissionClass("gameplay", 3, 1.0, 0.0, 256, 0.25)
+DEFAULT = AdmissionClass("default", 2, 0.8, 0.1, 128, 1.0)
+AUTH = AdmissionClass("auth", 1, 0.2, 0.2, 32, 2.0)
+RANKING = AdmissionClass("ranking", 1, 0.2, 0.2, 32, 1.0)
+ADMISSION_CLASSES = (GAMEPLAY, DEFAULT, AUTH, RANKING)
+
+# First matching prefix wins. Long-lived streams are exempt because they
+# would hold a slot for their whole lifetime.
+ROUTE_CLASSES: Tuple[Tuple[str, Optional[AdmissionClass]], ...] = (
+    ("/health", None),
+    ("/debug/", None),
+    ("/export/", None),
+    ("/ranking/stream", None),
+    ("/ranking/ws", None),
+    ("/game/", GAMEPLAY),
+    ("/auth/register", AUTH),
+    ("/auth/login", AUTH),
+    ("/auth/reset-password", AUTH),
+    ("/ranking/global", RANKING),
+    ("/ranking/me", RANKING),
+)
+
+
+def classify(path: str) -> Optional[AdmissionClass]:
+    for prefix, admission_class in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return admission_class
+    return DEFAULT
+
+
+class AdmissionController:
+    """Per-class concurrency limits with bounded, deadline-aware queues.
+
+    All state is touched from the event loop only. Freed slots go to the
+    highest-priority class with waiters, and a request is refused up front
+    when its estimated queue time already exceeds its class deadline.
+    """
+
+    def __init__(self, limit: int, classes: Iterable[AdmissionClass]) -> None:
+        self._limit = limit
+        self._classes = sorted(set(classes), key=lambda item: -item.priority)
+        self._max_concurrent: Dict[str, int] = {}
+        self._reserve: Dict[str, int] = {}
+        for admission_class in self._classes:
+            name = admission_class.name
+            self._max_concurrent[name] = max(1, int(limit * admission_class.concurrency))
+            self._reserve[name] = min(limit - 1, math.ceil(limit * admission_class.reserve))
+        self._in_flight: Dict[str, int] = {item.name: 0 for item in self._classes}
+        self._total = 0
+        self._queues: Dict[str, Deque["asyncio.Future[None]"]] = {
+            item.name: deque() for item in self._classes
+        }
+        self._service_seconds: Dict[str, float] = {
+            item.name: INITIAL_SERVICE_SECONDS for item in self._classes
+        }
+        self.admitted: Dict[str, int] = {item.name: 0 for item in self._classes}
+        self.rejected: Dict[str, int] = {item.name: 0 for item in self._classes}
+
+    async def acquire(self, admission_class: AdmissionClass) -> Optional[float]:
+        """Wait for a slot; returns ``None`` once admitted, else a retry delay."""
+        name = admission_class.name
+        queue = self._queues[name]
+        if not queue and self._has_capacity(admission_class):
+            self._grant(name)
+            return None
+        estimate = (len(queue) + 1) * self._service_seconds[name] / self._max_concurrent[name]
+        if len(queue) >= admission_class.max_queue or estimate > admission_class.max_wait_seconds:
+            return self._reject(name, estimate)
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), admission_class.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                return None
+            queue.remove(waiter)
+            waiter.cancel()
+            return self._reject(name, admission_class.max_wait_seconds)
+        except BaseException:
+            # Cancelled while queued (client gone): give back a slot that
+            # may have been granted in the meantime.
+            if waiter.done() and not waiter.cancelled():
+                self.release(admission_class, 0.0)
+            else:
+                queue.remove(waiter)
+                waiter.cancel()
+            raise
+        return None
+
+    def release(self, admission_class: AdmissionClass, elapsed: float) -> None:
+        name = admission_class.name
+        self._in_flight[name] -= 1
+        self._total -= 1
+        if elapsed > 0:
+            previous = self._service_seconds[name]
+            self._service_seconds[name] = previous + SERVICE_TIME_WEIGHT * (elapsed - previous)
+        self._dispatch()
+
+    def _has_capacity(self, admission_class: AdmissionClass) -> bool:
+        name = admission_class.name
+        return (
+            self._in_flight[name] < self._max_concurrent[name]
+            and self._total < self._limit - self._reserve[name]
+        )
+
+    def _grant(self, name: str) -> None:
+        self._in_flight[name] += 1
+        self._total += 1
+        self.admitted[name] += 1
+
+    def _reject(self, name: str, estimate: float) -> float:
+        self.rejected[name] += 1
+        return estimate
+
+    def _dispatch(self) -> None:
+        for admission_class in self._classes:
+            queue = self._queues[admission_class.name]
+            while queue and self._has_capacity(admission_class):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._grant(admission_class.name)
+                waiter.set_result(None)
+
+
+class AdmissionMiddleware:
+    """Sheds load with 503 + Retry-After before requests reach the threadpool.
+
+    Disabled when ``MYTHICMATH_ADMISSION_LIMIT`` is 0. The controller is
+    built on the first request so settings are read after startup.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._controller: Optional[AdmissionController] = None
+        self._enabled: Optional[bool] = None
+
+    @property
+    def controller(self) -> Optional[AdmissionController]:
+        if self._enabled is None:
+            limit = get_settings().admission_limit
+            self._enabled = limit > 0
+            if self._enabled:
+                self._controller = AdmissionController(limit, ADMISSION_CLASSES)
+        return self._controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = self.controller if scope["type"] == "http" else None
+        admission_class = classify(scope["path"]) if controller is not None else None
+        if controller is None or admission_class is None:
+            await self.app(scope, receive, send)
+            return
+        retry_after = await controller.acquire(admission_class)
+        if retry_after is not None:
+            await _overloaded(send, retry_after)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(admission_class, time.monotonic() - started)
+
+
+async def _overloaded(send: Send, retry_after: float) -> None:
+    body = json.dumps({"detail": "Server is overloaded, retry later"}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("ascii")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,261 @@
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import get_settings
+from app.middleware.routing import route_path
+
+# Response fields whose values later requests refer to (tokens, session and
+# question ids). Their pseudonyms are recorded in document order so replay
+# can map each one to the value at the same place in its own response.
+ISSUED_KEYS = frozenset(("access_token", "session_id", "id"))
+# Request fields that are always pseudonymized, whatever their JSON type.
+CREDENTIAL_KEYS = frozenset(("password", "new_password", "id_token", "access_token", "token"))
+MAX_RESPONSE_SCAN_BYTES = 16384
+BATCH_SIZE = 256
+BATCH_SECONDS = 1.0
+
+_SHORT_NUMBER = re.compile(r"-?\d{1,6}(?:[.,]\d{1,6})?")
+_PATH_PARAM = re.compile(r"{([^}:]+)(?::[^}]+)?}")
+
+
+class Sanitizer:
+    """Replaces strings with stable keyed pseudonyms.
+
+    The key is random per process and never written, so captures keep the
+    identity structure (the same user id maps to the same pseudonym) while
+    the original values cannot be recovered. Every JSON string is
+    pseudonymized, including numeric ones such as a ``"123456"`` password;
+    JSON numbers are kept, except under ``CREDENTIAL_KEYS``. Short numeric
+    path segments and query values (levels, limits) are kept by
+    ``url_part`` so the replayed URLs still validate.
+    """
+
+    def __init__(self, key: Optional[bytes] = None) -> None:
+        self._key = key or secrets.token_bytes(32)
+
+    def text(self, value: str) -> str:
+        digest = hmac.new(self._key, value.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+        if "@" in value:
+            return f"{digest}@example.invalid"
+        return f"~{digest}"
+
+    def url_part(self, value: str) -> str:
+        if _SHORT_NUMBER.fullmatch(value):
+            return value
+        return self.text(value)
+
+    def credential(self, value: Any) -> str:
+        return self.text(value if isinstance(value, str) else json.dumps(value))
+
+    def value(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.text(value)
+        if isinstance(value, dict):
+            return {
+                key: self.credential(item) if key in CREDENTIAL_KEYS else self.value(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self.value(item) for item in value]
+        return value
+
+
+class TrafficRecorder:
+    """Appends captured requests to a gzip JSONL file from a writer thread.
+
+    Each batch is written as its own gzip member, so the file stays
+    readable by ``gzip.open`` at any point and a crash loses at most the
+    current batch.
+    """
+
+    def __init__(self, path: str, sample_rate: float) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.sanitizer = Sanitizer()
+        self._started = time.monotonic()
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="traffic-capture", daemon=True
+        )
+        self._writer.start()
+
+    def offset(self) -> float:
+        return time.monotonic() - self._started
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        self._queue.put(entry)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + BATCH_SECONDS
+        running = True
+        while running:
+            try:
+                entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = {}
+            if entry is None:
+                running = False
+            elif entry:
+                batch.append(entry)
+            if batch and (not running or len(batch) >= BATCH_SIZE or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + BATCH_SECONDS
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in batch)
+        with open(self.path, "ab") as handle:
+            handle.write(gzip.compress(lines.encode("utf-8")))
+
+
+@lru_cache(maxsize=None)
+def get_traffic_recorder() -> Optional[TrafficRecorder]:
+    settings = get_settings()
+    if not settings.capture_file:
+        return None
+    return TrafficRecorder(os.path.expanduser(settings.capture_file), settings.capture_sample_rate)
+
+
+def close_traffic_recorder() -> None:
+    if get_traffic_recorder.cache_info().currsize:
+        recorder = get_traffic_recorder()
+        if recorder is not None:
+            recorder.close()
+    get_traffic_recorder.cache_clear()
+
+
+class CaptureMiddleware:
+    """Opt-in recorder of sanitized request sequences for later replay.
+
+    Enabled by ``MYTHICMATH_CAPTURE_FILE``. Each line holds the arrival
+    offset, method, route template, pseudonymized path, query, body and
+    bearer token, plus the response status and duration.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        recorder = get_traffic_recorder() if scope["type"] == "http" else None
+        if recorder is None or not recorder.sampled():
+            await self.app(scope, receive, send)
+            return
+        arrived = recorder.offset()
+        body = bytearray()
+        response_body = bytearray()
+        status = 500
+
+        async def receive_and_keep() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+
+        async def send_and_keep(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                if len(response_body) <= MAX_RESPONSE_SCAN_BYTES:
+                    response_body.extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_keep, send_and_keep)
+        finally:
+            recorder.record(
+                self._entry(recorder, scope, arrived, bytes(body), bytes(response_body), status)
+            )
+
+    def _entry(
+        self,
+        recorder: TrafficRecorder,
+        scope: Scope,
+        arrived: float,
+        body: bytes,
+        response_body: bytes,
+        status: int,
+    ) -> Dict[str, Any]:
+        sanitizer = recorder.sanitizer
+        route = route_path(scope)
+        entry: Dict[str, Any] = {
+            "t": round(arrived, 6),
+            "method": scope["method"],
+            "route": route,
+            "path": self._path(sanitizer, scope, route),
+            "status": status,
+            "duration_ms": round((recorder.offset() - arrived) * 1000, 3),
+        }
+        query = scope.get("query_string", b"").decode("latin-1")
+        if query:
+            entry["query"] = [[key, sanitizer.url_part(value)] for key, value in parse_qsl(query)]
+        if body:
+            try:
+                entry["body"] = sanitizer.value(json.loads(body))
+            except ValueError:
+                entry["body_bytes"] = len(body)
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                entry["authorization"] = f"{scheme} {sanitizer.text(token.strip())}"
+        issued = self._issued(sanitizer, response_body)
+        if issued:
+            entry["issued"] = issued
+        return entry
+
+    def _path(self, sanitizer: Sanitizer, scope: Scope, route: Optional[str]) -> str:
+        if route is None:
+            head, *rest = scope["path"].lstrip("/").split("/")
+            return "/" + "/".join([head] + [sanitizer.url_part(part) for part in rest if part])
+        params = scope.get("path_params", {})
+        return _PATH_PARAM.sub(
+            lambda match: sanitizer.url_part(str(params[match.group(1)])), route
+        )
+
+    def _issued(self, sanitizer: Sanitizer, response_body: bytes) -> List[str]:
+        if not response_body or len(response_body) > MAX_RESPONSE_SCAN_BYTES:
+            return []
+        try:
+            payload = json.loads(response_body)
+        except ValueError:
+            return []
+        return [sanitizer.text(value) for value in issued_values(payload)]
+
+
+def issued_values(payload: Any, found: Optional[List[str]] = None) -> List[str]:
+    """String values under ``ISSUED_KEYS`` anywhere in ``payload``, in order."""
+    if found is None:
+        found = []
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if key in ISSUED_KEYS and isinstance(value, str):
+                found.append(value)
+            else:
+                issued_values(value, found)
+    elif isinstance(payload, list):
+        for item in payload:
+            issued_values(item, found)
+    return found
@@ -0,0 +1,27 @@
+from typing import Any, Callable, Dict, Optional
+
+from starlette.types import Scope
+
+_route_paths: Dict[Callable[..., Any], Optional[str]] = {}
+
+
+def route_path(scope: Scope) -> Optional[str]:
+    """Template of the route that handled ``scope``, e.g. ``/users/{user_id}``.
+
+    Starlette records the matched endpoint but not the route template, so
+    the template is looked up once per endpoint and cached.
+    """
+    endpoint = scope.get("endpoint")
+    router = scope.get("router")
+    if endpoint is None or router is None:
+        return None
+    if endpoint not in _route_paths:
+        _route_paths[endpoint] = next(
+            (
+                getattr(route, "path", None)
+                for route in router.routes
+                if getattr(route, "endpoint", None) is endpoint
+            ),
+            None,
+        )
+    return _route_paths[endpoint]
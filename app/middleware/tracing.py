@@ -0,0 +1,45 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import STATUS_ERROR, get_tracer
+from app.middleware.routing import route_path
+
+
+class TracingMiddleware:
+    """Opens the root server span for each sampled HTTP request.
+
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so the span
+    context reaches the endpoint and streaming bodies are not buffered.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        with get_tracer().trace(f"{method} {scope['path']}") as root:
+            if root is None:
+                await self.app(scope, receive, send)
+                return
+            root.attributes["http.request.method"] = method
+            root.attributes["url.path"] = scope["path"]
+            status = 500
+
+            async def send_with_status(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_path(scope)
+                if route is not None:
+                    root.name = f"{method} {route}"
+                    root.attributes["http.route"] = route
+                root.attributes["http.response.status_code"] = status
+                if status >= 500:
+                    root.status = STATUS_ERROR
@@ -1,6 +1,9 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint
+from typing_extensions import TypedDict
+
+ProgressValue = conint(ge=-(2**63), le=2**63 - 1)
 
 
 class RegisterIn(BaseModel):
@@ -48,7 +51,7 @@ class UserCreateIn(BaseModel):
     language: Optional[str] = None
     xp: Optional[int] = None
     level: Optional[int] = None
-    progress: Optional[Dict[str, int]] = None
+    progress: Optional[Dict[str, ProgressValue]] = None
     current_streak: Optional[int] = None
     longest_streak: Optional[int] = None
     last_login_date: Optional[str] = None
@@ -61,7 +64,7 @@ class UserUpdateIn(BaseModel):
     language: Optional[str] = None
     xp: Optional[int] = None
     level: Optional[int] = None
-    progress: Optional[Dict[str, int]] = None
+    progress: Optional[Dict[str, ProgressValue]] = None
     current_streak: Optional[int] = None
     longest_streak: Optional[int] = None
     last_login_date: Optional[str] = None
@@ -84,6 +87,53 @@ class ProfileOut(BaseModel):
     last_lesson_date: Optional[str] = None
 
 
+class ProfileRow(TypedDict):
+    id: str
+    email: Optional[str]
+    display_name: Optional[str]
+    language: Optional[str]
+    xp: int
+    level: int
+    progress: Dict[str, int]
+    current_streak: int
+    longest_streak: int
+    last_login_date: Optional[str]
+    lessons_completed_today: int
+    last_lesson_date: Optional[str]
+
+
+class UserBatchGetIn(BaseModel):
+    user_ids: List[str]
+
+
+class UserBatchUpdateItemIn(UserUpdateIn):
+    user_id: str
+
+
+class UserBatchUpdateIn(BaseModel):
+    updates: List[UserBatchUpdateItemIn]
+
+
+class BatchErrorOut(BaseModel):
+    user_id: str
+    status_code: int
+    detail: str
+
+
+class ProfileBatchOut(BaseModel):
+    profiles: List[ProfileOut] = Field(default_factory=list)
+    errors: List[BatchErrorOut] = Field(default_factory=list)
+
+
+class PlayerSearchResultOut(BaseModel):
+    user_id: str
+    display_name: Optional[str] = None
+    level: int
+    xp: int
+    match: Literal["exact", "prefix", "fuzzy"]
+    score: float
+
+
 class UserStatsOut(BaseModel):
     user_id: str
     games_played: int
@@ -100,6 +150,14 @@ class QuestionOut(BaseModel):
     choices: List[str]
 
 
+class QuestionRow(TypedDict):
+    id: str
+    level: int
+    operation: str
+    template: str
+    choices: List[str]
+
+
 class GameStartIn(BaseModel):
     user_id: str
     level: int
@@ -139,10 +197,25 @@ class GameFinishOut(BaseModel):
     level: int
 
 
+class GameHistoryEntryOut(BaseModel):
+    session_id: str
+    level: int
+    correct_answers: int
+    total_questions: int
+    xp_earned: int
+    duration_seconds: float
+    finished_at: str
+
+
+class GameHistoryOut(BaseModel):
+    items: List[GameHistoryEntryOut]
+    next_cursor: Optional[str] = None
+
+
 class ProgressUpdateIn(BaseModel):
     user_id: str
     xp_delta: int = 0
-    progress: Optional[Dict[str, int]] = None
+    progress: Optional[Dict[str, ProgressValue]] = None
 
 
 class ProgressOut(BaseModel):
@@ -150,6 +223,15 @@ class ProgressOut(BaseModel):
     xp: int
     level: int
     progress: Dict[str, int] = Field(default_factory=dict)
+    progress_version: int = 0
+
+
+class ProgressDeltaOut(BaseModel):
+    user_id: str
+    xp: int
+    level: int
+    changed: Dict[str, int] = Field(default_factory=dict)
+    progress_version: int
 
 
 class RankingUpdateIn(BaseModel):
@@ -168,6 +250,26 @@ class RankingEntryOut(BaseModel):
     updated_at: str
 
 
+class RankingBatchUpdateIn(BaseModel):
+    updates: List[RankingUpdateIn]
+    include_positions: bool = False
+
+
+class RankingBatchOut(BaseModel):
+    updated: int
+    entries: List[RankingEntryOut] = Field(default_factory=list)
+    errors: List[BatchErrorOut] = Field(default_factory=list)
+
+
+class RankingEntryRow(TypedDict):
+    user_id: str
+    display_name: Optional[str]
+    xp: int
+    level: int
+    position: int
+    updated_at: str
+
+
 class ErrorLogIn(BaseModel):
     user_id: Optional[str] = None
     message: str
@@ -181,5 +283,117 @@ class GameSessionLogIn(BaseModel):
     payload: Dict[str, Any]
 
 
+class ErrorGroupOut(BaseModel):
+    fingerprint: str
+    message: str
+    stack: Optional[str] = None
+    count: int
+    first_seen: str
+    last_seen: str
+    affected_users: int
+    samples: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class LogQueryOut(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class MemoryCollectionOut(BaseModel):
+    name: str
+    kind: str
+    entries: int
+    sampled: int
+    bytes_per_entry: float
+    estimated_bytes: int
+
+
+class MemoryReportOut(BaseModel):
+    sample_size: int
+    rss_bytes: Optional[int] = None
+    total_estimated_bytes: int
+    collections: List[MemoryCollectionOut]
+
+
+class MemorySnapshotOut(BaseModel):
+    id: int
+    taken_at: str
+    traced_bytes: int
+
+
+class MemoryDiffEntryOut(BaseModel):
+    location: str
+    size_diff: int
+    count_diff: int
+    size: int
+    count: int
+
+
+class MemoryDiffOut(BaseModel):
+    base: int
+    target: Optional[int] = None
+    size_diff: int
+    entries: List[MemoryDiffEntryOut]
+
+
+class EventConsumerOut(BaseModel):
+    kind: str
+    name: str
+    processed: int
+    skipped: int
+    failed: int
+    last_error: Optional[str] = None
+
+
+class EventPipelineOut(BaseModel):
+    capacity: int
+    pending: int
+    published: int
+    processed: int
+    blocked_publishes: int
+    lag_seconds: float
+    last_lag_seconds: float
+    max_lag_seconds: float
+    consumers: List[EventConsumerOut]
+
+
+class OperationStatsOut(BaseModel):
+    operation: str
+    level: int
+    answers: int
+    correct_answers: int
+    accuracy: float
+
+
+class HourlyStatsOut(BaseModel):
+    hour: str
+    games_started: int
+    games_finished: int
+    answers: int
+    correct_answers: int
+
+
+class HistogramOut(BaseModel):
+    bounds: List[float]
+    counts: List[int]
+    count: int
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class GlobalStatsOut(BaseModel):
+    games_started: int
+    games_finished: int
+    answers: int
+    correct_answers: int
+    accuracy: float
+    by_operation: List[OperationStatsOut]
+    hourly: List[HourlyStatsOut]
+    game_duration_seconds: HistogramOut
+    score_ratio: HistogramOut
+
+
 class HealthOut(BaseModel):
     status: str
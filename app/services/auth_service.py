@@ -1,65 +1,95 @@
 import uuid
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import HTTPException
 
 from app.core import security
+from app.core.google_auth import (
+    GoogleIdTokenVerifier,
+    InvalidIdToken,
+    KeysetUnavailable,
+    build_google_verifier,
+)
+from app.core.settings import SESSION_MODE_SIGNED, Settings, get_settings
+from app.core.tracing import trace_methods
 from app.models.schemas import AuthOut, MessageOut, SessionOut, UserOut
-from app.storage.memory import MemoryStore, PlayerProfile, UserRecord, store
+from app.storage.memory import MemoryStore, PlayerProfile, UserRecord, get_store
 
 
+@trace_methods("_check_password", "_new_session", "_record_login")
 class AuthService:
-    def __init__(self, store: MemoryStore) -> None:
+    def __init__(
+        self,
+        store: MemoryStore,
+        settings: Settings,
+        google_verifier: Optional[GoogleIdTokenVerifier] = None,
+    ) -> None:
         self._store = store
+        self._google_verifier = google_verifier
+        self._signed_sessions = settings.session_mode == SESSION_MODE_SIGNED
+        if self._signed_sessions and not settings.session_secret:
+            raise ValueError("Signed session mode requires a session secret")
+        self._session_secret = settings.session_secret.encode("utf-8")
+        self._session_ttl_seconds = settings.session_ttl_seconds
+        self._password_iterations = settings.password_hash_iterations
 
     def register(self, email: str, password: str) -> AuthOut:
         if self._store.get_user(email):
             raise HTTPException(status_code=409, detail="Email already registered")
-        salt = security.generate_salt()
-        pw_hash = security.hash_password(password, salt)
         record = UserRecord(
             id=str(uuid.uuid4()),
             provider="local",
-            salt_b64=security.encode_b64(salt),
-            pw_hash_b64=security.encode_b64(pw_hash),
+            password_hash=security.create_password_hash(password, self._password_iterations),
         )
-        self._store.set_user(email, record)
+        if not self._store.add_user(email, record):
+            raise HTTPException(status_code=409, detail="Email already registered")
         profile = self._ensure_profile(email, record.id)
         self._touch_login(profile)
-        token = self._new_session(email)
+        token = self._new_session(email, record)
         return AuthOut(access_token=token, user=self._user_out(email, record))
 
     def login(self, email: str, password: str) -> AuthOut:
         user = self._store.get_user(email)
         if not user or user.provider != "local":
             raise HTTPException(status_code=401, detail="Invalid credentials")
-        if not user.salt_b64 or not user.pw_hash_b64:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        if not security.verify_password(password, user.salt_b64, user.pw_hash_b64):
+        if not self._check_password(email, user, password):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         profile = self._ensure_profile(email, user.id)
         self._touch_login(profile)
-        token = self._new_session(email)
+        token = self._new_session(email, user)
         return AuthOut(access_token=token, user=self._user_out(email, user))
 
     def login_google(self, id_token: str) -> AuthOut:
-        email = security.unsafe_decode_email_from_jwt(id_token)
-        if not email:
+        if self._google_verifier is None:
+            raise HTTPException(status_code=503, detail="Google login is not configured")
+        try:
+            claims = self._google_verifier.verify(id_token)
+        except InvalidIdToken:
             raise HTTPException(status_code=400, detail="Invalid id_token")
+        except KeysetUnavailable:
+            raise HTTPException(status_code=503, detail="Google signing keys unavailable")
+        email = claims["email"]
         user = self._store.get_user(email)
         if not user:
             user = UserRecord(id=str(uuid.uuid4()), provider="google")
-            self._store.set_user(email, user)
+            if not self._store.add_user(email, user):
+                user = self._store.get_user(email)
         profile = self._ensure_profile(email, user.id)
         self._touch_login(profile)
-        token = self._new_session(email)
+        token = self._new_session(email, user)
         return AuthOut(access_token=token, user=self._user_out(email, user))
 
     def logout(self, authorization: Optional[str]) -> MessageOut:
         user = self._get_user_from_header(authorization)
         token = self._extract_token(authorization)
-        self._store.delete_session(token)
+        if security.is_signed_session_token(token):
+            claims = self._verify_signed_token(token)
+            if claims:
+                self._store.revoke_session(claims.token_id, claims.expires_at)
+        else:
+            self._store.delete_session(token)
         return MessageOut(detail=f"Logged out {user.email}")
 
     def session(self, authorization: Optional[str]) -> SessionOut:
@@ -80,16 +110,62 @@ class AuthService:
 
     def get_authenticated_email(self, authorization: Optional[str]) -> str:
         token = self._extract_token(authorization)
+        if security.is_signed_session_token(token):
+            claims = self._verify_signed_token(token)
+            if not claims:
+                raise HTTPException(status_code=401, detail="Invalid session")
+            return claims.email
         email = self._store.get_email_for_session(token)
         if not email:
             raise HTTPException(status_code=401, detail="Invalid session")
         return email
 
-    def _new_session(self, email: str) -> str:
+    def _check_password(self, email: str, user: UserRecord, password: str) -> bool:
+        if user.password_hash:
+            if not security.verify_password_hash(password, user.password_hash):
+                return False
+            parsed = security.parse_password_hash(user.password_hash)
+            if parsed.iterations != self._password_iterations:
+                self._rehash_password(email, password)
+            return True
+        if not user.salt_b64 or not user.pw_hash_b64:
+            return False
+        if not security.verify_password(password, user.salt_b64, user.pw_hash_b64):
+            return False
+        self._rehash_password(email, password)
+        return True
+
+    def _rehash_password(self, email: str, password: str) -> None:
+        encoded = security.create_password_hash(password, self._password_iterations)
+        self._store.update_user(email, lambda user: self._set_password_hash(user, encoded))
+
+    def _set_password_hash(self, user: UserRecord, encoded: str) -> UserRecord:
+        user.password_hash = encoded
+        user.salt_b64 = None
+        user.pw_hash_b64 = None
+        return user
+
+    def _new_session(self, email: str, user: UserRecord) -> str:
+        if self._signed_sessions:
+            return security.create_signed_session_token(
+                self._session_secret,
+                user.id,
+                email,
+                user.provider,
+                self._session_ttl_seconds,
+            )
         token = security.create_session_token()
         self._store.create_session(token, email)
         return token
 
+    def _verify_signed_token(self, token: str) -> Optional[security.SessionClaims]:
+        if not self._signed_sessions:
+            return None
+        claims = security.verify_signed_session_token(self._session_secret, token)
+        if not claims or self._store.is_session_revoked(claims.token_id):
+            return None
+        return claims
+
     def _extract_token(self, authorization: Optional[str]) -> str:
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Not authenticated")
@@ -100,6 +176,11 @@ class AuthService:
 
     def _get_user_from_header(self, authorization: Optional[str]) -> UserOut:
         token = self._extract_token(authorization)
+        if security.is_signed_session_token(token):
+            claims = self._verify_signed_token(token)
+            if not claims:
+                raise HTTPException(status_code=401, detail="Invalid session")
+            return UserOut(id=claims.user_id, email=claims.email, provider=claims.provider)
         email = self._store.get_email_for_session(token)
         if not email:
             raise HTTPException(status_code=401, detail="Invalid session")
@@ -116,14 +197,16 @@ class AuthService:
         if profile:
             return profile
         profile = PlayerProfile(id=user_id, email=email, language="pt")
-        self._store.set_profile(user_id, profile)
-        return profile
+        return self._store.add_profile(user_id, profile)
 
     def _touch_login(self, profile: PlayerProfile) -> None:
+        self._store.update_profile(profile.id, self._record_login)
+
+    def _record_login(self, profile: PlayerProfile) -> PlayerProfile:
         today = self._today()
         last_login = self._parse_date(profile.last_login_date)
         if last_login == today:
-            return
+            return profile
         if last_login == today - timedelta(days=1):
             profile.current_streak += 1
         else:
@@ -131,6 +214,7 @@ class AuthService:
         if profile.current_streak > profile.longest_streak:
             profile.longest_streak = profile.current_streak
         profile.last_login_date = today.isoformat()
+        return profile
 
     def _today(self) -> date:
         return datetime.now(timezone.utc).date()
@@ -144,8 +228,11 @@ class AuthService:
             return None
 
 
-_service = AuthService(store)
+@lru_cache(maxsize=None)
+def get_google_verifier() -> Optional[GoogleIdTokenVerifier]:
+    return build_google_verifier(get_settings())
 
 
+@lru_cache(maxsize=None)
 def get_auth_service() -> AuthService:
-    return _service
+    return AuthService(get_store(), get_settings(), get_google_verifier())
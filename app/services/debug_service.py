@@ -0,0 +1,234 @@
+import os
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Any, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+from app.core.sizing import deep_sizeof
+from app.models.schemas import (
+    EventConsumerOut,
+    EventPipelineOut,
+    MemoryCollectionOut,
+    MemoryDiffEntryOut,
+    MemoryDiffOut,
+    MemoryReportOut,
+    MemorySnapshotOut,
+)
+from app.storage.history import GameHistory
+from app.storage.log_index import LogIndex
+from app.storage.occurrences import ErrorOccurrenceLog
+from app.storage.memory import MemoryStore, get_store
+from app.storage.progress import LessonCatalog
+from app.storage.question_bank import QuestionBank
+from app.storage.sharding import ShardedMap
+from app.storage.stats import GameplayStats
+
+DEFAULT_SAMPLE_SIZE = 200
+MAX_SAMPLE_SIZE = 10_000
+MAX_SNAPSHOTS = 4
+TRACEMALLOC_FRAMES = 1
+# Each posting is one int64 in an array; counted from the entry count
+# instead of walking every posting list.
+POSTING_BYTES = 8
+MEASURED_TYPES = (
+    dict,
+    ShardedMap,
+    LogIndex,
+    ErrorOccurrenceLog,
+    QuestionBank,
+    GameHistory,
+    LessonCatalog,
+    GameplayStats,
+)
+
+
+def _stride(items: Any, count: int, size: int) -> List[Any]:
+    step = max(1, count // max(1, size))
+    return list(islice(items, 0, step * size, step))
+
+
+class DebugService:
+    """Memory diagnostics for the running process.
+
+    Collection sizes are extrapolated from an evenly strided sample, so the
+    cost depends on ``sample_size`` rather than on how large the store is.
+    """
+
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+        self._snapshots: "OrderedDict[int, Tuple[str, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_snapshot_id = 1
+        self._lock = threading.Lock()
+
+    def memory_report(self, sample_size: int = DEFAULT_SAMPLE_SIZE) -> MemoryReportOut:
+        sample_size = max(1, min(sample_size, MAX_SAMPLE_SIZE))
+        collections = [
+            self._measure(name, value, sample_size)
+            for name, value in vars(self._store).items()
+            if isinstance(value, MEASURED_TYPES)
+        ]
+        collections.sort(key=lambda item: item.estimated_bytes, reverse=True)
+        return MemoryReportOut(
+            sample_size=sample_size,
+            rss_bytes=self._rss_bytes(),
+            total_estimated_bytes=sum(item.estimated_bytes for item in collections),
+            collections=collections,
+        )
+
+    def take_snapshot(self) -> MemorySnapshotOut:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            snapshot = self._filtered_snapshot()
+            snapshot_id = self._next_snapshot_id
+            self._next_snapshot_id += 1
+            taken_at = datetime.now(timezone.utc).isoformat()
+            self._snapshots[snapshot_id] = (taken_at, snapshot)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return self._snapshot_out(snapshot_id, taken_at, snapshot)
+
+    def list_snapshots(self) -> List[MemorySnapshotOut]:
+        with self._lock:
+            return [
+                self._snapshot_out(snapshot_id, taken_at, snapshot)
+                for snapshot_id, (taken_at, snapshot) in self._snapshots.items()
+            ]
+
+    def diff_snapshots(self, base: int, target: Optional[int], limit: int) -> MemoryDiffOut:
+        with self._lock:
+            if base not in self._snapshots:
+                raise HTTPException(status_code=404, detail="Snapshot not found")
+            if target is None:
+                # Diff against the live heap without keeping the snapshot.
+                current = self._filtered_snapshot()
+            elif target in self._snapshots:
+                current = self._snapshots[target][1]
+            else:
+                raise HTTPException(status_code=404, detail="Snapshot not found")
+            previous = self._snapshots[base][1]
+        stats = current.compare_to(previous, "lineno")
+        return MemoryDiffOut(
+            base=base,
+            target=target,
+            size_diff=sum(stat.size_diff for stat in stats),
+            entries=[
+                MemoryDiffEntryOut(
+                    location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    size_diff=stat.size_diff,
+                    count_diff=stat.count_diff,
+                    size=stat.size,
+                    count=stat.count,
+                )
+                for stat in stats[:limit]
+            ],
+        )
+
+    def clear_snapshots(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def event_metrics(self) -> EventPipelineOut:
+        metrics = self._store.events.metrics()
+        return EventPipelineOut(
+            capacity=metrics.capacity,
+            pending=metrics.pending,
+            published=metrics.published,
+            processed=metrics.processed,
+            blocked_publishes=metrics.blocked_publishes,
+            lag_seconds=round(metrics.lag_seconds, 6),
+            last_lag_seconds=round(metrics.last_lag_seconds, 6),
+            max_lag_seconds=round(metrics.max_lag_seconds, 6),
+            consumers=[
+                EventConsumerOut(
+                    kind=consumer.kind,
+                    name=consumer.name,
+                    processed=consumer.processed,
+                    skipped=consumer.skipped,
+                    failed=consumer.failed,
+                    last_error=consumer.last_error,
+                )
+                for consumer in metrics.consumers
+            ],
+        )
+
+    def _measure(self, name: str, collection: Any, sample_size: int) -> MemoryCollectionOut:
+        # Shared structures would otherwise be charged to whichever
+        # collection happens to reach them first.
+        seen: Set[int] = {id(self._store), id(self._store.lessons)} - {id(collection)}
+        overhead = sys.getsizeof(collection)
+        extra = 0
+        if isinstance(collection, (ShardedMap, GameHistory)):
+            count = len(collection)
+            overhead += collection.table_sizeof()
+            sample: List[Any] = collection.sample(sample_size)
+        elif isinstance(collection, dict):
+            count = len(collection)
+            try:
+                sample = _stride(iter(collection.items()), count, sample_size)
+            except RuntimeError:
+                # Resized by another thread mid-scan; fall back to a copy.
+                sample = _stride(iter(list(collection.items())), count, sample_size)
+        elif isinstance(collection, ErrorOccurrenceLog):
+            # Columnar: the arrays are measured directly, nothing to sample.
+            count = len(collection)
+            overhead += collection.nbytes()
+            sample = []
+        elif isinstance(collection, (LessonCatalog, GameplayStats)):
+            # Bounded by configuration, so walked in full instead of sampled.
+            count = len(collection)
+            overhead = deep_sizeof(collection, seen)
+            sample = []
+        elif isinstance(collection, LogIndex):
+            count = len(collection)
+            sample = [collection[seq] for seq in _stride(range(count), count, sample_size)]
+            extra = count * len(collection.keys) * POSTING_BYTES
+        else:
+            count = len(collection)
+            sample = _stride(collection.values(), count, sample_size)
+        sampled_bytes = sum(deep_sizeof(item, seen) for item in sample)
+        per_entry = sampled_bytes / len(sample) if sample else 0.0
+        return MemoryCollectionOut(
+            name=name,
+            kind=type(collection).__name__,
+            entries=count,
+            sampled=len(sample),
+            bytes_per_entry=round(per_entry, 1),
+            estimated_bytes=int(overhead + extra + per_entry * count),
+        )
+
+    def _filtered_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def _snapshot_out(
+        self, snapshot_id: int, taken_at: str, snapshot: tracemalloc.Snapshot
+    ) -> MemorySnapshotOut:
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        return MemorySnapshotOut(id=snapshot_id, taken_at=taken_at, traced_bytes=traced)
+
+    def _rss_bytes(self) -> Optional[int]:
+        try:
+            with open("/proc/self/statm", "r", encoding="ascii") as handle:
+                resident_pages = int(handle.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@lru_cache(maxsize=None)
+def get_debug_service() -> DebugService:
+    return DebugService(get_store())
@@ -0,0 +1,125 @@
+import json
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.services.log_service import (
+    LOG_KIND_ERROR,
+    LOG_KIND_GAME_SESSION,
+    LogService,
+    get_log_service,
+)
+from app.storage.memory import MemoryStore, PlayerProfile, RankingEntry, get_store
+
+LINES_PER_CHUNK = 256
+
+
+class ExportService:
+    def __init__(self, store: MemoryStore, log_service: LogService) -> None:
+        self._store = store
+        self._log_service = log_service
+
+    def ranking(self, since: Optional[datetime]) -> Iterator[bytes]:
+        threshold = self._epoch(since)
+        return self._chunks(
+            self._ranking_row(entry)
+            for entry in self._store.iter_ranking()
+            if threshold is None or self._parse_timestamp(entry.updated_at) >= threshold
+        )
+
+    def profiles(self, since: Optional[datetime]) -> Iterator[bytes]:
+        threshold = self._as_date(since)
+        return self._chunks(
+            self._profile_row(profile)
+            for profile in self._store.iter_profiles()
+            if threshold is None or self._last_active(profile) >= threshold
+        )
+
+    def logs(self, since: Optional[datetime], kind: Optional[str]) -> Iterator[bytes]:
+        return self._chunks(self._log_rows(self._epoch(since), kind))
+
+    def _log_rows(
+        self, threshold: Optional[float], kind: Optional[str]
+    ) -> Iterator[Dict[str, Any]]:
+        if kind in (None, LOG_KIND_ERROR):
+            for entry in self._store.iter_error_logs(threshold):
+                yield {"kind": LOG_KIND_ERROR, **self._log_service.with_error_message(entry)}
+        if kind in (None, LOG_KIND_GAME_SESSION):
+            for entry in self._store.iter_game_session_logs(threshold):
+                yield {"kind": LOG_KIND_GAME_SESSION, **entry}
+
+    def _chunks(self, rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        buffer = []
+        for row in rows:
+            buffer.append(json.dumps(row, separators=(",", ":"), default=str))
+            if len(buffer) >= LINES_PER_CHUNK:
+                yield ("\n".join(buffer) + "\n").encode("utf-8")
+                buffer = []
+        if buffer:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+    def _ranking_row(self, entry: RankingEntry) -> Dict[str, Any]:
+        return {
+            "user_id": entry.user_id,
+            "display_name": entry.display_name,
+            "xp": entry.xp,
+            "level": entry.level,
+            "updated_at": entry.updated_at,
+        }
+
+    def _profile_row(self, profile: PlayerProfile) -> Dict[str, Any]:
+        return {
+            "id": profile.id,
+            "email": profile.email,
+            "display_name": profile.display_name,
+            "language": profile.language,
+            "xp": profile.xp,
+            "level": profile.level,
+            "progress": profile.progress.to_dict(),
+            "current_streak": profile.current_streak,
+            "longest_streak": profile.longest_streak,
+            "last_login_date": profile.last_login_date,
+            "lessons_completed_today": profile.lessons_completed_today,
+            "last_lesson_date": profile.last_lesson_date,
+            "stats": {
+                "games_played": profile.stats.games_played,
+                "questions_answered": profile.stats.questions_answered,
+                "correct_answers": profile.stats.correct_answers,
+            },
+        }
+
+    def _last_active(self, profile: PlayerProfile) -> date:
+        latest = date.min
+        for value in (profile.last_login_date, profile.last_lesson_date):
+            if not value:
+                continue
+            try:
+                latest = max(latest, date.fromisoformat(value))
+            except ValueError:
+                continue
+        return latest
+
+    def _epoch(self, value: Optional[datetime]) -> Optional[float]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+
+    def _as_date(self, value: Optional[datetime]) -> Optional[date]:
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+
+    def _parse_timestamp(self, value: str) -> float:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+@lru_cache(maxsize=None)
+def get_export_service() -> ExportService:
+    return ExportService(get_store(), get_log_service())
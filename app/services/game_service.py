@@ -1,24 +1,36 @@
 import random
+import time
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 from fastapi import HTTPException
 
 from app.core.progression import calculate_level
+from app.core.tracing import trace_methods
 from app.models.schemas import GameAnswerOut, GameFinishOut, GameStartOut, QuestionOut
 from app.storage.memory import (
     GameSessionRecord,
     MemoryStore,
     QuestionRecord,
-    RankingEntry,
     PlayerProfile,
-    store,
+    get_store,
 )
 
+GAME_FINISHED = "game_finished"
 
+
+@trace_methods("_claim_finish", "_apply_result")
 class GameService:
     def __init__(self, store: MemoryStore) -> None:
         self._store = store
+        # Derived work runs on the store's event worker after /game/finish
+        # has responded; re-subscribing by name keeps this safe per instance.
+        store.events.subscribe(GAME_FINISHED, "ranking", self._sync_ranking_entry)
+        store.events.subscribe(GAME_FINISHED, "gameplay_stats", self._record_finish_stats)
+        store.events.subscribe(GAME_FINISHED, "session_log", self._log_finished_session)
+        store.events.subscribe(GAME_FINISHED, "game_history", self._record_history)
 
     def start(self, user_id: str, level: int, question_count: int) -> GameStartOut:
         if question_count <= 0:
@@ -32,14 +44,16 @@ class GameService:
             selected = questions
         else:
             selected = random.sample(questions, question_count)
-        session = GameSessionRecord(
+        session = GameSessionRecord.create(
             id=str(uuid.uuid4()),
             user_id=user_id,
             level=level,
-            question_ids=[question.id for question in selected],
+            layout=self._store.get_session_layout(selected),
             time_limit_seconds=self._time_limit(level),
+            started_at=time.time(),
         )
         self._store.create_game_session(session)
+        self._store.gameplay_stats.record_start(session.started_at)
         return GameStartOut(
             session_id=session.id,
             level=level,
@@ -51,58 +65,68 @@ class GameService:
         session = self._get_session_or_404(session_id)
         if session.finished:
             raise HTTPException(status_code=409, detail="Session already finished")
-        if question_id not in session.question_ids:
+        layout = session.layout
+        position = layout.positions.get(question_id)
+        if position is None:
             raise HTTPException(status_code=400, detail="Question not in session")
-        question = self._store.get_question(question_id)
-        if not question:
-            raise HTTPException(status_code=404, detail="Question not found")
-        normalized = answer.strip().lower()
-        expected = question.answer.strip().lower()
-        previous = session.answers.get(question_id)
-        previous_correct = False
-        if previous is not None:
-            previous_correct = previous.strip().lower() == expected
-        correct = normalized == expected
-        session.answers[question_id] = answer
-        if previous is None:
-            if correct:
-                session.correct_count += 1
-        else:
-            if previous_correct and not correct:
-                session.correct_count -= 1
-            elif not previous_correct and correct:
-                session.correct_count += 1
+        correct = layout.graders[position].grade(answer)
+        recorded = self._store.update_game_session(
+            session_id,
+            lambda locked: self._record_answer(locked, position, answer, correct),
+        )
+        if recorded is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        current_correct, first_answer = recorded
+        # Re-answering a question is not another attempt at it; only the
+        # first answer counts towards per-operation accuracy.
+        if first_answer:
+            self._store.gameplay_stats.record_answer(
+                layout.operations[position], session.level, correct, time.time()
+            )
+        correct_answer = None
+        if not correct:
+            question = self._store.get_question(question_id)
+            if not question:
+                raise HTTPException(status_code=404, detail="Question not found")
+            correct_answer = question.answer
         return GameAnswerOut(
             correct=correct,
-            correct_answer=None if correct else question.answer,
-            current_correct=session.correct_count,
+            correct_answer=correct_answer,
+            current_correct=current_correct,
         )
 
     def finish(self, session_id: str) -> GameFinishOut:
         session = self._get_session_or_404(session_id)
-        if session.finished:
-            raise HTTPException(status_code=409, detail="Session already finished")
-        session.finished = True
+        correct_answers = self._store.update_game_session(session_id, self._claim_finish)
+        if correct_answers is None:
+            raise HTTPException(status_code=404, detail="Session not found")
         total_questions = len(session.question_ids)
-        correct_answers = session.correct_count
+        finished_at = time.time()
         xp_earned = correct_answers * 10
-        profile = self._store.get_profile(session.user_id)
-        if not profile:
+        totals = self._store.update_profile(
+            session.user_id,
+            lambda profile: self._apply_result(
+                profile, total_questions, correct_answers, xp_earned
+            ),
+        )
+        if totals is None:
             raise HTTPException(status_code=404, detail="User profile not found")
-        profile.xp += xp_earned
-        profile.level = calculate_level(profile.xp)
-        profile.stats.games_played += 1
-        profile.stats.questions_answered += total_questions
-        profile.stats.correct_answers += correct_answers
-        self._update_daily_lessons(profile)
-        self._store.set_ranking_entry(
-            RankingEntry(
-                user_id=profile.id,
-                display_name=self._display_name(profile),
-                xp=profile.xp,
-                level=profile.level,
-                updated_at=self._timestamp(),
-            )
+        total_xp, level = totals
+        self._store.events.publish(
+            GAME_FINISHED,
+            session.id,
+            {
+                "session_id": session.id,
+                "user_id": session.user_id,
+                "correct_answers": correct_answers,
+                "total_questions": total_questions,
+                "xp_earned": xp_earned,
+                "total_xp": total_xp,
+                "level": level,
+                "session_level": session.level,
+                "started_at": session.started_at,
+                "finished_at": finished_at,
+            },
         )
         return GameFinishOut(
             session_id=session.id,
@@ -110,8 +134,90 @@ class GameService:
             correct_answers=correct_answers,
             total_questions=total_questions,
             xp_earned=xp_earned,
-            total_xp=profile.xp,
-            level=profile.level,
+            total_xp=total_xp,
+            level=level,
+        )
+
+    def _record_answer(
+        self, session: GameSessionRecord, position: int, answer: str, correct: bool
+    ) -> Tuple[int, bool]:
+        if session.finished:
+            raise HTTPException(status_code=409, detail="Session already finished")
+        first_answer = session.answers[position] is None
+        bit = 1 << position
+        previous_correct = bool(session.correct_mask & bit)
+        session.answers[position] = answer
+        if correct and not previous_correct:
+            session.correct_mask |= bit
+            session.correct_count += 1
+        elif previous_correct and not correct:
+            session.correct_mask &= ~bit
+            session.correct_count -= 1
+        return session.correct_count, first_answer
+
+    def _claim_finish(self, session: GameSessionRecord) -> int:
+        if session.finished:
+            raise HTTPException(status_code=409, detail="Session already finished")
+        session.finished = True
+        return session.correct_count
+
+    def _apply_result(
+        self,
+        profile: PlayerProfile,
+        total_questions: int,
+        correct_answers: int,
+        xp_earned: int,
+    ) -> Tuple[int, int]:
+        profile.xp += xp_earned
+        profile.level = calculate_level(profile.xp)
+        profile.stats.games_played += 1
+        profile.stats.questions_answered += total_questions
+        profile.stats.correct_answers += correct_answers
+        self._update_daily_lessons(profile)
+        return profile.xp, profile.level
+
+    def _sync_ranking_entry(self, event: Dict[str, Any]) -> None:
+        self._store.sync_ranking_entries(
+            (event["user_id"],), self._timestamp(event["finished_at"])
+        )
+
+    def _record_finish_stats(self, event: Dict[str, Any]) -> None:
+        self._store.gameplay_stats.record_finish(
+            event["correct_answers"],
+            event["total_questions"],
+            event["finished_at"] - event["started_at"],
+            event["finished_at"],
+        )
+
+    def _log_finished_session(self, event: Dict[str, Any]) -> None:
+        self._store.add_game_session_log(
+            {
+                # Same format as entries written by LogService.
+                "timestamp": self._timestamp(event["finished_at"]).replace("+00:00", "Z"),
+                "user_id": event["user_id"],
+                "session_id": event["session_id"],
+                "payload": {
+                    "event": GAME_FINISHED,
+                    "correct_answers": event["correct_answers"],
+                    "total_questions": event["total_questions"],
+                    "xp_earned": event["xp_earned"],
+                    "total_xp": event["total_xp"],
+                    "level": event["level"],
+                },
+            },
+            event["finished_at"],
+        )
+
+    def _record_history(self, event: Dict[str, Any]) -> None:
+        self._store.add_game_history(
+            event["user_id"],
+            event["session_id"],
+            event["session_level"],
+            event["correct_answers"],
+            event["total_questions"],
+            event["xp_earned"],
+            event["finished_at"] - event["started_at"],
+            event["finished_at"],
         )
 
     def _get_session_or_404(self, session_id: str) -> GameSessionRecord:
@@ -142,15 +248,10 @@ class GameService:
     def _today(self) -> str:
         return datetime.now(timezone.utc).date().isoformat()
 
-    def _timestamp(self) -> str:
-        return datetime.now(timezone.utc).isoformat()
-
-    def _display_name(self, profile: PlayerProfile) -> str:
-        return profile.display_name or profile.email or profile.id
-
-
-_service = GameService(store)
+    def _timestamp(self, epoch: float) -> str:
+        return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
 
 
+@lru_cache(maxsize=None)
 def get_game_service() -> GameService:
-    return _service
+    return GameService(get_store())
@@ -0,0 +1,198 @@
+import asyncio
+import heapq
+import json
+import threading
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.core.settings import get_settings
+from app.storage import changes
+from app.storage.changes import Change
+from app.storage.memory import MemoryStore, RankingEntry, get_store
+
+KEEPALIVE_SECONDS = 15.0
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# (user_id, display_name, xp, level, updated_at); a client-visible change is
+# any difference in the first four fields.
+_Row = Tuple[str, Optional[str], int, int, str]
+
+
+def _rank_key(entry: RankingEntry) -> Tuple[int, str]:
+    return (-entry.xp, entry.user_id)
+
+
+def _row_out(position: int, row: _Row) -> Dict[str, object]:
+    return {
+        "position": position,
+        "user_id": row[0],
+        "display_name": row[1],
+        "xp": row[2],
+        "level": row[3],
+        "updated_at": row[4],
+    }
+
+
+def _encode(message: Dict[str, object]) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+class Subscription:
+    __slots__ = ("queue", "needs_snapshot")
+
+    def __init__(self) -> None:
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.needs_snapshot = False
+
+
+class LeaderboardBroadcaster:
+    """Pushes the top-N ranking to every subscriber as coalesced diffs.
+
+    A ranking change only marks the user dirty. While anyone is
+    subscribed, a single task wakes every tick, recomputes the top-N once
+    if a dirty entry can affect it, and fans the same encoded diff out to
+    all subscriber queues. A subscriber that falls a full queue behind is
+    resynchronised with a snapshot instead of growing its backlog.
+    """
+
+    def __init__(self, store: MemoryStore, top_n: int, tick_seconds: float) -> None:
+        self._store = store
+        self._top_n = max(1, top_n)
+        self._tick_seconds = tick_seconds
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._top: List[_Row] = []
+        self._seq = 0
+        self._snapshot: Optional[str] = None
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional["asyncio.Task[None]"] = None
+        store.changes.subscribe(self._mark_dirty, (changes.RANKING,))
+
+    def subscribe(self) -> Subscription:
+        if self._task is None or self._task.done():
+            # Nobody was listening, so the cached top-N may be stale.
+            self._take_dirty()
+            self._replace_top(self._compute_top())
+            self._task = asyncio.ensure_future(self._run())
+        subscription = Subscription()
+        subscription.queue.put_nowait(self._snapshot_message())
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def messages(self, subscription: Subscription) -> AsyncIterator[Optional[str]]:
+        """Yield encoded messages; ``None`` marks an idle keepalive interval."""
+        while True:
+            if subscription.needs_snapshot:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.needs_snapshot = False
+                yield self._snapshot_message()
+                continue
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield None
+
+    def tick(self) -> None:
+        dirty = self._take_dirty()
+        if not dirty or not self._affects_top(dirty):
+            return
+        previous = self._top
+        self._replace_top(self._compute_top())
+        message = self._diff(previous, self._top)
+        if message is not None:
+            self._publish(message)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self._tick_seconds)
+            self.tick()
+
+    def _mark_dirty(self, change: Change) -> None:
+        with self._dirty_lock:
+            self._dirty.add(change.key)
+
+    def _take_dirty(self) -> Set[str]:
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def _affects_top(self, dirty: Set[str]) -> bool:
+        if len(self._top) < self._top_n:
+            return True
+        last = self._top[-1]
+        cutoff = (-last[2], last[0])
+        top_ids = {row[0] for row in self._top}
+        for user_id in dirty:
+            if user_id in top_ids:
+                return True
+            entry = self._store.get_ranking_entry(user_id)
+            if entry is not None and _rank_key(entry) < cutoff:
+                return True
+        return False
+
+    def _compute_top(self) -> List[_Row]:
+        entries = heapq.nsmallest(self._top_n, self._store.iter_ranking(), key=_rank_key)
+        return [
+            (entry.user_id, entry.display_name, entry.xp, entry.level, entry.updated_at)
+            for entry in entries
+        ]
+
+    def _replace_top(self, top: List[_Row]) -> None:
+        self._top = top
+        self._snapshot = None
+
+    def _diff(self, previous: List[_Row], current: List[_Row]) -> Optional[str]:
+        changed = [
+            _row_out(index + 1, row)
+            for index, row in enumerate(current)
+            if index >= len(previous) or previous[index][:4] != row[:4]
+        ]
+        current_ids = {row[0] for row in current}
+        removed = [row[0] for row in previous if row[0] not in current_ids]
+        if not changed and not removed and len(previous) == len(current):
+            return None
+        self._seq += 1
+        return _encode(
+            {
+                "type": "diff",
+                "seq": self._seq,
+                "size": len(current),
+                "changed": changed,
+                "removed": removed,
+            }
+        )
+
+    def _snapshot_message(self) -> str:
+        if self._snapshot is None:
+            self._snapshot = _encode(
+                {
+                    "type": "snapshot",
+                    "seq": self._seq,
+                    "size": len(self._top),
+                    "entries": [
+                        _row_out(index + 1, row) for index, row in enumerate(self._top)
+                    ],
+                }
+            )
+        return self._snapshot
+
+    def _publish(self, message: str) -> None:
+        for subscription in self._subscribers:
+            if subscription.needs_snapshot:
+                continue
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscription.needs_snapshot = True
+
+
+@lru_cache(maxsize=None)
+def get_leaderboard_broadcaster() -> LeaderboardBroadcaster:
+    settings = get_settings()
+    return LeaderboardBroadcaster(
+        get_store(), settings.leaderboard_top_n, settings.leaderboard_tick_ms / 1000
+    )
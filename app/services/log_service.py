@@ -1,40 +1,142 @@
-from datetime import datetime
+import heapq
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
 
-from app.models.schemas import ErrorLogIn, GameSessionLogIn, MessageOut
-from app.storage.memory import MemoryStore, store
+from fastapi import HTTPException
 
+from app.core.fingerprint import fingerprint_error
+from app.core.tracing import trace_methods
+from app.models.schemas import (
+    ErrorGroupOut,
+    ErrorLogIn,
+    GameSessionLogIn,
+    LogQueryOut,
+    MessageOut,
+)
+from app.storage.memory import ErrorGroup, MemoryStore, get_store
 
+LOG_KIND_ERROR = "error"
+LOG_KIND_GAME_SESSION = "game-session"
+
+
+@trace_methods()
 class LogService:
     def __init__(self, store: MemoryStore) -> None:
         self._store = store
 
     def log_error(self, payload: ErrorLogIn) -> MessageOut:
-        entry = {
-            "timestamp": self._timestamp(),
-            "user_id": payload.user_id,
-            "message": payload.message,
-            "stack": payload.stack,
-            "context": payload.context,
-        }
-        self._store.add_error_log(entry)
+        now = self._now()
+        self._store.record_error(
+            fingerprint_error(payload.message, payload.stack),
+            payload.message,
+            payload.stack,
+            payload.user_id,
+            payload.context,
+            self._timestamp(now),
+            now.timestamp(),
+        )
         return MessageOut(detail="Error logged")
 
+    def top_errors(self, limit: int, sort: str) -> List[ErrorGroupOut]:
+        if sort == "last_seen":
+            groups = heapq.nlargest(
+                limit, self._store.list_error_groups(), key=lambda group: group.last_seen
+            )
+        else:
+            groups = heapq.nlargest(
+                limit, self._store.list_error_groups(), key=lambda group: group.count
+            )
+        return [self._group_out(group) for group in groups]
+
     def log_game_session(self, payload: GameSessionLogIn) -> MessageOut:
+        now = self._now()
         entry = {
-            "timestamp": self._timestamp(),
+            "timestamp": self._timestamp(now),
             "user_id": payload.user_id,
             "session_id": payload.session_id,
             "payload": payload.payload,
         }
-        self._store.add_game_session_log(entry)
+        self._store.add_game_session_log(entry, now.timestamp())
         return MessageOut(detail="Game session logged")
 
-    def _timestamp(self) -> str:
-        return datetime.utcnow().isoformat() + "Z"
+    def query(
+        self,
+        kind: str,
+        user_id: Optional[str],
+        session_id: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        cursor: Optional[str],
+        limit: int,
+    ) -> LogQueryOut:
+        filters: Dict[str, str] = {}
+        if user_id is not None:
+            filters["user_id"] = user_id
+        if session_id is not None:
+            if kind == LOG_KIND_ERROR:
+                raise HTTPException(
+                    status_code=400, detail="session_id filter is not supported for error logs"
+                )
+            filters["session_id"] = session_id
+        position = self._parse_cursor(cursor)
+        if kind == LOG_KIND_ERROR:
+            query = self._store.query_error_logs
+        else:
+            query = self._store.query_game_session_logs
+        items, next_position = query(
+            filters, self._epoch(since), self._epoch(until), position, limit
+        )
+        if kind == LOG_KIND_ERROR:
+            entries = [self.with_error_message(entry) for _, entry in items]
+        else:
+            entries = [entry for _, entry in items]
+        return LogQueryOut(
+            items=entries,
+            next_cursor=None if next_position is None else str(next_position),
+        )
+
+    def with_error_message(self, entry: dict) -> dict:
+        group = self._store.get_error_group(entry["fingerprint"])
+        return {**entry, "message": group.message if group else None}
+
+    def _group_out(self, group: ErrorGroup) -> ErrorGroupOut:
+        return ErrorGroupOut(
+            fingerprint=group.fingerprint,
+            message=group.message,
+            stack=group.stack,
+            count=group.count,
+            first_seen=group.first_seen,
+            last_seen=group.last_seen,
+            affected_users=group.users.count(),
+            samples=list(group.samples),
+        )
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        if cursor is None:
+            return None
+        try:
+            position = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if position < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return position
+
+    def _epoch(self, value: Optional[datetime]) -> Optional[float]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
 
+    def _now(self) -> datetime:
+        return datetime.now(timezone.utc)
 
-_service = LogService(store)
+    def _timestamp(self, now: datetime) -> str:
+        return now.replace(tzinfo=None).isoformat() + "Z"
 
 
+@lru_cache(maxsize=None)
 def get_log_service() -> LogService:
-    return _service
+    return LogService(get_store())
@@ -1,39 +1,77 @@
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Union
 
 from fastapi import HTTPException
 
 from app.core.progression import calculate_level
-from app.models.schemas import ProgressOut
-from app.storage.memory import MemoryStore, store
+from app.core.tracing import trace_methods
+from app.models.schemas import ProgressDeltaOut, ProgressOut
+from app.storage.memory import MemoryStore, PlayerProfile, get_store
 
 
+@trace_methods()
 class ProgressService:
     def __init__(self, store: MemoryStore) -> None:
         self._store = store
 
     def update(
-        self, user_id: str, xp_delta: int, progress: Optional[Dict[str, int]]
-    ) -> ProgressOut:
+        self,
+        user_id: str,
+        xp_delta: int,
+        progress: Optional[Dict[str, int]],
+        delta: bool = False,
+    ) -> Union[ProgressOut, ProgressDeltaOut]:
+        result = self._store.update_profile(
+            user_id, lambda profile: self._apply_update(profile, xp_delta, progress, delta)
+        )
+        if result is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+        return result
+
+    def get_tag(self, user_id: str) -> str:
+        tag = self._store.get_profile_tag(user_id)
+        if tag is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+        return tag
+
+    def get(self, user_id: str) -> ProgressOut:
         profile = self._get_profile_or_404(user_id)
+        return self._to_out(profile)
+
+    def _apply_update(
+        self,
+        profile: PlayerProfile,
+        xp_delta: int,
+        progress: Optional[Dict[str, int]],
+        delta: bool,
+    ) -> Union[ProgressOut, ProgressDeltaOut]:
+        changed: Dict[str, int] = {}
+        if progress:
+            # Before the XP change, so a rejected update leaves the profile as it was.
+            try:
+                changed = profile.progress.update(progress)
+            except ValueError as error:
+                raise HTTPException(status_code=400, detail=str(error))
         if xp_delta:
             profile.xp = max(0, profile.xp + xp_delta)
-        if progress:
-            profile.progress.update(progress)
         profile.level = calculate_level(profile.xp)
-        return ProgressOut(
-            user_id=profile.id,
-            xp=profile.xp,
-            level=profile.level,
-            progress=profile.progress,
-        )
+        if delta:
+            return ProgressDeltaOut(
+                user_id=profile.id,
+                xp=profile.xp,
+                level=profile.level,
+                changed=changed,
+                progress_version=profile.progress.version,
+            )
+        return self._to_out(profile)
 
-    def get(self, user_id: str) -> ProgressOut:
-        profile = self._get_profile_or_404(user_id)
+    def _to_out(self, profile: PlayerProfile) -> ProgressOut:
         return ProgressOut(
             user_id=profile.id,
             xp=profile.xp,
             level=profile.level,
-            progress=profile.progress,
+            progress=profile.progress.to_dict(),
+            progress_version=profile.progress.version,
         )
 
     def _get_profile_or_404(self, user_id: str):
@@ -43,8 +81,6 @@ class ProgressService:
         return profile
 
 
-_service = ProgressService(store)
-
-
+@lru_cache(maxsize=None)
 def get_progress_service() -> ProgressService:
-    return _service
+    return ProgressService(get_store())
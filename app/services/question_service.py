@@ -1,37 +1,38 @@
+from functools import lru_cache
 from typing import List
 
 from fastapi import HTTPException
 
-from app.models.schemas import QuestionOut
-from app.storage.memory import MemoryStore, QuestionRecord, store
+from app.core.tracing import trace_methods
+from app.models.schemas import QuestionRow
+from app.storage.memory import MemoryStore, QuestionRecord, get_store
 
 
+@trace_methods()
 class QuestionService:
     def __init__(self, store: MemoryStore) -> None:
         self._store = store
 
-    def list_by_level(self, level: int) -> List[QuestionOut]:
+    def list_by_level(self, level: int) -> List[QuestionRow]:
         questions = self._store.list_questions_by_level(level)
         return [self._to_out(question) for question in questions]
 
-    def get_question(self, question_id: str) -> QuestionOut:
+    def get_question(self, question_id: str) -> QuestionRow:
         question = self._store.get_question(question_id)
         if not question:
             raise HTTPException(status_code=404, detail="Question not found")
         return self._to_out(question)
 
-    def _to_out(self, question: QuestionRecord) -> QuestionOut:
-        return QuestionOut(
-            id=question.id,
-            level=question.level,
-            operation=question.operation,
-            template=question.template,
-            choices=question.choices,
-        )
-
-
-_service = QuestionService(store)
+    def _to_out(self, question: QuestionRecord) -> QuestionRow:
+        return {
+            "id": question.id,
+            "level": question.level,
+            "operation": question.operation,
+            "template": question.template,
+            "choices": question.choices,
+        }
 
 
+@lru_cache(maxsize=None)
 def get_question_service() -> QuestionService:
-    return _service
+    return QuestionService(get_store())
@@ -1,12 +1,29 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 from fastapi import HTTPException
 
-from app.models.schemas import RankingEntryOut
-from app.storage.memory import MemoryStore, RankingEntry, store
+from app.core.tracing import trace_methods
+from app.models.schemas import (
+    BatchErrorOut,
+    RankingBatchOut,
+    RankingEntryOut,
+    RankingEntryRow,
+    RankingUpdateIn,
+)
+from app.storage.memory import (
+    MemoryStore,
+    PlayerProfile,
+    RankingEntry,
+    get_store,
+    ranking_name,
+)
 
+MAX_BATCH_SIZE = 5000
 
+
+@trace_methods("_entry_with_position", "_sorted_entries")
 class RankingService:
     def __init__(self, store: MemoryStore) -> None:
         self._store = store
@@ -14,42 +31,55 @@ class RankingService:
     def update(
         self, user_id: str, xp: Optional[int], level: Optional[int], display_name: Optional[str]
     ) -> RankingEntryOut:
-        profile = self._store.get_profile(user_id)
-        if profile:
-            if xp is not None:
-                profile.xp = xp
-            if level is not None:
-                profile.level = level
-            xp_value = profile.xp
-            level_value = profile.level
-            display_name = profile.display_name or profile.email
-        else:
-            if xp is None or level is None:
-                raise HTTPException(status_code=404, detail="User profile not found")
-            xp_value = xp
-            level_value = level
-        entry = RankingEntry(
-            user_id=user_id,
-            display_name=display_name,
-            xp=xp_value,
-            level=level_value,
-            updated_at=self._timestamp(),
-        )
-        self._store.set_ranking_entry(entry)
+        entry = self._write(user_id, xp, level, display_name, self._timestamp())
+        if entry is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
         return self._entry_with_position(entry)
 
-    def global_ranking(self) -> List[RankingEntryOut]:
+    def update_batch(
+        self, updates: List[RankingUpdateIn], include_positions: bool
+    ) -> RankingBatchOut:
+        """Apply every update, then rank once instead of once per item.
+
+        Items are applied in order, so a user listed twice keeps the last
+        values. Positions are only computed when ``include_positions`` is set.
+        """
+        if len(updates) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=413, detail=f"Batch size exceeds {MAX_BATCH_SIZE} items"
+            )
+        timestamp = self._timestamp()
+        result = RankingBatchOut(updated=0)
+        updated: Dict[str, None] = {}
+        for item in updates:
+            entry = self._write(item.user_id, item.xp, item.level, item.display_name, timestamp)
+            if entry is None:
+                result.errors.append(
+                    BatchErrorOut(
+                        user_id=item.user_id, status_code=404, detail="User profile not found"
+                    )
+                )
+            else:
+                updated[entry.user_id] = None
+        result.updated = len(updated)
+        if include_positions and updated:
+            for index, ranked in enumerate(self._sorted_entries(), start=1):
+                if ranked.user_id in updated:
+                    result.entries.append(self._to_out(ranked, index))
+        return result
+
+    def global_ranking(self) -> List[RankingEntryRow]:
         entries = self._sorted_entries()
         return [
-            RankingEntryOut(
-                user_id=entry.user_id,
-                display_name=entry.display_name,
-                xp=entry.xp,
-                level=entry.level,
-                position=index + 1,
-                updated_at=entry.updated_at,
-            )
-            for index, entry in enumerate(entries)
+            {
+                "user_id": entry.user_id,
+                "display_name": entry.display_name,
+                "xp": entry.xp,
+                "level": entry.level,
+                "position": index,
+                "updated_at": entry.updated_at,
+            }
+            for index, entry in enumerate(entries, start=1)
         ]
 
     def get_me(self, email: str) -> RankingEntryOut:
@@ -60,7 +90,7 @@ class RankingService:
         if not entry:
             entry = RankingEntry(
                 user_id=profile.id,
-                display_name=profile.display_name or profile.email,
+                display_name=ranking_name(profile),
                 xp=profile.xp,
                 level=profile.level,
                 updated_at=self._timestamp(),
@@ -68,20 +98,68 @@ class RankingService:
             self._store.set_ranking_entry(entry)
         return self._entry_with_position(entry)
 
+    def _write(
+        self,
+        user_id: str,
+        xp: Optional[int],
+        level: Optional[int],
+        display_name: Optional[str],
+        timestamp: str,
+    ) -> Optional[RankingEntry]:
+        """Update the profile and its entry, or store a profile-less entry.
+
+        Returns ``None`` when there is no profile and the update is partial.
+        """
+        entry = self._store.update_profile(
+            user_id, lambda profile: self._apply_update(profile, xp, level, timestamp)
+        )
+        if entry is None:
+            if xp is None or level is None:
+                return None
+            entry = RankingEntry(
+                user_id=user_id,
+                display_name=display_name,
+                xp=xp,
+                level=level,
+                updated_at=timestamp,
+            )
+            self._store.set_ranking_entry(entry)
+        return entry
+
+    def _apply_update(
+        self, profile: PlayerProfile, xp: Optional[int], level: Optional[int], timestamp: str
+    ) -> RankingEntry:
+        if xp is not None:
+            profile.xp = xp
+        if level is not None:
+            profile.level = level
+        entry = RankingEntry(
+            user_id=profile.id,
+            display_name=ranking_name(profile),
+            xp=profile.xp,
+            level=profile.level,
+            updated_at=timestamp,
+        )
+        self._store.set_ranking_entry(entry)
+        return entry
+
     def _entry_with_position(self, entry: RankingEntry) -> RankingEntryOut:
         entries = self._sorted_entries()
         for index, ranked in enumerate(entries, start=1):
             if ranked.user_id == entry.user_id:
-                return RankingEntryOut(
-                    user_id=ranked.user_id,
-                    display_name=ranked.display_name,
-                    xp=ranked.xp,
-                    level=ranked.level,
-                    position=index,
-                    updated_at=ranked.updated_at,
-                )
+                return self._to_out(ranked, index)
         raise HTTPException(status_code=404, detail="Ranking entry not found")
 
+    def _to_out(self, entry: RankingEntry, position: int) -> RankingEntryOut:
+        return RankingEntryOut(
+            user_id=entry.user_id,
+            display_name=entry.display_name,
+            xp=entry.xp,
+            level=entry.level,
+            position=position,
+            updated_at=entry.updated_at,
+        )
+
     def _sorted_entries(self) -> List[RankingEntry]:
         entries = self._store.list_ranking()
         entries.sort(key=lambda entry: (-entry.xp, entry.user_id))
@@ -91,8 +169,6 @@ class RankingService:
         return datetime.now(timezone.utc).isoformat()
 
 
-_service = RankingService(store)
-
-
+@lru_cache(maxsize=None)
 def get_ranking_service() -> RankingService:
-    return _service
+    return RankingService(get_store())
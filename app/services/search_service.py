@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import List
+
+from app.core.tracing import trace_methods
+from app.models.schemas import PlayerSearchResultOut
+from app.storage import changes
+from app.storage.changes import Change
+from app.storage.memory import MemoryStore, get_store
+from app.storage.search import PlayerSearchIndex
+
+
+@trace_methods()
+class SearchService:
+    """Player search kept current by the store's profile changes.
+
+    The feed subscription is taken before the backfill, so a profile
+    written while existing ones are being indexed is not missed.
+    """
+
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+        self._index = PlayerSearchIndex()
+        store.changes.subscribe(self._on_profile_change, (changes.PROFILE,))
+        for profile in store.iter_profiles():
+            self._index.index(profile.id, profile.display_name)
+
+    def search(self, query: str, limit: int) -> List[PlayerSearchResultOut]:
+        results = []
+        for hit in self._index.search(query, limit):
+            profile = self._store.get_profile(hit.user_id)
+            if profile is None:
+                continue
+            results.append(
+                PlayerSearchResultOut(
+                    user_id=profile.id,
+                    display_name=profile.display_name,
+                    level=profile.level,
+                    xp=profile.xp,
+                    match=hit.match,
+                    score=hit.score,
+                )
+            )
+        return results
+
+    def _on_profile_change(self, change: Change) -> None:
+        # Runs on the feed's dispatcher thread; the index returns early
+        # when the display name is unchanged.
+        profile = self._store.get_profile(change.key)
+        if profile is not None:
+            self._index.index(profile.id, profile.display_name)
+
+
+@lru_cache(maxsize=None)
+def get_search_service() -> SearchService:
+    return SearchService(get_store())
@@ -0,0 +1,69 @@
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from app.core.tracing import trace_methods
+from app.models.schemas import GlobalStatsOut, HistogramOut, HourlyStatsOut, OperationStatsOut
+from app.storage.memory import MemoryStore, get_store
+from app.storage.stats import Histogram
+
+
+@trace_methods()
+class StatsService:
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+
+    def global_stats(self, hours: int) -> GlobalStatsOut:
+        current_hour = int(time.time() // 3600)
+        snapshot = self._store.gameplay_stats.snapshot(current_hour - hours + 1)
+        by_operation = [
+            OperationStatsOut(
+                operation=operation,
+                level=level,
+                answers=counter.answers,
+                correct_answers=counter.correct,
+                accuracy=self._ratio(counter.correct, counter.answers),
+            )
+            for (operation, level), counter in sorted(snapshot.by_operation.items())
+        ]
+        answers = sum(item.answers for item in by_operation)
+        correct = sum(item.correct_answers for item in by_operation)
+        return GlobalStatsOut(
+            games_started=snapshot.games_started,
+            games_finished=snapshot.games_finished,
+            answers=answers,
+            correct_answers=correct,
+            accuracy=self._ratio(correct, answers),
+            by_operation=by_operation,
+            hourly=[
+                HourlyStatsOut(
+                    hour=datetime.fromtimestamp(hour * 3600, timezone.utc).isoformat(),
+                    games_started=counter.games_started,
+                    games_finished=counter.games_finished,
+                    answers=counter.answers,
+                    correct_answers=counter.correct,
+                )
+                for hour, counter in snapshot.hourly
+            ],
+            game_duration_seconds=self._histogram_out(snapshot.durations),
+            score_ratio=self._histogram_out(snapshot.scores),
+        )
+
+    def _histogram_out(self, histogram: Histogram) -> HistogramOut:
+        return HistogramOut(
+            bounds=list(histogram.bounds),
+            counts=histogram.counts,
+            count=histogram.count,
+            mean=histogram.total / histogram.count if histogram.count else None,
+            p50=histogram.quantile(0.5),
+            p90=histogram.quantile(0.9),
+            p99=histogram.quantile(0.99),
+        )
+
+    def _ratio(self, part: int, whole: int) -> float:
+        return part / whole if whole else 0.0
+
+
+@lru_cache(maxsize=None)
+def get_stats_service() -> StatsService:
+    return StatsService(get_store())
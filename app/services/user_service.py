@@ -1,10 +1,36 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
 from fastapi import HTTPException
 
 from app.core.progression import calculate_level
-from app.models.schemas import ProfileOut, UserCreateIn, UserStatsOut, UserUpdateIn
-from app.storage.memory import MemoryStore, PlayerProfile, PlayerStats, store
+from app.core.tracing import trace_methods
+from app.models.schemas import (
+    BatchErrorOut,
+    GameHistoryEntryOut,
+    GameHistoryOut,
+    ProfileBatchOut,
+    ProfileOut,
+    ProfileRow,
+    UserBatchUpdateItemIn,
+    UserCreateIn,
+    UserStatsOut,
+    UserUpdateIn,
+)
+from app.storage.memory import (
+    GameHistoryRecord,
+    MemoryStore,
+    PlayerProfile,
+    PlayerStats,
+    ProgressVector,
+    get_store,
+)
+
+MAX_BATCH_SIZE = 5000
 
 
+@trace_methods()
 class UserService:
     def __init__(self, store: MemoryStore) -> None:
         self._store = store
@@ -35,7 +61,7 @@ class UserService:
             language=payload.language or "pt",
             xp=xp_value,
             level=level_value,
-            progress=payload.progress or {},
+            progress=self._progress_vector(payload.progress),
             current_streak=current_streak,
             longest_streak=longest_streak,
             last_login_date=payload.last_login_date,
@@ -43,15 +69,95 @@ class UserService:
             last_lesson_date=payload.last_lesson_date,
             stats=PlayerStats(),
         )
-        self._store.set_profile(user_id, profile)
+        if self._store.add_profile(user_id, profile) is not profile:
+            raise HTTPException(status_code=409, detail="User already exists")
         return self._to_out(profile)
 
-    def get_profile(self, user_id: str) -> ProfileOut:
+    def get_profile(self, user_id: str) -> ProfileRow:
         profile = self._get_profile_or_404(user_id)
-        return self._to_out(profile)
+        return self._to_row(profile)
+
+    def get_tag(self, user_id: str) -> str:
+        tag = self._store.get_profile_tag(user_id)
+        if tag is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+        return tag
 
     def update_profile(self, user_id: str, payload: UserUpdateIn) -> ProfileOut:
+        result = self._store.update_profile(
+            user_id, lambda profile: self._apply_update(profile, payload)
+        )
+        if result is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+        self._sync_ranking([user_id], self._timestamp())
+        return result
+
+    def batch_get(self, user_ids: List[str]) -> ProfileBatchOut:
+        self._check_batch_size(len(user_ids))
+        result = ProfileBatchOut()
+        for user_id in dict.fromkeys(user_ids):
+            profile = self._store.get_profile(user_id)
+            if profile is None:
+                result.errors.append(self._not_found(user_id))
+            else:
+                result.profiles.append(self._to_out(profile))
+        return result
+
+    def batch_update(self, updates: List[UserBatchUpdateItemIn]) -> ProfileBatchOut:
+        self._check_batch_size(len(updates))
+        result = ProfileBatchOut()
+        updated: Dict[str, None] = {}
+        for item in updates:
+            try:
+                out = self._store.update_profile(
+                    item.user_id, lambda profile: self._apply_update(profile, item)
+                )
+            except HTTPException as error:
+                result.errors.append(
+                    BatchErrorOut(
+                        user_id=item.user_id, status_code=error.status_code, detail=error.detail
+                    )
+                )
+                continue
+            if out is None:
+                result.errors.append(self._not_found(item.user_id))
+            else:
+                result.profiles.append(out)
+                updated[item.user_id] = None
+        # Ranking entries are synced once for the whole batch, after every
+        # item is applied, and all share the same timestamp.
+        self._sync_ranking(updated, self._timestamp())
+        return result
+
+    def get_stats(self, user_id: str) -> UserStatsOut:
         profile = self._get_profile_or_404(user_id)
+        stats = profile.stats
+        accuracy = 0.0
+        if stats.questions_answered:
+            accuracy = stats.correct_answers / stats.questions_answered
+        return UserStatsOut(
+            user_id=profile.id,
+            games_played=stats.games_played,
+            questions_answered=stats.questions_answered,
+            correct_answers=stats.correct_answers,
+            accuracy=accuracy,
+        )
+
+    def get_games(self, user_id: str, cursor: Optional[str], limit: int) -> GameHistoryOut:
+        self._get_profile_or_404(user_id)
+        records, next_position = self._store.page_game_history(
+            user_id, self._parse_cursor(cursor), limit
+        )
+        return GameHistoryOut(
+            items=[self._game_out(record) for record in records],
+            next_cursor=None if next_position is None else str(next_position),
+        )
+
+    def _apply_update(self, profile: PlayerProfile, payload: UserUpdateIn) -> ProfileOut:
+        # Progress goes first: it is the only part that can be rejected, and
+        # a rejected update must leave the profile untouched.
+        if payload.progress is not None:
+            self._update_progress(profile, payload.progress)
         if payload.display_name is not None:
             profile.display_name = payload.display_name
         if payload.language is not None:
@@ -62,8 +168,6 @@ class UserService:
                 profile.level = calculate_level(profile.xp)
         if payload.level is not None:
             profile.level = payload.level
-        if payload.progress is not None:
-            profile.progress.update(payload.progress)
         if payload.current_streak is not None:
             profile.current_streak = payload.current_streak
         if payload.longest_streak is not None:
@@ -76,18 +180,55 @@ class UserService:
             profile.last_lesson_date = payload.last_lesson_date
         return self._to_out(profile)
 
-    def get_stats(self, user_id: str) -> UserStatsOut:
-        profile = self._get_profile_or_404(user_id)
-        stats = profile.stats
-        accuracy = 0.0
-        if stats.questions_answered:
-            accuracy = stats.correct_answers / stats.questions_answered
-        return UserStatsOut(
-            user_id=profile.id,
-            games_played=stats.games_played,
-            questions_answered=stats.questions_answered,
-            correct_answers=stats.correct_answers,
-            accuracy=accuracy,
+    def _sync_ranking(self, user_ids: Iterable[str], timestamp: str) -> None:
+        # Profile edits only refresh players already on the leaderboard;
+        # entries are created by games and ranking updates.
+        self._store.sync_ranking_entries(user_ids, timestamp, create=False)
+
+    def _progress_vector(self, values: Optional[Dict[str, int]]) -> ProgressVector:
+        try:
+            return ProgressVector(values, self._store.lessons)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    def _update_progress(self, profile: PlayerProfile, values: Dict[str, int]) -> None:
+        try:
+            profile.progress.update(values)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    def _check_batch_size(self, size: int) -> None:
+        if size > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=413, detail=f"Batch size exceeds {MAX_BATCH_SIZE} items"
+            )
+
+    def _not_found(self, user_id: str) -> BatchErrorOut:
+        return BatchErrorOut(user_id=user_id, status_code=404, detail="User profile not found")
+
+    def _timestamp(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        if cursor is None:
+            return None
+        try:
+            position = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if position < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return position
+
+    def _game_out(self, record: GameHistoryRecord) -> GameHistoryEntryOut:
+        return GameHistoryEntryOut(
+            session_id=record.session_id,
+            level=record.level,
+            correct_answers=record.correct_answers,
+            total_questions=record.total_questions,
+            xp_earned=record.xp_earned,
+            duration_seconds=round(record.duration_seconds, 3),
+            finished_at=datetime.fromtimestamp(record.finished_at, timezone.utc).isoformat(),
         )
 
     def _get_profile_or_404(self, user_id: str) -> PlayerProfile:
@@ -97,24 +238,25 @@ class UserService:
         return profile
 
     def _to_out(self, profile: PlayerProfile) -> ProfileOut:
-        return ProfileOut(
-            id=profile.id,
-            email=profile.email,
-            display_name=profile.display_name,
-            language=profile.language,
-            xp=profile.xp,
-            level=profile.level,
-            progress=profile.progress,
-            current_streak=profile.current_streak,
-            longest_streak=profile.longest_streak,
-            last_login_date=profile.last_login_date,
-            lessons_completed_today=profile.lessons_completed_today,
-            last_lesson_date=profile.last_lesson_date,
-        )
-
+        return ProfileOut(**self._to_row(profile))
 
-_service = UserService(store)
+    def _to_row(self, profile: PlayerProfile) -> ProfileRow:
+        return {
+            "id": profile.id,
+            "email": profile.email,
+            "display_name": profile.display_name,
+            "language": profile.language,
+            "xp": profile.xp,
+            "level": profile.level,
+            "progress": profile.progress.to_dict(),
+            "current_streak": profile.current_streak,
+            "longest_streak": profile.longest_streak,
+            "last_login_date": profile.last_login_date,
+            "lessons_completed_today": profile.lessons_completed_today,
+            "last_lesson_date": profile.last_lesson_date,
+        }
 
 
+@lru_cache(maxsize=None)
 def get_user_service() -> UserService:
-    return _service
+    return UserService(get_store())
@@ -0,0 +1,158 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, Optional, Tuple
+
+USER = "user"
+PROFILE = "profile"
+RANKING = "ranking"
+GAME_SESSION = "game_session"
+GAME_HISTORY = "game_history"
+AUTH_SESSION = "auth_session"
+REVOKED_SESSION = "revoked_session"
+RESET_TOKEN = "reset_token"
+ERROR_GROUP = "error_group"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+DEFAULT_PENDING_CHANGES = 100_000
+
+
+class Change:
+    """One store write.
+
+    ``seq`` orders every change across entities. ``version`` increases per
+    key: it is the profile version for profiles and ``seq`` for entities
+    that carry no version of their own.
+    """
+
+    __slots__ = ("seq", "entity", "key", "version", "op")
+
+    def __init__(self, seq: int, entity: str, key: str, version: int, op: str) -> None:
+        self.seq = seq
+        self.entity = entity
+        self.key = key
+        self.version = version
+        self.op = op
+
+    def __repr__(self) -> str:
+        return f"Change({self.seq}, {self.entity}, {self.key!r}, v{self.version}, {self.op})"
+
+
+ChangeListener = Callable[[Change], None]
+
+
+class ChangeFeed:
+    """Ordered feed of store writes with in-process subscribers.
+
+    Writers only take the feed lock to number a change and queue it, so
+    emitting from under a shard lock stays cheap whatever the subscribers
+    do. One dispatcher thread delivers queued changes to subscribers in
+    ``seq`` order, outside every store lock. Delivery is therefore
+    asynchronous: a subscriber may see a change after the write has
+    returned, and ``drain`` waits for it. A listener that raises is
+    counted in ``failed`` and does not stop delivery to the others.
+    With no subscribers a write only costs a sequence number.
+
+    At most ``max_pending`` changes wait for delivery. If a subscriber
+    falls that far behind, the oldest queued changes are dropped and
+    counted in ``dropped``; subscribers see a gap in ``seq``.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_PENDING_CHANGES) -> None:
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._pending: Deque[Change] = deque(maxlen=max(1, max_pending))
+        self._delivering = False
+        self._subscribers: Dict[int, Tuple[Optional[FrozenSet[str]], ChangeListener]] = {}
+        self._next_id = 1
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self.failed = 0
+        self.dropped = 0
+
+    def subscribe(
+        self, listener: ChangeListener, entities: Optional[Iterable[str]] = None
+    ) -> int:
+        """Call ``listener`` for changes to ``entities`` (all when ``None``)."""
+        wanted = frozenset(entities) if entities is not None else None
+        with self._lock:
+            subscription_id = self._next_id
+            self._next_id += 1
+            self._subscribers[subscription_id] = (wanted, listener)
+        return subscription_id
+
+    def unsubscribe(self, subscription_id: int) -> None:
+        with self._lock:
+            self._subscribers.pop(subscription_id, None)
+
+    def emit(
+        self, entity: str, key: str, version: Optional[int] = None, op: str = UPSERT
+    ) -> None:
+        if not self._subscribers:
+            next(self._counter)
+            return
+        with self._lock:
+            seq = next(self._counter)
+            if self._closed:
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(
+                Change(seq, entity, key, seq if version is None else version, op)
+            )
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="change-feed", daemon=True
+                )
+                self._worker.start()
+            self._ready.notify()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every emitted change is delivered; ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._pending or self._delivering:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Deliver what is queued, then stop the dispatcher."""
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+            self._ready.notify()
+        if worker is not None:
+            worker.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._ready.wait()
+                if not self._pending:
+                    self._worker = None
+                    self._idle.notify_all()
+                    return
+                batch = list(self._pending)
+                self._pending.clear()
+                self._delivering = True
+                subscribers = list(self._subscribers.values())
+            for change in batch:
+                for wanted, listener in subscribers:
+                    if wanted is None or change.entity in wanted:
+                        try:
+                            listener(change)
+                        except Exception:
+                            self.failed += 1
+            with self._lock:
+                self._delivering = False
+                if not self._pending:
+                    self._idle.notify_all()
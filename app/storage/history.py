@@ -0,0 +1,123 @@
+import sys
+import threading
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Tuple
+
+DEFAULT_GAME_HISTORY_LIMIT = 200
+
+
+class GameHistoryRecord:
+    """One finished game as kept in a player's history."""
+
+    __slots__ = (
+        "seq",
+        "session_id",
+        "level",
+        "correct_answers",
+        "total_questions",
+        "xp_earned",
+        "duration_seconds",
+        "finished_at",
+    )
+
+    def __init__(
+        self,
+        seq: int,
+        session_id: str,
+        level: int,
+        correct_answers: int,
+        total_questions: int,
+        xp_earned: int,
+        duration_seconds: float,
+        finished_at: float,
+    ) -> None:
+        self.seq = seq
+        self.session_id = session_id
+        self.level = level
+        self.correct_answers = correct_answers
+        self.total_questions = total_questions
+        self.xp_earned = xp_earned
+        self.duration_seconds = duration_seconds
+        self.finished_at = finished_at
+
+
+class _UserGames:
+    __slots__ = ("records", "next_seq")
+
+    def __init__(self, limit: int) -> None:
+        self.records: Deque[GameHistoryRecord] = deque(maxlen=limit)
+        self.next_seq = 0
+
+
+class GameHistory:
+    """Per-player finished games, newest last, capped at ``limit`` each.
+
+    Every player numbers their games from 0 in finish order. The retained
+    records are always a contiguous run of those numbers, so a cursor maps
+    to a deque position by subtraction and a page costs its own size.
+    """
+
+    def __init__(self, limit: int = DEFAULT_GAME_HISTORY_LIMIT) -> None:
+        self._limit = max(1, limit)
+        self._users: Dict[str, _UserGames] = {}
+        self._lock = threading.Lock()
+
+    def append(
+        self,
+        user_id: str,
+        session_id: str,
+        level: int,
+        correct_answers: int,
+        total_questions: int,
+        xp_earned: int,
+        duration_seconds: float,
+        finished_at: float,
+    ) -> GameHistoryRecord:
+        with self._lock:
+            games = self._users.get(user_id)
+            if games is None:
+                games = self._users[user_id] = _UserGames(self._limit)
+            record = GameHistoryRecord(
+                games.next_seq,
+                session_id,
+                level,
+                correct_answers,
+                total_questions,
+                xp_earned,
+                duration_seconds,
+                finished_at,
+            )
+            games.records.append(record)
+            games.next_seq += 1
+            return record
+
+    def __len__(self) -> int:
+        """Number of players with a history."""
+        return len(self._users)
+
+    def table_sizeof(self) -> int:
+        """Bytes used by the per-player table itself, excluding its values."""
+        return sys.getsizeof(self._users)
+
+    def sample(self, size: int) -> List[Tuple[str, _UserGames]]:
+        """About ``size`` players' histories, strided evenly across the table."""
+        with self._lock:
+            step = max(1, len(self._users) // max(1, size))
+            return list(islice(self._users.items(), 0, step * size, step))
+
+    def page(
+        self, user_id: str, before: Optional[int], limit: int
+    ) -> Tuple[List[GameHistoryRecord], Optional[int]]:
+        """Up to ``limit`` records older than ``before`` (newest first) and the next cursor."""
+        with self._lock:
+            games = self._users.get(user_id)
+            if games is None or limit <= 0:
+                return [], None
+            records = games.records
+            first_seq = games.next_seq - len(records)
+            end = games.next_seq if before is None else min(before, games.next_seq)
+            start = max(first_seq, end - limit)
+            page = [records[seq - first_seq] for seq in range(end - 1, start - 1, -1)]
+        next_cursor = start if page and start > first_seq else None
+        return page, next_cursor
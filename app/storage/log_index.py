@@ -0,0 +1,148 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+SEGMENT_SIZE = 4096
+
+
+class LogIndex:
+    """Append-only log with per-key posting lists and time-ordered segments.
+
+    Entries get a sequence number in arrival order. Timestamps are clamped to
+    be non-decreasing, so sequence order is also time order and a time range
+    maps to a sequence range with two binary searches. Each indexed key keeps
+    a posting list (sorted sequence numbers) per value.
+    """
+
+    def __init__(self, keys: Sequence[str], segment_size: int = SEGMENT_SIZE) -> None:
+        self._keys = tuple(keys)
+        self._segment_size = segment_size
+        self._segments: List[List[dict]] = []
+        self._segment_times: List[array] = []
+        self._segment_starts = array("d")
+        self._postings: Dict[str, Dict[str, array]] = {key: {} for key in self._keys}
+        self._count = 0
+        self._last_timestamp = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return self._keys
+
+    def append(self, entry: dict, timestamp: float) -> int:
+        with self._lock:
+            timestamp = max(timestamp, self._last_timestamp)
+            self._last_timestamp = timestamp
+            seq = self._count
+            if seq % self._segment_size == 0:
+                self._segments.append([])
+                self._segment_times.append(array("d"))
+                self._segment_starts.append(timestamp)
+            self._segments[-1].append(entry)
+            self._segment_times[-1].append(timestamp)
+            for key in self._keys:
+                value = entry.get(key)
+                if value is None:
+                    continue
+                postings = self._postings[key].get(value)
+                if postings is None:
+                    postings = self._postings[key][value] = array("q")
+                postings.append(seq)
+            self._count = seq + 1
+            return seq
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, seq: int) -> dict:
+        if seq < 0 or seq >= self._count:
+            raise IndexError(seq)
+        return self._segments[seq // self._segment_size][seq % self._segment_size]
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_range(0, self._count)
+
+    def iter_since(self, since: Optional[float]) -> Iterator[dict]:
+        end = self._count
+        start = 0 if since is None else self._seq_at_or_after(since, end)
+        return self.iter_range(start, end)
+
+    def iter_range(self, start: int, end: int) -> Iterator[dict]:
+        for seq in range(start, end):
+            yield self[seq]
+
+    def query(
+        self,
+        filters: Dict[str, str],
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Tuple[int, dict]], Optional[int]]:
+        unknown = set(filters) - set(self._keys)
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        end = self._count
+        start = 0 if since is None else self._seq_at_or_after(since, end)
+        if until is not None:
+            end = self._seq_after(until, end)
+        if cursor is not None:
+            start = max(start, cursor)
+        if start >= end:
+            return [], None
+        if not filters:
+            stop = min(end, start + limit)
+            items = [(seq, self[seq]) for seq in range(start, stop)]
+            return items, stop if stop < end else None
+        return self._query_postings(filters, start, end, limit)
+
+    def _query_postings(
+        self, filters: Dict[str, str], start: int, end: int, limit: int
+    ) -> Tuple[List[Tuple[int, dict]], Optional[int]]:
+        candidates = []
+        for key, value in filters.items():
+            postings = self._postings[key].get(value)
+            if postings is None:
+                return [], None
+            candidates.append((len(postings), key, postings))
+        # Walk the shortest posting list and check the remaining filters on
+        # the entry itself.
+        candidates.sort(key=lambda candidate: candidate[0])
+        _, _, postings = candidates[0]
+        others = [(key, filters[key]) for _, key, _ in candidates[1:]]
+        length = len(postings)
+        position = bisect_left(postings, start, 0, length)
+        items: List[Tuple[int, dict]] = []
+        while position < length:
+            seq = postings[position]
+            if seq >= end:
+                return items, None
+            if len(items) == limit:
+                return items, seq
+            entry = self[seq]
+            if all(entry.get(key) == value for key, value in others):
+                items.append((seq, entry))
+            position += 1
+        return items, None
+
+    def _seq_at_or_after(self, timestamp: float, end: int) -> int:
+        return self._locate(timestamp, end, bisect_left)
+
+    def _seq_after(self, timestamp: float, end: int) -> int:
+        return self._locate(timestamp, end, bisect_right)
+
+    def _locate(self, timestamp: float, end: int, search) -> int:
+        if end == 0:
+            return 0
+        segments = (end + self._segment_size - 1) // self._segment_size
+        segment = max(0, search(self._segment_starts, timestamp, 0, segments) - 1)
+        while segment < segments:
+            times = self._segment_times[segment]
+            base = segment * self._segment_size
+            limit = min(len(times), end - base)
+            offset = search(times, timestamp, 0, limit)
+            if offset < limit:
+                return base + offset
+            segment += 1
+        return end
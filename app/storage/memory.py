@@ -1,200 +1,129 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-
-
-@dataclass
-class UserRecord:
-    id: str
-    provider: str
-    salt_b64: Optional[str] = None
-    pw_hash_b64: Optional[str] = None
-
-
-@dataclass
-class PlayerStats:
-    games_played: int = 0
-    questions_answered: int = 0
-    correct_answers: int = 0
-
-
-@dataclass
-class PlayerProfile:
-    id: str
-    email: Optional[str] = None
-    display_name: Optional[str] = None
-    language: Optional[str] = None
-    xp: int = 0
-    level: int = 1
-    progress: Dict[str, int] = field(default_factory=dict)
-    current_streak: int = 0
-    longest_streak: int = 0
-    last_login_date: Optional[str] = None
-    lessons_completed_today: int = 0
-    last_lesson_date: Optional[str] = None
-    stats: PlayerStats = field(default_factory=PlayerStats)
-
-
-@dataclass
-class QuestionRecord:
-    id: str
-    level: int
-    operation: str
-    template: str
-    choices: List[str]
-    answer: str
-    answer_formula: Optional[str] = None
-
-
-@dataclass
-class GameSessionRecord:
-    id: str
-    user_id: str
-    level: int
-    question_ids: List[str]
-    time_limit_seconds: int
-    answers: Dict[str, str] = field(default_factory=dict)
-    correct_count: int = 0
-    finished: bool = False
-
-
-@dataclass
-class RankingEntry:
-    user_id: str
-    display_name: Optional[str]
-    xp: int
-    level: int
-    updated_at: str
-
-
+import dataclasses
+import itertools
+import random
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from app.core.events import EventPipeline
+from app.core.settings import get_settings
+from app.core.tracing import trace_methods
+from app.storage import changes
+from app.storage.changes import DEFAULT_PENDING_CHANGES, ChangeFeed
+from app.storage.history import DEFAULT_GAME_HISTORY_LIMIT, GameHistory, GameHistoryRecord
+from app.storage.log_index import LogIndex
+from app.storage.occurrences import DEFAULT_OCCURRENCE_RETENTION, ErrorOccurrenceLog
+from app.storage.progress import DEFAULT_MAX_LESSONS, LessonCatalog, ProgressVector
+from app.storage.question_bank import DEFAULT_BANK_PATH, QuestionBank
+from app.storage.records import (
+    ErrorGroup,
+    GameSessionRecord,
+    PlayerProfile,
+    PlayerStats,
+    QuestionRecord,
+    RankingEntry,
+    SessionLayout,
+    UserRecord,
+    ranking_name,
+)
+from app.storage.sharding import DEFAULT_SHARDS, ShardedMap
+from app.storage.stats import GameplayStats
+
+R = TypeVar("R")
+
+DEFAULT_EVENT_QUEUE_SIZE = 10_000
+REVOCATION_PRUNE_INTERVAL_SECONDS = 60.0
+ERROR_SAMPLES_PER_GROUP = 5
+MAX_SESSION_LAYOUTS = 10_000
+
+
+@trace_methods()
 class MemoryStore:
-    def __init__(self) -> None:
-        self.users: Dict[str, UserRecord] = {}
+    def __init__(
+        self,
+        question_bank_path: Optional[str] = None,
+        shards: int = DEFAULT_SHARDS,
+        event_queue_size: int = DEFAULT_EVENT_QUEUE_SIZE,
+        game_history_limit: int = DEFAULT_GAME_HISTORY_LIMIT,
+        error_log_retention: int = DEFAULT_OCCURRENCE_RETENTION,
+        max_lessons: int = DEFAULT_MAX_LESSONS,
+        change_queue_size: int = DEFAULT_PENDING_CHANGES,
+    ) -> None:
+        self.users: ShardedMap[UserRecord] = ShardedMap(shards)
         self.sessions: Dict[str, str] = {}
+        self.revoked_sessions: Dict[str, int] = {}
+        self._revocations_pruned_at = 0.0
         self.reset_tokens: Dict[str, str] = {}
-        self.user_profiles: Dict[str, PlayerProfile] = {}
-        self.email_to_user_id: Dict[str, str] = {}
-        self.questions: Dict[str, QuestionRecord] = {}
-        self.game_sessions: Dict[str, GameSessionRecord] = {}
-        self.ranking: Dict[str, RankingEntry] = {}
-        self.error_logs: List[dict] = []
-        self.game_session_logs: List[dict] = []
-        self._seed_questions()
-
-    def _seed_questions(self) -> None:
-        if self.questions:
-            return
-        sample = [
-            QuestionRecord(
-                id="q1",
-                level=1,
-                operation="addition",
-                template="2 + 2 = ?",
-                choices=["3", "4", "5", "6"],
-                answer="4",
-                answer_formula="2 + 2",
-            ),
-            QuestionRecord(
-                id="q2",
-                level=1,
-                operation="subtraction",
-                template="5 - 3 = ?",
-                choices=["1", "2", "3", "4"],
-                answer="2",
-                answer_formula="5 - 3",
-            ),
-            QuestionRecord(
-                id="q3",
-                level=1,
-                operation="division",
-                template="10 / 2 = ?",
-                choices=["3", "5", "7", "9"],
-                answer="5",
-                answer_formula="10 / 2",
-            ),
-            QuestionRecord(
-                id="q4",
-                level=1,
-                operation="multiplication",
-                template="3 * 4 = ?",
-                choices=["7", "11", "12", "13"],
-                answer="12",
-                answer_formula="3 * 4",
-            ),
-            QuestionRecord(
-                id="q5",
-                level=2,
-                operation="subtraction",
-                template="12 - 5 = ?",
-                choices=["5", "6", "7", "8"],
-                answer="7",
-                answer_formula="12 - 5",
-            ),
-            QuestionRecord(
-                id="q6",
-                level=2,
-                operation="addition",
-                template="9 + 8 = ?",
-                choices=["15", "16", "17", "18"],
-                answer="17",
-                answer_formula="9 + 8",
-            ),
-            QuestionRecord(
-                id="q7",
-                level=2,
-                operation="multiplication",
-                template="6 * 3 = ?",
-                choices=["16", "17", "18", "19"],
-                answer="18",
-                answer_formula="6 * 3",
-            ),
-            QuestionRecord(
-                id="q8",
-                level=3,
-                operation="division",
-                template="18 / 3 = ?",
-                choices=["5", "6", "7", "8"],
-                answer="6",
-                answer_formula="18 / 3",
-            ),
-            QuestionRecord(
-                id="q9",
-                level=3,
-                operation="multiplication",
-                template="7 * 8 = ?",
-                choices=["54", "56", "58", "60"],
-                answer="56",
-                answer_formula="7 * 8",
-            ),
-            QuestionRecord(
-                id="q10",
-                level=3,
-                operation="subtraction",
-                template="25 - 9 = ?",
-                choices=["14", "15", "16", "17"],
-                answer="16",
-                answer_formula="25 - 9",
-            ),
-        ]
-        for question in sample:
-            self.questions[question.id] = question
+        self.lessons = LessonCatalog(max_lessons)
+        self.user_profiles: ShardedMap[PlayerProfile] = ShardedMap(shards)
+        # Profile versions come from one store-wide counter and profile tags
+        # carry a random per-store epoch, so a tag never repeats across
+        # restarts, workers, or a profile recreated under the same id.
+        self.epoch = secrets.token_hex(4)
+        self._profile_versions = itertools.count(1)
+        self.email_to_user_id: ShardedMap[str] = ShardedMap(shards)
+        self.questions = QuestionBank(question_bank_path or DEFAULT_BANK_PATH)
+        self.game_sessions: ShardedMap[GameSessionRecord] = ShardedMap(shards)
+        self.session_layouts: Dict[Tuple[str, ...], SessionLayout] = {}
+        self.ranking: ShardedMap[RankingEntry] = ShardedMap(shards)
+        self.error_logs = ErrorOccurrenceLog(error_log_retention)
+        self.error_groups: Dict[str, ErrorGroup] = {}
+        self._error_groups_lock = threading.Lock()
+        self.game_session_logs = LogIndex(("user_id", "session_id"))
+        self.game_history = GameHistory(game_history_limit)
+        self.gameplay_stats = GameplayStats()
+        self.events = EventPipeline(event_queue_size)
+        self.changes = ChangeFeed(change_queue_size)
 
     def get_user(self, email: str) -> Optional[UserRecord]:
         return self.users.get(email)
 
     def set_user(self, email: str, record: UserRecord) -> None:
         self.users[email] = record
+        self.changes.emit(changes.USER, email)
+
+    def add_user(self, email: str, record: UserRecord) -> bool:
+        added = self.users.setdefault(email, record) is record
+        if added:
+            self.changes.emit(changes.USER, email)
+        return added
+
+    def update_user(self, email: str, mutate: Callable[[UserRecord], R]) -> Optional[R]:
+        def apply(record: UserRecord) -> R:
+            result = mutate(record)
+            self.changes.emit(changes.USER, email)
+            return result
+
+        return self.users.update(email, apply)
 
     def create_session(self, token: str, email: str) -> None:
         self.sessions[token] = email
+        self.changes.emit(changes.AUTH_SESSION, token)
 
     def get_email_for_session(self, token: str) -> Optional[str]:
         return self.sessions.get(token)
 
     def delete_session(self, token: str) -> None:
-        self.sessions.pop(token, None)
+        if self.sessions.pop(token, None) is not None:
+            self.changes.emit(changes.AUTH_SESSION, token, op=changes.DELETE)
+
+    def revoke_session(self, token_id: str, expires_at: int) -> None:
+        now = time.time()
+        if now - self._revocations_pruned_at >= REVOCATION_PRUNE_INTERVAL_SECONDS:
+            self._revocations_pruned_at = now
+            for revoked_id, revoked_until in list(self.revoked_sessions.items()):
+                if revoked_until <= now:
+                    self.revoked_sessions.pop(revoked_id, None)
+        self.revoked_sessions[token_id] = expires_at
+        self.changes.emit(changes.REVOKED_SESSION, token_id)
+
+    def is_session_revoked(self, token_id: str) -> bool:
+        return token_id in self.revoked_sessions
 
     def set_reset_token(self, email: str, token: str) -> None:
         self.reset_tokens[email] = token
+        self.changes.emit(changes.RESET_TOKEN, email)
 
     def get_profile(self, user_id: str) -> Optional[PlayerProfile]:
         return self.user_profiles.get(user_id)
@@ -205,25 +134,166 @@ class MemoryStore:
             return None
         return self.user_profiles.get(user_id)
 
+    def get_profile_version(self, user_id: str) -> Optional[int]:
+        profile = self.user_profiles.get(user_id)
+        if profile is None:
+            return None
+        return profile.version
+
+    def get_profile_tag(self, user_id: str) -> Optional[str]:
+        """Opaque validator for the profile's current state, for ETags."""
+        version = self.get_profile_version(user_id)
+        if version is None:
+            return None
+        return f"{self.epoch}.{version}"
+
     def set_profile(self, user_id: str, profile: PlayerProfile) -> None:
+        # Lesson keys are slotted in this store's catalog, never a shared one.
+        profile.progress.bind(self.lessons)
+        profile.version = next(self._profile_versions)
         self.user_profiles[user_id] = profile
         if profile.email:
             self.email_to_user_id[profile.email] = user_id
+        self.changes.emit(changes.PROFILE, user_id, profile.version)
+
+    def add_profile(self, user_id: str, profile: PlayerProfile) -> PlayerProfile:
+        with self.user_profiles.lock(user_id):
+            existing = self.user_profiles.get(user_id)
+            if existing is not None:
+                return existing
+            self.set_profile(user_id, profile)
+            return profile
+
+    def update_profile(
+        self, user_id: str, mutate: Callable[[PlayerProfile], R]
+    ) -> Optional[R]:
+        """Run ``mutate`` on the profile under its shard lock.
+
+        Returns ``mutate``'s result, or ``None`` when the profile does not
+        exist, so ``mutate`` should return a value (typically a snapshot).
+        The profile gets a new version and the change is emitted after
+        ``mutate`` returns, and only if it changed a field, so no-op writes
+        such as a second login on the same day keep ETags valid. A mutation
+        that raises leaves both untouched. Profiles must only be changed
+        through this method.
+        """
+
+        def apply(profile: PlayerProfile) -> R:
+            before = _profile_state(profile)
+            result = mutate(profile)
+            if _profile_state(profile) != before:
+                profile.version = next(self._profile_versions)
+                self.changes.emit(changes.PROFILE, user_id, profile.version)
+            return result
+
+        return self.user_profiles.update(user_id, apply)
+
+    def iter_profiles(self) -> Iterator[PlayerProfile]:
+        return self.user_profiles.values()
 
     def get_question(self, question_id: str) -> Optional[QuestionRecord]:
         return self.questions.get(question_id)
 
     def list_questions_by_level(self, level: int) -> List[QuestionRecord]:
-        return [question for question in self.questions.values() if question.level == level]
+        return self.questions.list_by_level(level)
+
+    def get_session_layout(self, questions: List[QuestionRecord]) -> SessionLayout:
+        key = tuple(question.id for question in questions)
+        layout = self.session_layouts.get(key)
+        if layout is None:
+            layout = SessionLayout.build(questions)
+            if len(self.session_layouts) < MAX_SESSION_LAYOUTS:
+                self.session_layouts[key] = layout
+        return layout
 
     def create_game_session(self, session: GameSessionRecord) -> None:
         self.game_sessions[session.id] = session
+        self.changes.emit(changes.GAME_SESSION, session.id)
 
     def get_game_session(self, session_id: str) -> Optional[GameSessionRecord]:
         return self.game_sessions.get(session_id)
 
+    def update_game_session(
+        self, session_id: str, mutate: Callable[[GameSessionRecord], R]
+    ) -> Optional[R]:
+        def apply(session: GameSessionRecord) -> R:
+            result = mutate(session)
+            self.changes.emit(changes.GAME_SESSION, session_id)
+            return result
+
+        return self.game_sessions.update(session_id, apply)
+
+    def add_game_history(
+        self,
+        user_id: str,
+        session_id: str,
+        level: int,
+        correct_answers: int,
+        total_questions: int,
+        xp_earned: int,
+        duration_seconds: float,
+        finished_at: float,
+    ) -> GameHistoryRecord:
+        record = self.game_history.append(
+            user_id,
+            session_id,
+            level,
+            correct_answers,
+            total_questions,
+            xp_earned,
+            duration_seconds,
+            finished_at,
+        )
+        self.changes.emit(changes.GAME_HISTORY, user_id, record.seq)
+        return record
+
+    def page_game_history(
+        self, user_id: str, before: Optional[int], limit: int
+    ) -> Tuple[List[GameHistoryRecord], Optional[int]]:
+        return self.game_history.page(user_id, before, limit)
+
     def set_ranking_entry(self, entry: RankingEntry) -> None:
         self.ranking[entry.user_id] = entry
+        self.changes.emit(changes.RANKING, entry.user_id)
+
+    def sync_ranking_entries(
+        self, user_ids: Iterable[str], updated_at: str, create: bool = True
+    ) -> int:
+        """Bring ranking entries in line with the profiles as they are now.
+
+        Entries are built from the current profile rather than from the
+        write that triggered the sync, so they converge on the latest totals
+        whatever the order. Matching entries are left alone, and without
+        ``create`` players with no entry yet are skipped. Returns the number
+        of entries written.
+        """
+        written = 0
+        for user_id in user_ids:
+            profile = self.user_profiles.get(user_id)
+            if profile is None:
+                continue
+            display_name = ranking_name(profile)
+            current = self.ranking.get(user_id)
+            if current is None:
+                if not create:
+                    continue
+            elif (
+                current.xp == profile.xp
+                and current.level == profile.level
+                and current.display_name == display_name
+            ):
+                continue
+            self.set_ranking_entry(
+                RankingEntry(
+                    user_id=user_id,
+                    display_name=display_name,
+                    xp=profile.xp,
+                    level=profile.level,
+                    updated_at=updated_at,
+                )
+            )
+            written += 1
+        return written
 
     def get_ranking_entry(self, user_id: str) -> Optional[RankingEntry]:
         return self.ranking.get(user_id)
@@ -231,11 +301,129 @@ class MemoryStore:
     def list_ranking(self) -> List[RankingEntry]:
         return list(self.ranking.values())
 
-    def add_error_log(self, entry: dict) -> None:
-        self.error_logs.append(entry)
-
-    def add_game_session_log(self, entry: dict) -> None:
-        self.game_session_logs.append(entry)
-
-
-store = MemoryStore()
+    def iter_ranking(self) -> Iterator[RankingEntry]:
+        return self.ranking.values()
+
+    def record_error(
+        self,
+        fingerprint: str,
+        message: str,
+        stack: Optional[str],
+        user_id: Optional[str],
+        context: Optional[Dict[str, Any]],
+        timestamp: str,
+        epoch: float,
+    ) -> ErrorGroup:
+        with self._error_groups_lock:
+            group = self.error_groups.get(fingerprint)
+            if group is None:
+                group = ErrorGroup(
+                    fingerprint=fingerprint,
+                    message=message,
+                    stack=stack,
+                    first_seen=timestamp,
+                    last_seen=timestamp,
+                )
+                self.error_groups[fingerprint] = group
+            group.count += 1
+            group.last_seen = timestamp
+            if user_id is not None:
+                group.users.add(user_id)
+            sample = {"timestamp": timestamp, "user_id": user_id, "context": context}
+            # Reservoir sampling keeps a uniform sample of occurrences.
+            if len(group.samples) < ERROR_SAMPLES_PER_GROUP:
+                group.samples.append(sample)
+            else:
+                slot = random.randrange(group.count)
+                if slot < ERROR_SAMPLES_PER_GROUP:
+                    group.samples[slot] = sample
+            self.changes.emit(changes.ERROR_GROUP, fingerprint, group.count)
+        self.error_logs.append(fingerprint, user_id, epoch)
+        return group
+
+    def get_error_group(self, fingerprint: str) -> Optional[ErrorGroup]:
+        return self.error_groups.get(fingerprint)
+
+    def list_error_groups(self) -> List[ErrorGroup]:
+        with self._error_groups_lock:
+            return list(self.error_groups.values())
+
+    def add_game_session_log(self, entry: dict, timestamp: float) -> None:
+        self.game_session_logs.append(entry, timestamp)
+
+    def query_error_logs(
+        self,
+        filters: Dict[str, str],
+        since: Optional[float],
+        until: Optional[float],
+        cursor: Optional[int],
+        limit: int,
+    ) -> Tuple[List[Tuple[int, dict]], Optional[int]]:
+        return self.error_logs.query(filters, since, until, cursor, limit)
+
+    def query_game_session_logs(
+        self,
+        filters: Dict[str, str],
+        since: Optional[float],
+        until: Optional[float],
+        cursor: Optional[int],
+        limit: int,
+    ) -> Tuple[List[Tuple[int, dict]], Optional[int]]:
+        return self.game_session_logs.query(filters, since, until, cursor, limit)
+
+    def iter_error_logs(self, since: Optional[float] = None) -> Iterator[dict]:
+        return self.error_logs.iter_since(since)
+
+    def iter_game_session_logs(self, since: Optional[float] = None) -> Iterator[dict]:
+        return self.game_session_logs.iter_since(since)
+
+
+# Every profile field except the version itself; nested values are compared
+# through their own counters.
+_PROFILE_FIELDS = tuple(
+    field.name
+    for field in dataclasses.fields(PlayerProfile)
+    if field.name not in ("version", "progress", "stats")
+)
+
+
+def _profile_state(profile: PlayerProfile) -> Tuple[Any, ...]:
+    stats = profile.stats
+    return (
+        tuple(getattr(profile, name) for name in _PROFILE_FIELDS),
+        profile.progress.version,
+        stats.games_played,
+        stats.questions_answered,
+        stats.correct_answers,
+    )
+
+
+_store: Optional[MemoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MemoryStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                _store = MemoryStore(
+                    shards=settings.store_shards,
+                    event_queue_size=settings.event_queue_size,
+                    game_history_limit=settings.game_history_limit,
+                    error_log_retention=settings.error_log_retention,
+                    max_lessons=settings.max_lessons,
+                    change_queue_size=settings.change_queue_size,
+                )
+    return _store
+
+
+def reset_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.events.close()
+            _store.changes.close()
+            _store.questions.close()
+        _store = None
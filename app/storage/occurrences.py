@@ -0,0 +1,244 @@
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_OCCURRENCE_RETENTION = 100_000
+NO_USER = -1
+KEYS = ("user_id", "fingerprint")
+
+
+class _Postings:
+    """Sequence numbers for one value, oldest first; evicted from the front."""
+
+    __slots__ = ("seqs", "head")
+
+    def __init__(self) -> None:
+        self.seqs = array("q")
+        self.head = 0
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.head
+
+    def pop_oldest(self) -> None:
+        self.head += 1
+        if self.head >= 64 and 2 * self.head >= len(self.seqs):
+            del self.seqs[: self.head]
+            self.head = 0
+
+
+class _Interner:
+    """Dense ids for repeated strings, recycled once no entry uses them."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._values: List[Optional[str]] = []
+        self._refs = array("q")
+        self._free: List[int] = []
+        self.postings: List[_Postings] = []
+
+    def find(self, value: str) -> Optional[int]:
+        return self._ids.get(value)
+
+    def value(self, value_id: int) -> Optional[str]:
+        return self._values[value_id]
+
+    def acquire(self, value: str) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            if self._free:
+                value_id = self._free.pop()
+                self._values[value_id] = value
+                self.postings[value_id] = _Postings()
+            else:
+                value_id = len(self._values)
+                self._values.append(value)
+                self._refs.append(0)
+                self.postings.append(_Postings())
+            self._ids[value] = value_id
+        self._refs[value_id] += 1
+        return value_id
+
+    def release(self, value_id: int) -> None:
+        self._refs[value_id] -= 1
+        self.postings[value_id].pop_oldest()
+        if self._refs[value_id] == 0:
+            del self._ids[self._values[value_id]]
+            self._values[value_id] = None
+            self.postings[value_id] = _Postings()
+            self._free.append(value_id)
+
+    def nbytes(self) -> int:
+        total = sys.getsizeof(self._ids) + sys.getsizeof(self._values)
+        total += self._refs.itemsize * len(self._refs)
+        for postings in self.postings:
+            total += postings.seqs.itemsize * len(postings.seqs)
+        return total
+
+
+class ErrorOccurrenceLog:
+    """The most recent error occurrences as a ring of parallel arrays.
+
+    Each occurrence costs a float timestamp and two interned ids, plus one
+    posting per id, instead of a dict with its own timestamp string. Only
+    the last ``retention`` occurrences are kept; counts and samples live on
+    the error group. Sequence numbers keep growing across evictions, so a
+    cursor stays valid until its entry ages out. Timestamps are clamped to
+    be non-decreasing, which keeps a time range a sequence range.
+    """
+
+    keys = KEYS
+
+    def __init__(self, retention: int = DEFAULT_OCCURRENCE_RETENTION) -> None:
+        self._retention = max(1, retention)
+        self._times = array("d")
+        self._fingerprints = array("i")
+        self._users = array("i")
+        self._fingerprint_ids = _Interner()
+        self._user_ids = _Interner()
+        self._count = 0
+        self._last_timestamp = float("-inf")
+        self._lock = threading.Lock()
+
+    def append(self, fingerprint: str, user_id: Optional[str], timestamp: float) -> int:
+        with self._lock:
+            timestamp = max(timestamp, self._last_timestamp)
+            self._last_timestamp = timestamp
+            seq = self._count
+            fingerprint_id = self._fingerprint_ids.acquire(fingerprint)
+            user = NO_USER if user_id is None else self._user_ids.acquire(user_id)
+            if len(self._times) < self._retention:
+                self._times.append(timestamp)
+                self._fingerprints.append(fingerprint_id)
+                self._users.append(user)
+            else:
+                slot = seq % self._retention
+                self._fingerprint_ids.release(self._fingerprints[slot])
+                if self._users[slot] != NO_USER:
+                    self._user_ids.release(self._users[slot])
+                self._times[slot] = timestamp
+                self._fingerprints[slot] = fingerprint_id
+                self._users[slot] = user
+            self._fingerprint_ids.postings[fingerprint_id].seqs.append(seq)
+            if user != NO_USER:
+                self._user_ids.postings[user].seqs.append(seq)
+            self._count = seq + 1
+            return seq
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def nbytes(self) -> int:
+        with self._lock:
+            columns = sum(
+                column.itemsize * len(column)
+                for column in (self._times, self._fingerprints, self._users)
+            )
+            return columns + self._fingerprint_ids.nbytes() + self._user_ids.nbytes()
+
+    def iter_since(self, since: Optional[float]) -> Iterator[dict]:
+        with self._lock:
+            end = self._count
+            start = self._first_seq() if since is None else self._seq_at_or_after(since)
+        for seq in range(start, end):
+            with self._lock:
+                if seq < self._first_seq():
+                    continue
+                entry = self._entry(seq)
+            yield entry
+
+    def query(
+        self,
+        filters: Dict[str, str],
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Tuple[int, dict]], Optional[int]]:
+        unknown = set(filters) - set(KEYS)
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        with self._lock:
+            end = self._count
+            start = self._first_seq() if since is None else self._seq_at_or_after(since)
+            if until is not None:
+                end = self._seq_after(until)
+            if cursor is not None:
+                start = max(start, cursor)
+            if start >= end:
+                return [], None
+            if not filters:
+                stop = min(end, start + limit)
+                items = [(seq, self._entry(seq)) for seq in range(start, stop)]
+                return items, stop if stop < end else None
+            return self._query_postings(filters, start, end, limit)
+
+    def _query_postings(
+        self, filters: Dict[str, str], start: int, end: int, limit: int
+    ) -> Tuple[List[Tuple[int, dict]], Optional[int]]:
+        wanted: List[Tuple[array, int]] = []
+        candidates = []
+        for key, value in filters.items():
+            if key == "fingerprint":
+                interner, column = self._fingerprint_ids, self._fingerprints
+            else:
+                interner, column = self._user_ids, self._users
+            value_id = interner.find(value)
+            if value_id is None:
+                return [], None
+            postings = interner.postings[value_id]
+            candidates.append((len(postings), postings))
+            wanted.append((column, value_id))
+        candidates.sort(key=lambda candidate: candidate[0])
+        postings = candidates[0][1]
+        seqs = postings.seqs
+        length = len(seqs)
+        position = bisect_left(seqs, start, postings.head, length)
+        items: List[Tuple[int, dict]] = []
+        while position < length:
+            seq = seqs[position]
+            if seq >= end:
+                return items, None
+            if len(items) == limit:
+                return items, seq
+            slot = seq % self._retention
+            if all(column[slot] == value_id for column, value_id in wanted):
+                items.append((seq, self._entry(seq)))
+            position += 1
+        return items, None
+
+    def _first_seq(self) -> int:
+        return self._count - len(self._times)
+
+    def _entry(self, seq: int) -> dict:
+        slot = seq % self._retention
+        user = self._users[slot]
+        return {
+            "timestamp": _format(self._times[slot]),
+            "user_id": None if user == NO_USER else self._user_ids.value(user),
+            "fingerprint": self._fingerprint_ids.value(self._fingerprints[slot]),
+        }
+
+    def _seq_at_or_after(self, timestamp: float) -> int:
+        return self._locate(lambda value: value >= timestamp)
+
+    def _seq_after(self, timestamp: float) -> int:
+        return self._locate(lambda value: value > timestamp)
+
+    def _locate(self, reached) -> int:
+        # Times are non-decreasing in sequence order, so bisect over seqs.
+        low, high = self._first_seq(), self._count
+        while low < high:
+            middle = (low + high) // 2
+            if reached(self._times[middle % self._retention]):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+
+def _format(epoch: float) -> str:
+    # Same shape as the timestamps LogService writes.
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
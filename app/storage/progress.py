@@ -0,0 +1,163 @@
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+DEFAULT_MAX_LESSONS = 10_000
+MAX_LESSON_KEY_LENGTH = 128
+
+
+class LessonCatalog:
+    """Mapping from lesson keys to dense integer slots, owned by a store.
+
+    Lesson keys come from clients, so the catalog is capped at
+    ``max_lessons`` keys of up to ``MAX_LESSON_KEY_LENGTH`` characters.
+    Keys are never removed. Once the catalog is full, new keys get no
+    slot and progress vectors keep them in a plain per-user mapping, so
+    a full catalog costs memory efficiency, never availability.
+    """
+
+    def __init__(self, max_lessons: int = DEFAULT_MAX_LESSONS) -> None:
+        self._max_lessons = max(0, max_lessons)
+        self._slots: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._lock = threading.Lock()
+
+    def slots(self, keys: List[str]) -> List[Optional[int]]:
+        """Slots for ``keys``, adding new ones while there is room.
+
+        Keys that do not fit get ``None``. Raises ``ValueError`` for an
+        empty or overlong key, before any key is added.
+        """
+        known = self._slots
+        if all(key in known for key in keys):
+            return [known[key] for key in keys]
+        for key in keys:
+            if not key or len(key) > MAX_LESSON_KEY_LENGTH:
+                raise ValueError(
+                    f"Lesson keys must be 1 to {MAX_LESSON_KEY_LENGTH} characters long"
+                )
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key not in self._slots and len(self._keys) < self._max_lessons:
+                    self._slots[key] = len(self._keys)
+                    self._keys.append(key)
+            return [self._slots.get(key) for key in keys]
+
+    def find(self, key: str) -> Optional[int]:
+        return self._slots.get(key)
+
+    def key(self, slot: int) -> str:
+        return self._keys[slot]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class ProgressVector:
+    """A user's lesson progress as parallel sorted arrays of slots and values.
+
+    Each entry costs 12 bytes instead of a dict slot plus a per-user copy of
+    the key string. Keys the catalog has no room for live in ``_overflow``,
+    a plain dict created on first use. ``version`` increases whenever a
+    value actually changes. A vector built without a catalog is empty until
+    the store binds it to its own with ``bind``.
+    """
+
+    __slots__ = ("_catalog", "_slots", "_values", "_overflow", "version")
+
+    def __init__(
+        self,
+        values: Optional[Mapping[str, int]] = None,
+        catalog: Optional[LessonCatalog] = None,
+    ) -> None:
+        self._catalog = catalog
+        self._slots = array("i")
+        self._values = array("q")
+        self._overflow: Optional[Dict[str, int]] = None
+        self.version = 0
+        if values:
+            self.update(values)
+
+    def bind(self, catalog: LessonCatalog) -> None:
+        """Move this vector onto ``catalog``, re-slotting any entries."""
+        if self._catalog is catalog:
+            return
+        entries = list(self.items())
+        self._catalog = catalog
+        self._slots = array("i")
+        self._values = array("q")
+        self._overflow = None
+        if entries:
+            slots = catalog.slots([key for key, _ in entries])
+            slotted = []
+            for slot, (key, value) in zip(slots, entries):
+                if slot is None:
+                    self._set_overflow(key, value)
+                else:
+                    slotted.append((slot, value))
+            for slot, value in sorted(slotted):
+                self._slots.append(slot)
+                self._values.append(value)
+
+    def get(self, key: str) -> Optional[int]:
+        if self._catalog is None:
+            return None
+        slot = self._catalog.find(key)
+        if slot is None:
+            return None if self._overflow is None else self._overflow.get(key)
+        index = bisect_left(self._slots, slot)
+        if index < len(self._slots) and self._slots[index] == slot:
+            return self._values[index]
+        return None
+
+    def update(self, changes: Mapping[str, int]) -> Dict[str, int]:
+        for value in changes.values():
+            if not INT64_MIN <= value <= INT64_MAX:
+                raise ValueError("Progress values must fit in a signed 64-bit integer")
+        if self._catalog is None:
+            raise ValueError("Progress vector is not bound to a lesson catalog")
+        changed: Dict[str, int] = {}
+        slots = self._catalog.slots(list(changes))
+        for (key, value), slot in zip(changes.items(), slots):
+            if slot is None:
+                if self._overflow is None or self._overflow.get(key) != value:
+                    self._set_overflow(key, value)
+                    changed[key] = value
+                continue
+            index = bisect_left(self._slots, slot)
+            if index < len(self._slots) and self._slots[index] == slot:
+                if self._values[index] == value:
+                    continue
+                self._values[index] = value
+            else:
+                self._slots.insert(index, slot)
+                self._values.insert(index, value)
+            changed[key] = value
+        if changed:
+            self.version += 1
+        return changed
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        if self._catalog is None:
+            return
+        key = self._catalog.key
+        for slot, value in zip(self._slots, self._values):
+            yield key(slot), value
+        if self._overflow is not None:
+            yield from self._overflow.items()
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.items())
+
+    def _set_overflow(self, key: str, value: int) -> None:
+        if self._overflow is None:
+            self._overflow = {}
+        self._overflow[key] = value
+
+    def __len__(self) -> int:
+        return len(self._slots) + (0 if self._overflow is None else len(self._overflow))
@@ -0,0 +1,159 @@
+import json
+import mmap
+import os
+import sys
+import threading
+from dataclasses import asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.storage.records import QuestionRecord
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_SOURCE_PATH = os.path.join(DATA_DIR, "questions.jsonl")
+DEFAULT_BANK_PATH = os.path.join(DATA_DIR, "questions.bank")
+
+BANK_FORMAT = "mythicmath-question-bank"
+BANK_VERSION = 1
+
+
+class QuestionBank:
+    def __init__(self, path: str = DEFAULT_BANK_PATH) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._levels: Dict[int, List[str]] = {}
+        self._records: Dict[str, QuestionRecord] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self, question_id: str) -> Optional[QuestionRecord]:
+        self._ensure_loaded()
+        record = self._records.get(question_id)
+        if record is not None:
+            return record
+        location = self._offsets.get(question_id)
+        if location is None:
+            return None
+        return self._materialize(question_id, location)
+
+    def list_by_level(self, level: int) -> List[QuestionRecord]:
+        self._ensure_loaded()
+        return [self.get(question_id) for question_id in self._levels.get(level, [])]
+
+    def values(self) -> Iterator[QuestionRecord]:
+        self._ensure_loaded()
+        for question_id in list(self._offsets):
+            yield self.get(question_id)
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[str]:
+        self._ensure_loaded()
+        return iter(list(self._offsets))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._offsets = {}
+            self._levels = {}
+            self._records = {}
+            self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            handle = open(self._path, "rb")
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                handle.close()
+                raise ValueError(f"Question bank {self._path} is empty")
+            header = json.loads(mapped.readline())
+            if header.get("format") != BANK_FORMAT or header.get("version") != BANK_VERSION:
+                mapped.close()
+                handle.close()
+                raise ValueError(f"Unsupported question bank {self._path}")
+            offsets: Dict[str, Tuple[int, int]] = {}
+            levels: Dict[int, List[str]] = {}
+            for question_id, level, offset, length in header["index"]:
+                offsets[question_id] = (offset, length)
+                levels.setdefault(level, []).append(question_id)
+            self._file = handle
+            self._mmap = mapped
+            self._offsets = offsets
+            self._levels = levels
+            self._loaded = True
+
+    def _materialize(self, question_id: str, location: Tuple[int, int]) -> QuestionRecord:
+        offset, length = location
+        with self._lock:
+            record = self._records.get(question_id)
+            if record is not None:
+                return record
+            raw = self._mmap[offset : offset + length]
+            record = QuestionRecord(**json.loads(raw))
+            self._records[question_id] = record
+            return record
+
+
+def read_source(path: str = DEFAULT_SOURCE_PATH) -> List[QuestionRecord]:
+    records = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                records.append(QuestionRecord(**json.loads(line)))
+    return records
+
+
+def build_question_bank(records: Iterable[QuestionRecord], path: str = DEFAULT_BANK_PATH) -> int:
+    lines = []
+    entries = []
+    for record in records:
+        lines.append(json.dumps(asdict(record), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        entries.append((record.id, record.level))
+    # Offsets depend on the header length, which depends on the offsets, so
+    # iterate until the header size is stable.
+    header_size = 0
+    while True:
+        index = []
+        offset = header_size
+        for (question_id, level), line in zip(entries, lines):
+            index.append([question_id, level, offset, len(line)])
+            offset += len(line) + 1
+        header = json.dumps(
+            {"format": BANK_FORMAT, "version": BANK_VERSION, "index": index},
+            separators=(",", ":"),
+        ).encode("utf-8") + b"\n"
+        if len(header) == header_size:
+            break
+        header_size = len(header)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        for line in lines:
+            handle.write(line + b"\n")
+    os.replace(tmp_path, path)
+    return len(lines)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_BANK_PATH
+    count = build_question_bank(read_source(source), target)
+    print(f"Wrote {count} questions to {target}")
@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.grading import Grader, compile_grader
+from app.core.sketches import HyperLogLog
+from app.storage.progress import ProgressVector
+
+
+@dataclass
+class UserRecord:
+    id: str
+    provider: str
+    salt_b64: Optional[str] = None
+    pw_hash_b64: Optional[str] = None
+    password_hash: Optional[str] = None
+
+
+@dataclass
+class PlayerStats:
+    games_played: int = 0
+    questions_answered: int = 0
+    correct_answers: int = 0
+
+
+@dataclass
+class PlayerProfile:
+    id: str
+    email: Optional[str] = None
+    display_name: Optional[str] = None
+    language: Optional[str] = None
+    xp: int = 0
+    level: int = 1
+    progress: ProgressVector = field(default_factory=ProgressVector)
+    current_streak: int = 0
+    longest_streak: int = 0
+    last_login_date: Optional[str] = None
+    lessons_completed_today: int = 0
+    last_lesson_date: Optional[str] = None
+    stats: PlayerStats = field(default_factory=PlayerStats)
+    version: int = 0
+
+
+def ranking_name(profile: PlayerProfile) -> str:
+    """The label a player is shown under on the leaderboard."""
+    return profile.display_name or profile.email or profile.id
+
+
+@dataclass
+class QuestionRecord:
+    id: str
+    level: int
+    operation: str
+    template: str
+    choices: List[str]
+    answer: str
+    answer_formula: Optional[str] = None
+    answer_tolerance: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class SessionLayout:
+    """Question order shared by every session that drew the same questions.
+
+    ``positions`` maps a question id to its slot; ``graders`` and
+    ``operations`` hold each slot's compiled answer checker and operation.
+    """
+
+    question_ids: Tuple[str, ...]
+    positions: Dict[str, int]
+    graders: Tuple[Grader, ...]
+    operations: Tuple[str, ...]
+
+    @classmethod
+    def build(cls, questions: Sequence[QuestionRecord]) -> "SessionLayout":
+        question_ids = tuple(question.id for question in questions)
+        return cls(
+            question_ids=question_ids,
+            positions={question_id: index for index, question_id in enumerate(question_ids)},
+            graders=tuple(
+                compile_grader(question.answer, question.answer_formula, question.answer_tolerance)
+                for question in questions
+            ),
+            operations=tuple(question.operation for question in questions),
+        )
+
+
+@dataclass
+class GameSessionRecord:
+    """Compact per-session state.
+
+    ``answers`` is a fixed-size array of raw answers indexed by layout slot
+    and ``correct_mask`` has bit ``i`` set while slot ``i`` is answered
+    correctly.
+    """
+
+    __slots__ = (
+        "id",
+        "user_id",
+        "level",
+        "layout",
+        "time_limit_seconds",
+        "answers",
+        "correct_mask",
+        "correct_count",
+        "finished",
+        "started_at",
+    )
+
+    id: str
+    user_id: str
+    level: int
+    layout: SessionLayout
+    time_limit_seconds: int
+    answers: List[Optional[str]]
+    correct_mask: int
+    correct_count: int
+    finished: bool
+    started_at: float
+
+    @classmethod
+    def create(
+        cls,
+        id: str,
+        user_id: str,
+        level: int,
+        layout: SessionLayout,
+        time_limit_seconds: int,
+        started_at: float = 0.0,
+    ) -> "GameSessionRecord":
+        return cls(
+            id=id,
+            user_id=user_id,
+            level=level,
+            layout=layout,
+            time_limit_seconds=time_limit_seconds,
+            answers=[None] * len(layout.question_ids),
+            correct_mask=0,
+            correct_count=0,
+            finished=False,
+            started_at=started_at,
+        )
+
+    @property
+    def question_ids(self) -> Tuple[str, ...]:
+        return self.layout.question_ids
+
+
+@dataclass
+class RankingEntry:
+    user_id: str
+    display_name: Optional[str]
+    xp: int
+    level: int
+    updated_at: str
+
+
+@dataclass
+class ErrorGroup:
+    fingerprint: str
+    message: str
+    stack: Optional[str]
+    first_seen: str
+    last_seen: str
+    count: int = 0
+    users: HyperLogLog = field(default_factory=HyperLogLog)
+    samples: List[Dict[str, Any]] = field(default_factory=list)
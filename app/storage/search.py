@@ -0,0 +1,286 @@
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_FUZZY = "fuzzy"
+
+# Prefix scans stop after this many candidates per requested result, so a
+# one-letter query costs the same as a precise one.
+PREFIX_CANDIDATES_PER_RESULT = 8
+# Fuzzy candidates come from the rarest trigrams of the query, reading at
+# most this many postings in total, plus the players under the longest
+# indexed prefix of the query when that prefix is selective enough.
+FUZZY_SCAN_BUDGET = 1024
+FUZZY_CANDIDATES_PER_RESULT = 2
+BACKOFF_MIN_PREFIX = 3
+BACKOFF_MAX_DOCS = 32
+MIN_FUZZY_SIMILARITY = 0.35
+TERM_BLOCK_SIZE = 512
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class SortedTerms:
+    """Sorted strings stored as a list of bounded blocks.
+
+    Inserts and removals move at most one block instead of shifting a
+    single list of millions of terms.
+    """
+
+    def __init__(self, block_size: int = TERM_BLOCK_SIZE) -> None:
+        self._block_size = block_size
+        self._blocks: List[List[str]] = []
+        self._maxes: List[str] = []
+
+    def add(self, term: str) -> None:
+        if not self._blocks:
+            self._blocks.append([term])
+            self._maxes.append(term)
+            return
+        index = min(bisect_left(self._maxes, term), len(self._blocks) - 1)
+        block = self._blocks[index]
+        insort(block, term)
+        self._maxes[index] = block[-1]
+        if len(block) > 2 * self._block_size:
+            half = self._block_size
+            self._blocks[index : index + 1] = [block[:half], block[half:]]
+            self._maxes[index : index + 1] = [block[half - 1], block[-1]]
+
+    def remove(self, term: str) -> None:
+        index = bisect_left(self._maxes, term)
+        block = self._blocks[index]
+        del block[bisect_left(block, term)]
+        if block:
+            self._maxes[index] = block[-1]
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+
+    def iter_from(self, term: str) -> Iterator[str]:
+        """Terms greater than or equal to ``term``, in order."""
+        index = bisect_left(self._maxes, term)
+        if index == len(self._blocks):
+            return
+        block = self._blocks[index]
+        yield from block[bisect_left(block, term) :]
+        for index in range(index + 1, len(self._blocks)):
+            yield from self._blocks[index]
+
+
+class SearchHit:
+    __slots__ = ("user_id", "match", "score")
+
+    def __init__(self, user_id: str, match: str, score: float) -> None:
+        self.user_id = user_id
+        self.match = match
+        self.score = score
+
+
+class PlayerSearchIndex:
+    """Prefix and trigram index over player display names.
+
+    Emails are deliberately not indexed: search is public, and matching on
+    them would let anyone enumerate accounts by address. Prefix terms are
+    the folded full name and each later word of it, kept in ``SortedTerms``
+    so a query is a bisect plus a short scan. Trigram postings are append-only arrays of
+    document numbers; a rename leaves stale postings behind, which are
+    filtered when scoring and dropped by a rebuild once they outnumber the
+    live ones.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._terms = SortedTerms()
+        self._term_docs: Dict[str, Set[int]] = {}
+        self._postings: Dict[str, "array[int]"] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._user_ids: List[str] = []
+        self._texts: List[str] = []
+        self._raw: List[Optional[str]] = []
+        self._doc_terms: List[Tuple[str, ...]] = []
+        self._live_postings = 0
+        self._stale_postings = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def index(self, user_id: str, display_name: Optional[str]) -> None:
+        raw = display_name
+        with self._lock:
+            doc = self._doc_ids.get(user_id)
+            # Most profile writes (XP, progress, logins) leave the name
+            # alone; skip folding for those.
+            if doc is not None and self._raw[doc] == raw:
+                return
+        text = fold(display_name or "")
+        terms = _prefix_terms(text)
+        with self._lock:
+            doc = self._doc_ids.get(user_id)
+            if doc is None:
+                doc = self._doc_ids[user_id] = len(self._user_ids)
+                self._user_ids.append(user_id)
+                self._texts.append("")
+                self._raw.append(raw)
+                self._doc_terms.append(())
+            self._raw[doc] = raw
+            if self._texts[doc] == text and self._doc_terms[doc] == terms:
+                return
+            self._replace_terms(doc, terms)
+            self._replace_trigrams(doc, text)
+
+    def search(self, query: str, limit: int) -> List[SearchHit]:
+        folded = fold(query)
+        if not folded or limit <= 0:
+            return []
+        with self._lock:
+            hits = self._prefix_hits(folded, limit)
+            if not hits:
+                hits = self._fuzzy_hits(folded, limit)
+        return hits
+
+    def _prefix_hits(self, folded: str, limit: int) -> List[SearchHit]:
+        best: Dict[int, Tuple[float, str]] = {}
+        budget = limit * PREFIX_CANDIDATES_PER_RESULT
+        for term in self._terms.iter_from(folded):
+            if not term.startswith(folded) or len(best) >= budget:
+                break
+            exact = term == folded
+            # Shorter terms are closer to what was typed.
+            score = (2.0 if exact else 1.0) + len(folded) / len(term)
+            for doc in self._term_docs[term]:
+                if doc not in best or best[doc][0] < score:
+                    best[doc] = (score, MATCH_EXACT if exact else MATCH_PREFIX)
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], self._user_ids[item[0]]))
+        return [
+            SearchHit(self._user_ids[doc], match, round(score, 4))
+            for doc, (score, match) in ranked[:limit]
+        ]
+
+    def _fuzzy_hits(self, folded: str, limit: int) -> List[SearchHit]:
+        grams = trigrams(folded)
+        counts: Counter = Counter()
+        budget = FUZZY_SCAN_BUDGET
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        for posting in sorted(postings, key=len):
+            if len(posting) > budget:
+                break
+            budget -= len(posting)
+            counts.update(posting)
+        # Only the best-overlapping candidates are worth an exact score.
+        candidates = {doc for doc, _ in counts.most_common(limit * FUZZY_CANDIDATES_PER_RESULT)}
+        candidates.update(self._backoff_docs(folded))
+        scored = []
+        for doc in candidates:
+            doc_grams = trigrams(self._texts[doc])
+            shared = len(grams & doc_grams)
+            similarity = 2 * shared / (len(grams) + len(doc_grams))
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                scored.append((similarity, self._user_ids[doc]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            SearchHit(user_id, MATCH_FUZZY, round(similarity, 4))
+            for similarity, user_id in scored[:limit]
+        ]
+
+    def _backoff_docs(self, folded: str) -> Set[int]:
+        """Players under the longest indexed prefix of the query and of each later word.
+
+        One typo leaves the text before it intact, which common trigrams
+        alone do not find within the scan budget.
+        """
+        docs: Set[int] = set()
+        words = folded.split(" ")
+        for start in range(len(words)):
+            tail = " ".join(words[start:])
+            low, high = 0, len(tail)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self._has_prefix(tail[:middle]):
+                    low = middle
+                else:
+                    high = middle - 1
+            if low < BACKOFF_MIN_PREFIX:
+                continue
+            prefix = tail[:low]
+            found: Set[int] = set()
+            for term in self._terms.iter_from(prefix):
+                if not term.startswith(prefix):
+                    break
+                found.update(self._term_docs[term])
+                if len(found) > BACKOFF_MAX_DOCS:
+                    break
+            if len(found) <= BACKOFF_MAX_DOCS:
+                docs.update(found)
+        return docs
+
+    def _has_prefix(self, prefix: str) -> bool:
+        return next(self._terms.iter_from(prefix), "").startswith(prefix)
+
+    def _replace_terms(self, doc: int, terms: Tuple[str, ...]) -> None:
+        for term in self._doc_terms[doc]:
+            docs = self._term_docs[term]
+            docs.discard(doc)
+            if not docs:
+                del self._term_docs[term]
+                self._terms.remove(term)
+        for term in terms:
+            docs = self._term_docs.get(term)
+            if docs is None:
+                docs = self._term_docs[term] = set()
+                self._terms.add(term)
+            docs.add(doc)
+        self._doc_terms[doc] = terms
+
+    def _replace_trigrams(self, doc: int, text: str) -> None:
+        previous = self._texts[doc]
+        old_grams = trigrams(previous) if previous else set()
+        new_grams = trigrams(text) if text else set()
+        self._texts[doc] = text
+        for gram in new_grams - old_grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("i")
+            posting.append(doc)
+        added = len(new_grams - old_grams)
+        removed = len(old_grams - new_grams)
+        self._live_postings += added - removed
+        self._stale_postings += removed
+        if self._stale_postings > max(1024, self._live_postings):
+            self._rebuild_postings()
+
+    def _rebuild_postings(self) -> None:
+        postings: Dict[str, "array[int]"] = {}
+        for doc, text in enumerate(self._texts):
+            if not text:
+                continue
+            for gram in trigrams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("i")
+                posting.append(doc)
+        self._postings = postings
+        self._stale_postings = 0
+
+
+def _prefix_terms(name: str) -> Tuple[str, ...]:
+    if not name:
+        return ()
+    words = name.split(" ")
+    terms = [name]
+    terms.extend(" ".join(words[index:]) for index in range(1, len(words)))
+    return tuple(dict.fromkeys(terms))
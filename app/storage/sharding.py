@@ -0,0 +1,108 @@
+import sys
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+R = TypeVar("R")
+
+DEFAULT_SHARDS = 16
+
+
+class ShardedMap(Generic[V]):
+    """String-keyed map split into shards, each guarded by its own lock.
+
+    Plain reads and writes go straight to the shard dict. Read-modify-write
+    sequences must run under ``lock(key)`` or through ``update``, which only
+    serializes callers that touch the same shard.
+    """
+
+    def __init__(self, shards: int = DEFAULT_SHARDS) -> None:
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        self._shards: List[Dict[str, V]] = [{} for _ in range(shards)]
+        self._locks = [threading.RLock() for _ in range(shards)]
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    def _index(self, key: str) -> int:
+        return hash(key) % len(self._shards)
+
+    def get(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        return self._shards[self._index(key)].get(key, default)
+
+    def __getitem__(self, key: str) -> V:
+        return self._shards[self._index(key)][key]
+
+    def __setitem__(self, key: str, value: V) -> None:
+        index = self._index(key)
+        with self._locks[index]:
+            self._shards[index][key] = value
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return key in self._shards[self._index(key)]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def pop(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        index = self._index(key)
+        with self._locks[index]:
+            return self._shards[index].pop(key, default)
+
+    def setdefault(self, key: str, value: V) -> V:
+        index = self._index(key)
+        with self._locks[index]:
+            return self._shards[index].setdefault(key, value)
+
+    def values(self) -> Iterator[V]:
+        for _, value in self.items():
+            yield value
+
+    def items(self) -> Iterator[Tuple[str, V]]:
+        # Snapshot one shard at a time so iteration never holds a lock across
+        # a yield and never copies the whole map.
+        for index, shard in enumerate(self._shards):
+            with self._locks[index]:
+                snapshot = list(shard.items())
+            yield from snapshot
+
+    def table_sizeof(self) -> int:
+        """Bytes used by the shard dicts themselves, excluding keys and values."""
+        return sys.getsizeof(self._shards) + sum(sys.getsizeof(shard) for shard in self._shards)
+
+    def sample(self, size: int) -> List[Tuple[str, V]]:
+        """Pick about ``size`` entries spread evenly across every shard.
+
+        Striding is done by ``islice`` over the shard's items, so a sample
+        of a large map costs a C-level scan rather than a Python loop.
+        """
+        per_shard = max(1, -(-size // len(self._shards)))
+        picked: List[Tuple[str, V]] = []
+        for index, shard in enumerate(self._shards):
+            with self._locks[index]:
+                step = max(1, len(shard) // per_shard)
+                picked.extend(islice(shard.items(), 0, step * per_shard, step))
+        return picked
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        with self._locks[self._index(key)]:
+            yield
+
+    def update(self, key: str, mutate: Callable[[V], R]) -> Optional[R]:
+        index = self._index(key)
+        with self._locks[index]:
+            value = self._shards[index].get(key)
+            if value is None:
+                return None
+            return mutate(value)
@@ -0,0 +1,184 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+HOURLY_RETENTION = 24 * 7
+# Upper bounds in seconds; the last bucket is open-ended.
+DURATION_BOUNDS: Tuple[float, ...] = (5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1800)
+SCORE_BOUNDS: Tuple[float, ...] = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+class Histogram:
+    """Fixed-bucket streaming histogram; memory does not grow with samples."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the quantile; ``None`` if empty.
+
+        Values in the open-ended last bucket report the largest bound.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank and bucket:
+                return self.bounds[min(index, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def copy(self) -> "Histogram":
+        clone = Histogram(self.bounds)
+        clone.counts = list(self.counts)
+        clone.count = self.count
+        clone.total = self.total
+        return clone
+
+
+class AnswerCounter:
+    __slots__ = ("answers", "correct")
+
+    def __init__(self, answers: int = 0, correct: int = 0) -> None:
+        self.answers = answers
+        self.correct = correct
+
+
+class HourlyCounter:
+    __slots__ = ("games_started", "games_finished", "answers", "correct")
+
+    def __init__(self) -> None:
+        self.games_started = 0
+        self.games_finished = 0
+        self.answers = 0
+        self.correct = 0
+
+    def copy(self) -> "HourlyCounter":
+        clone = HourlyCounter()
+        clone.games_started = self.games_started
+        clone.games_finished = self.games_finished
+        clone.answers = self.answers
+        clone.correct = self.correct
+        return clone
+
+
+class GameplaySnapshot:
+    __slots__ = (
+        "games_started",
+        "games_finished",
+        "by_operation",
+        "hourly",
+        "durations",
+        "scores",
+    )
+
+    def __init__(
+        self,
+        games_started: int,
+        games_finished: int,
+        by_operation: Dict[Tuple[str, int], AnswerCounter],
+        hourly: List[Tuple[int, HourlyCounter]],
+        durations: Histogram,
+        scores: Histogram,
+    ) -> None:
+        self.games_started = games_started
+        self.games_finished = games_finished
+        self.by_operation = by_operation
+        self.hourly = hourly
+        self.durations = durations
+        self.scores = scores
+
+
+class GameplayStats:
+    """Global gameplay aggregates, updated as answers and games happen.
+
+    Every structure is bounded by the number of operation/level pairs,
+    retained hours or histogram buckets, never by history size.
+    """
+
+    def __init__(self, hourly_retention: int = HOURLY_RETENTION) -> None:
+        self._lock = threading.Lock()
+        self._hourly_retention = hourly_retention
+        self._games_started = 0
+        self._games_finished = 0
+        self._by_operation: Dict[Tuple[str, int], AnswerCounter] = {}
+        self._hourly: "OrderedDict[int, HourlyCounter]" = OrderedDict()
+        self._durations = Histogram(DURATION_BOUNDS)
+        self._scores = Histogram(SCORE_BOUNDS)
+
+    def __len__(self) -> int:
+        """Number of counters kept: operation/level pairs plus retained hours."""
+        with self._lock:
+            return len(self._by_operation) + len(self._hourly)
+
+    def record_start(self, timestamp: float) -> None:
+        with self._lock:
+            self._games_started += 1
+            self._hour(timestamp).games_started += 1
+
+    def record_answer(self, operation: str, level: int, correct: bool, timestamp: float) -> None:
+        with self._lock:
+            counter = self._by_operation.get((operation, level))
+            if counter is None:
+                counter = self._by_operation[(operation, level)] = AnswerCounter()
+            counter.answers += 1
+            hour = self._hour(timestamp)
+            hour.answers += 1
+            if correct:
+                counter.correct += 1
+                hour.correct += 1
+
+    def record_finish(
+        self, correct: int, total: int, duration_seconds: float, timestamp: float
+    ) -> None:
+        with self._lock:
+            self._games_finished += 1
+            self._hour(timestamp).games_finished += 1
+            self._durations.add(max(0.0, duration_seconds))
+            if total:
+                self._scores.add(correct / total)
+
+    def snapshot(self, since_hour: int) -> GameplaySnapshot:
+        """Copy the aggregates, keeping hourly buckets from ``since_hour`` on."""
+        with self._lock:
+            hourly = [
+                (hour, counter.copy())
+                for hour, counter in self._hourly.items()
+                if hour >= since_hour
+            ]
+            return GameplaySnapshot(
+                games_started=self._games_started,
+                games_finished=self._games_finished,
+                by_operation={
+                    key: AnswerCounter(counter.answers, counter.correct)
+                    for key, counter in self._by_operation.items()
+                },
+                hourly=hourly,
+                durations=self._durations.copy(),
+                scores=self._scores.copy(),
+            )
+
+    def _hour(self, timestamp: float) -> HourlyCounter:
+        hour = int(timestamp // 3600)
+        counter = self._hourly.get(hour)
+        if counter is None:
+            latest = next(reversed(self._hourly), None)
+            counter = self._hourly[hour] = HourlyCounter()
+            if latest is not None and hour < latest:
+                # A late event for an older hour; keep buckets in hour order.
+                self._hourly = OrderedDict(sorted(self._hourly.items()))
+            while len(self._hourly) > self._hourly_retention:
+                self._hourly.popitem(last=False)
+        return counter
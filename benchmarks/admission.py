@@ -0,0 +1,79 @@
+"""Gameplay latency while /auth/login floods the threadpool.
+
+Runs the same spike with admission control off and on, and reports the
+/game/answer latency percentiles plus how many logins were shed:
+
+    python -m benchmarks.admission --logins 400 --answers 300
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List, Tuple
+
+from benchmarks.asgi import ASGIClient
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _spike(logins: int, answers: int) -> Tuple[List[float], int, int]:
+    from app.main import create_app
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        client = ASGIClient(app)
+        credentials = {"email": "load@example.com", "password": "correct horse"}
+        await client.request("POST", "/auth/register", credentials)
+        await client.request("POST", "/users/player", {})
+        started = await client.request(
+            "POST", "/game/start", {"user_id": "player", "level": 1, "question_count": 4}
+        )
+        session = started.json()
+        question_id = session["questions"][0]["id"]
+
+        async def login() -> int:
+            response = await client.request("POST", "/auth/login", credentials)
+            return response.status_code
+
+        async def answer() -> float:
+            begin = time.perf_counter()
+            response = await client.request(
+                "POST",
+                "/game/answer",
+                {"session_id": session["session_id"], "question_id": question_id, "answer": "4"},
+            )
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - begin
+
+        flood = [asyncio.ensure_future(login()) for _ in range(logins)]
+        latencies = []
+        for _ in range(answers):
+            latencies.append(await answer())
+            await asyncio.sleep(0.002)
+        statuses = await asyncio.gather(*flood)
+    return latencies, statuses.count(200), statuses.count(503)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--answers", type=int, default=300)
+    args = parser.parse_args()
+
+    for label, limit in (("off", "0"), ("on", "40")):
+        os.environ["MYTHICMATH_ADMISSION_LIMIT"] = limit
+        latencies, served, shed = asyncio.run(_spike(args.logins, args.answers))
+        print(
+            f"admission {label:>3}: answer p50 {statistics.median(latencies) * 1000:7.1f} ms"
+            f"  p99 {_percentile(latencies, 0.99) * 1000:7.1f} ms"
+            f"  logins served {served:4d}  shed {shed:4d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class ASGIResponse:
+    def __init__(self, status: int, headers: Headers, body: bytes) -> None:
+        self.status_code = status
+        self.headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in headers}
+        self.content = body
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class ASGIClient:
+    """Drives an ASGI app in the current event loop without a network socket."""
+
+    def __init__(self, app: Any) -> None:
+        self._app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json_body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> ASGIResponse:
+        path, _, query = path.partition("?")
+        body = b""
+        raw_headers: Headers = []
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            raw_headers.append((b"content-type", b"application/json"))
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode("latin-1"), value.encode("latin-1")))
+        raw_headers.append((b"content-length", str(len(body)).encode("ascii")))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        sent = False
+        status = 500
+        response_headers: Headers = []
+        chunks: List[bytes] = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self._app(scope, receive, send)
+        return ASGIResponse(status, response_headers, b"".join(chunks))
@@ -0,0 +1,60 @@
+"""/game/finish latency with post-game work on the event pipeline.
+
+Finishes many sessions and reports the latency callers see, next to the
+same finish followed by waiting for its derived work (ranking entry,
+gameplay stats, session log), which is what the inline path used to cost:
+
+    python -m benchmarks.game_finish --games 20000 --players 2000
+"""
+
+import argparse
+import time
+from typing import List
+
+from app.services.game_service import GameService
+from app.storage.memory import MemoryStore, PlayerProfile
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _run(games: int, players: int, wait: bool) -> List[float]:
+    store = MemoryStore()
+    service = GameService(store)
+    for index in range(players):
+        store.set_profile(f"p{index}", PlayerProfile(id=f"p{index}"))
+    session_ids = [
+        service.start(f"p{index % players}", 1, 5).session_id for index in range(games)
+    ]
+    latencies = []
+    for session_id in session_ids:
+        started = time.perf_counter()
+        service.finish(session_id)
+        if wait:
+            store.events.drain()
+        latencies.append(time.perf_counter() - started)
+    store.events.drain()
+    metrics = store.events.metrics()
+    assert metrics.processed == games and not any(c.failed for c in metrics.consumers)
+    store.events.close()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=20_000)
+    parser.add_argument("--players", type=int, default=2_000)
+    args = parser.parse_args()
+
+    for label, wait in (("finish + derived work", True), ("finish (pipeline)", False)):
+        latencies = _run(args.games, args.players, wait)
+        print(
+            f"{label:<22} p50 {_percentile(latencies, 0.50) * 1e6:7.1f} us"
+            f"  p99 {_percentile(latencies, 0.99) * 1e6:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
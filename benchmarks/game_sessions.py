@@ -0,0 +1,93 @@
+"""Per-session memory and grading throughput with many concurrent game sessions.
+
+    python -m benchmarks.game_sessions --sessions 100000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from app.services.game_service import GameService
+from app.storage.memory import GameSessionRecord, MemoryStore, PlayerProfile
+
+
+@dataclass
+class _DictSession:
+    # The previous layout: id list plus a dict of raw answers.
+    id: str
+    user_id: str
+    level: int
+    question_ids: List[str]
+    time_limit_seconds: int
+    answers: Dict[str, str] = field(default_factory=dict)
+    correct_count: int = 0
+    finished: bool = False
+
+
+def _measure(build) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--answers", type=int, default=500_000)
+    args = parser.parse_args()
+
+    store = MemoryStore()
+    questions = store.list_questions_by_level(1)
+    question_ids = [question.id for question in questions]
+
+    def build_compact() -> List[GameSessionRecord]:
+        sessions = []
+        for index in range(args.sessions):
+            layout = store.get_session_layout(questions)
+            session = GameSessionRecord.create(f"s{index}", "u", 1, layout, 75)
+            for position, question in enumerate(questions):
+                session.answers[position] = question.answer
+            sessions.append(session)
+        return sessions
+
+    def build_dict() -> List[_DictSession]:
+        sessions = []
+        for index in range(args.sessions):
+            session = _DictSession(f"s{index}", "u", 1, list(question_ids), 75)
+            for question in questions:
+                session.answers[question.id] = question.answer
+            sessions.append(session)
+        return sessions
+
+    compact = _measure(build_compact)
+    legacy = _measure(build_dict)
+    print(f"sessions:            {args.sessions}")
+    print(f"compact bytes/session: {compact / args.sessions:8.1f}")
+    print(f"dict bytes/session:    {legacy / args.sessions:8.1f}")
+
+    service = GameService(store)
+    store.set_profile("u", PlayerProfile(id="u"))
+    session_ids = [
+        service.start("u", 1, len(questions)).session_id for _ in range(args.sessions)
+    ]
+    choices = [(question.id, [question.answer] + question.choices) for question in questions]
+    plan = []
+    for _ in range(args.answers):
+        question_id, options = random.choice(choices)
+        plan.append((random.choice(session_ids), question_id, random.choice(options)))
+    started = time.perf_counter()
+    for session_id, question_id, answer in plan:
+        service.answer(session_id, question_id, answer)
+    elapsed = time.perf_counter() - started
+    print(f"answers/second:      {args.answers / elapsed:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Answer grading throughput with the compiled graders.
+
+Grades a random mix of canonical, equivalent ("05", "10/2", "5,0") and
+wrong answers against every question in the bank.
+
+    python -m benchmarks.grading --answers 1000000
+"""
+
+import argparse
+import random
+import time
+
+from app.core.grading import compile_grader
+from app.storage.memory import MemoryStore
+
+
+def _variants(answer: str) -> list:
+    variants = [answer, f" {answer} ", "0" + answer, "wrong", "-1"]
+    if answer.lstrip("-").isdigit():
+        value = int(answer)
+        variants += [f"{value}.0", f"{value},0", f"{value * 2}/2", str(value + 1)]
+    return variants
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    store = MemoryStore()
+    questions = list(store.questions.values())
+    graders = [
+        compile_grader(question.answer, question.answer_formula, question.answer_tolerance)
+        for question in questions
+    ]
+    pool = [
+        (grader, variant)
+        for grader, question in zip(graders, questions)
+        for variant in _variants(question.answer)
+    ]
+    plan = [random.choice(pool) for _ in range(args.answers)]
+
+    started = time.perf_counter()
+    correct = 0
+    for grader, answer in plan:
+        if grader.grade(answer):
+            correct += 1
+    elapsed = time.perf_counter() - started
+    print(f"answers:        {args.answers}")
+    print(f"correct:        {correct / args.answers:12.1%}")
+    print(f"answers/second: {args.answers / elapsed:12.0f}")
+
+    canonical = [(grader, grader.text) for grader, _ in plan]
+    started = time.perf_counter()
+    for grader, answer in canonical:
+        grader.grade(answer)
+    elapsed = time.perf_counter() - started
+    print(f"canonical answers/second: {args.answers / elapsed:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Calibrate the PBKDF2 iteration count for a target per-hash latency on this host.
+
+    python -m benchmarks.password_hash --target-ms 100
+
+The recommended value goes into MYTHICMATH_PASSWORD_HASH_ITERATIONS; users
+whose stored cost differs are rehashed transparently on their next login.
+"""
+
+import argparse
+
+from app.core import security
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    for iterations in (50_000, 100_000, 200_000, 400_000, 600_000):
+        elapsed = security.time_password_hash(iterations)
+        print(f"{iterations:>9} iterations: {elapsed * 1000:8.2f} ms")
+
+    recommended = security.calibrate_password_iterations(args.target_ms / 1000)
+    measured = security.time_password_hash(recommended)
+    print()
+    print(f"target:      {args.target_ms:.1f} ms")
+    print(f"recommended: {recommended} iterations ({measured * 1000:.2f} ms measured)")
+    print(f"export MYTHICMATH_PASSWORD_HASH_ITERATIONS={recommended}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Player search latency on a large index.
+
+Indexes synthetic players (accented names built from random syllables)
+and times prefix, exact, misspelled and unmatched queries, with
+how often the intended player is found:
+
+    python -m benchmarks.player_search --profiles 1000000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.storage.search import PlayerSearchIndex
+
+ONSETS = ["b", "c", "d", "f", "g", "j", "l", "m", "n", "p", "r", "s", "t", "v", "z",
+          "br", "ch", "th", "st", "gr", ""]
+VOWELS = ["a", "e", "i", "o", "u", "é", "ã", "ö", "y", "ai", "ou"]
+
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) for _ in range(syllables)).title()
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    index = PlayerSearchIndex()
+    players = []
+    started = time.perf_counter()
+    for number in range(args.profiles):
+        first, last = _word(rng, rng.randint(2, 3)), _word(rng, rng.randint(2, 4))
+        name = f"{first} {last}"
+        index.index(f"u{number}", name)
+        players.append(name)
+    print(f"indexed {args.profiles} profiles in {time.perf_counter() - started:.1f}s")
+
+    Query = Tuple[str, Optional[str]]
+
+    def full_name() -> Query:
+        number = rng.randrange(args.profiles)
+        return players[number], f"u{number}"
+
+    def misspelled() -> Query:
+        query, expected = full_name()
+        cut = rng.randrange(1, len(query) - 1)
+        return query[:cut] + "x" + query[cut + 1 :], expected
+
+    def no_match() -> Query:
+        return f"qqq{rng.randrange(10**6)}", None
+
+    workloads: Dict[str, Callable[[], Query]] = {
+        "prefix 'ma'": lambda: ("ma", None),
+        "prefix 'lou bra'": lambda: ("lou bra", None),
+        "full name": full_name,
+        "misspelled": misspelled,
+        "no match": no_match,
+    }
+    for label, make_query in workloads.items():
+        queries = [make_query() for _ in range(args.queries)]
+        latencies = []
+        found = expected_total = 0
+        for query, expected in queries:
+            begin = time.perf_counter()
+            hits = index.search(query, args.limit)
+            latencies.append(time.perf_counter() - begin)
+            if expected is not None:
+                expected_total += 1
+                found += any(hit.user_id == expected for hit in hits)
+        recall = f"  found {found / expected_total:6.1%}" if expected_total else ""
+        print(
+            f"{label:<18} p50 {_percentile(latencies, 0.50) * 1e6:8.1f} us"
+            f"  p99 {_percentile(latencies, 0.99) * 1e6:8.1f} us{recall}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""XP reconciliation cost: one /ranking/update per user vs. one batch.
+
+Syncs every user of a populated store through ``RankingService.update``
+(which ranks the whole table per call) and through ``update_batch`` with
+positions, which ranks once:
+
+    python -m benchmarks.ranking_batch --users 2000
+"""
+
+import argparse
+import time
+
+from app.models.schemas import RankingUpdateIn, UserCreateIn
+from app.services.ranking_service import RankingService
+from app.services.user_service import UserService
+from app.storage.memory import MemoryStore
+
+
+def _build_store(users: int) -> MemoryStore:
+    store = MemoryStore()
+    profiles = UserService(store)
+    for index in range(users):
+        profiles.create_profile(f"user-{index}", UserCreateIn())
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    args = parser.parse_args()
+
+    updates = [
+        RankingUpdateIn(user_id=f"user-{index}", xp=index * 37 % 50_000, level=1 + index % 30)
+        for index in range(args.users)
+    ]
+
+    service = RankingService(_build_store(args.users))
+    started = time.perf_counter()
+    for item in updates:
+        service.update(item.user_id, item.xp, item.level, item.display_name)
+    per_item = time.perf_counter() - started
+
+    service = RankingService(_build_store(args.users))
+    started = time.perf_counter()
+    result = service.update_batch(updates, include_positions=True)
+    batch = time.perf_counter() - started
+    assert result.updated == args.users and not result.errors
+
+    print(
+        f"{args.users} users: per-item {per_item * 1000:9.1f} ms"
+        f"   batch {batch * 1000:7.1f} ms   {per_item / batch:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
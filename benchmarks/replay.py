@@ -0,0 +1,217 @@
+"""Re-drive a captured traffic trace and report per-route latency.
+
+Record with ``MYTHICMATH_CAPTURE_FILE=capture.jsonl.gz``, then replay the
+trace in-process against ``create_app()`` or against a running server,
+keeping the captured inter-arrival times (``--speed 2`` halves them,
+``--speed 0`` sends as fast as possible):
+
+    python -m benchmarks.replay capture.jsonl.gz --speed 1
+    python -m benchmarks.replay capture.jsonl.gz --url http://127.0.0.1:8000
+
+Tokens, session ids and question ids handed out during the capture are
+pseudonymized; the replay maps each one to the value at the same place in
+its own responses, so later requests that used them still resolve. With ``--speed 0`` a request can
+overtake the response it depends on, which shows up as a status mismatch.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from app.middleware.capture import issued_values
+from benchmarks.asgi import ASGIClient, ASGIResponse
+
+
+class URLClient:
+    """Same interface as ``ASGIClient``, sending real HTTP requests."""
+
+    def __init__(self, base_url: str, workers: int) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json_body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> ASGIResponse:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._send, method, path, json_body, headers or {}
+        )
+
+    def _send(
+        self, method: str, path: str, json_body: Any, headers: Dict[str, str]
+    ) -> ASGIResponse:
+        data = None
+        headers = dict(headers)
+        if json_body is not None:
+            data = json.dumps(json_body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        request = urllib.request.Request(
+            self._base_url + path, data=data, method=method, headers=headers
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return _response(response.status, response.getheaders(), response.read())
+        except urllib.error.HTTPError as error:
+            return _response(error.code, error.headers.items(), error.read())
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def _response(status: int, headers: Any, body: bytes) -> ASGIResponse:
+    raw = [(key.encode("latin-1"), value.encode("latin-1")) for key, value in headers]
+    return ASGIResponse(status, raw, body)
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        entries = [json.loads(line) for line in handle if line.strip()]
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+class Replayer:
+    def __init__(self, client: Any, speed: float) -> None:
+        self._client = client
+        self._speed = speed
+        self._issued: Dict[str, str] = {}
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.mismatched: Counter = Counter()
+        self.lag: List[float] = []
+
+    async def run(self, entries: List[Dict[str, Any]]) -> float:
+        if not entries:
+            return 0.0
+        origin = entries[0]["t"]
+        started = time.perf_counter()
+        pending = []
+        for entry in entries:
+            if self._speed > 0:
+                due = (entry["t"] - origin) / self._speed
+                delay = due - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.lag.append(max(0.0, time.perf_counter() - started - due))
+            pending.append(asyncio.ensure_future(self._send(entry)))
+        await asyncio.gather(*pending)
+        return time.perf_counter() - started
+
+    async def _send(self, entry: Dict[str, Any]) -> None:
+        path = "/".join(self._resolve(part) for part in entry["path"].split("/"))
+        if entry.get("query"):
+            path += "?" + urlencode([(key, self._resolve(value)) for key, value in entry["query"]])
+        headers = {}
+        if "authorization" in entry:
+            scheme, _, token = entry["authorization"].partition(" ")
+            headers["Authorization"] = f"{scheme} {self._resolve(token)}"
+        body = self._resolve(entry["body"]) if "body" in entry else None
+        began = time.perf_counter()
+        response = await self._client.request(entry["method"], path, body, headers)
+        elapsed = time.perf_counter() - began
+        route = f"{entry['method']} {entry['route'] or '<unmatched>'}"
+        self.latencies[route].append(elapsed)
+        self.statuses[route][response.status_code] += 1
+        if response.status_code != entry["status"]:
+            self.mismatched[route] += 1
+        if entry.get("issued"):
+            self._learn(entry["issued"], response)
+
+    def _learn(self, issued: List[str], response: ASGIResponse) -> None:
+        try:
+            values = issued_values(response.json())
+        except ValueError:
+            return
+        for pseudonym, value in zip(issued, values):
+            self._issued.setdefault(pseudonym, value)
+
+    def _resolve(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self._issued.get(value, value)
+        if isinstance(value, dict):
+            return {key: self._resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        return value
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(replayer: Replayer, elapsed: float, captured_span: float) -> None:
+    total = sum(len(values) for values in replayer.latencies.values())
+    summary = f"{total} requests in {elapsed:.2f}s (captured span {captured_span:.2f}s)"
+    if replayer.lag:
+        summary += f", dispatch lag p99 {_percentile(replayer.lag, 0.99) * 1000:.1f} ms"
+    print(summary)
+    print(
+        f"{'route':<36} {'count':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}"
+        f" {'max ms':>8} {'status!=':>8}  statuses"
+    )
+    rows: List[Tuple[str, List[float]]] = sorted(replayer.latencies.items())
+    for route, values in rows:
+        statuses = " ".join(
+            f"{status}:{count}" for status, count in sorted(replayer.statuses[route].items())
+        )
+        print(
+            f"{route:<36} {len(values):>6}"
+            f" {_percentile(values, 0.50) * 1000:>8.1f}"
+            f" {_percentile(values, 0.90) * 1000:>8.1f}"
+            f" {_percentile(values, 0.99) * 1000:>8.1f}"
+            f" {max(values) * 1000:>8.1f}"
+            f" {replayer.mismatched[route]:>8}  {statuses}"
+        )
+
+
+async def _replay(entries: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    if args.url:
+        client = URLClient(args.url, args.workers)
+        replayer = Replayer(client, args.speed)
+        try:
+            elapsed = await replayer.run(entries)
+        finally:
+            client.close()
+    else:
+        from app.main import create_app
+
+        # Do not record the replay into a new capture.
+        os.environ.pop("MYTHICMATH_CAPTURE_FILE", None)
+        app = create_app()
+        async with app.router.lifespan_context(app):
+            replayer = Replayer(ASGIClient(app), args.speed)
+            elapsed = await replayer.run(entries)
+    span = entries[-1]["t"] - entries[0]["t"] if entries else 0.0
+    report(replayer, elapsed, span)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("trace", help="gzip JSONL file written by the capture middleware")
+    parser.add_argument("--speed", type=float, default=1.0, help="0 sends without delays")
+    parser.add_argument("--url", default="", help="replay against a server instead of in-process")
+    parser.add_argument("--workers", type=int, default=64, help="HTTP threads with --url")
+    args = parser.parse_args()
+
+    entries = load_trace(args.trace)
+    asyncio.run(_replay(entries, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Response rendering cost: single-validation records vs. response_model.
+
+Serves the same data through the real routes, which return TypedDict rows
+rendered by ``json_records``, and through a copy of the previous routes,
+which built Pydantic models and let FastAPI validate them again:
+
+    python -m benchmarks.serialization --size 20000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+from fastapi import FastAPI
+
+from app.main import create_app
+from app.models.schemas import ProfileOut, QuestionOut, RankingEntryOut, UserCreateIn
+from app.services.question_service import QuestionService, get_question_service
+from app.services.ranking_service import RankingService, get_ranking_service
+from app.services.user_service import UserService, get_user_service
+from app.storage.memory import MemoryStore, QuestionRecord, RankingEntry
+from app.storage.question_bank import build_question_bank
+from benchmarks.asgi import ASGIClient
+
+
+def _build_store(size: int, bank_path: str) -> MemoryStore:
+    build_question_bank(
+        (
+            QuestionRecord(
+                id=f"q{index}",
+                level=1,
+                operation="addition",
+                template=f"{index} + 1 = ?",
+                choices=[str(index), str(index + 1), str(index + 2), str(index + 3)],
+                answer=str(index + 1),
+            )
+            for index in range(size)
+        ),
+        bank_path,
+    )
+    store = MemoryStore(question_bank_path=bank_path)
+    for index in range(size):
+        store.set_ranking_entry(
+            RankingEntry(
+                user_id=f"user-{index}",
+                display_name=f"Player {index}",
+                xp=index * 7 % 10_000,
+                level=1 + index % 30,
+                updated_at="2024-01-01T00:00:00+00:00",
+            )
+        )
+    progress = {f"lesson-{index}": index for index in range(size)}
+    UserService(store).create_profile("big", UserCreateIn(progress=progress))
+    return store
+
+
+def _legacy_app(store: MemoryStore) -> FastAPI:
+    ranking = RankingService(store)
+    questions = QuestionService(store)
+    users = UserService(store)
+    app = FastAPI()
+
+    @app.get("/ranking/global", response_model=List[RankingEntryOut])
+    def legacy_ranking() -> List[RankingEntryOut]:
+        return [RankingEntryOut(**row) for row in ranking.global_ranking()]
+
+    @app.get("/questions", response_model=List[QuestionOut])
+    def legacy_questions(level: int) -> List[QuestionOut]:
+        return [QuestionOut(**row) for row in questions.list_by_level(level)]
+
+    @app.get("/users/{user_id}", response_model=ProfileOut)
+    def legacy_profile(user_id: str) -> ProfileOut:
+        return ProfileOut(**users.get_profile(user_id))
+
+    return app
+
+
+async def _time(client: ASGIClient, path: str, rounds: int) -> float:
+    await client.request("GET", path)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        response = await client.request("GET", path)
+        assert response.status_code == 200, response.status_code
+    return (time.perf_counter() - started) / rounds
+
+
+async def _compare(store: MemoryStore, rounds: int) -> None:
+    app = create_app()
+    app.dependency_overrides[get_question_service] = lambda: QuestionService(store)
+    app.dependency_overrides[get_ranking_service] = lambda: RankingService(store)
+    app.dependency_overrides[get_user_service] = lambda: UserService(store)
+    current = ASGIClient(app)
+    legacy = ASGIClient(_legacy_app(store))
+    paths: List[str] = ["/ranking/global", "/questions?level=1", "/users/big"]
+    for path in paths:
+        before = await _time(legacy, path, rounds)
+        after = await _time(current, path, rounds)
+        print(
+            f"{path:<20} response_model {before * 1000:8.1f} ms"
+            f"   single validation {after * 1000:8.1f} ms   {before / after:5.2f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("MYTHICMATH_ADMISSION_LIMIT", "0")
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build_store(args.size, os.path.join(directory, "questions.bank"))
+        print(f"result size: {args.size}")
+        asyncio.run(_compare(store, args.rounds))
+        store.questions.close()
+
+
+if __name__ == "__main__":
+    main()
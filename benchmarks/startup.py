@@ -0,0 +1,80 @@
+"""Cold-start benchmark: module import time and time to the first served request.
+
+Each sample runs in a fresh interpreter so nothing is shared between runs:
+
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import asyncio
+import json
+import time
+
+started = time.perf_counter()
+from app.main import create_app
+imported = time.perf_counter()
+
+
+async def main():
+    from benchmarks.asgi import ASGIClient
+
+    app = create_app()
+    built = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        client = ASGIClient(app)
+        response = await client.request("GET", "/health")
+        assert response.status_code == 200, response.status_code
+        first_request = time.perf_counter()
+        response = await client.request("GET", "/questions?level=1")
+        assert response.status_code == 200, response.status_code
+        first_data = time.perf_counter()
+    print(json.dumps({
+        "import": imported - started,
+        "create_app": built - imported,
+        "lifespan_startup": ready - built,
+        "first_request": first_request - ready,
+        "first_question_request": first_data - first_request,
+        "total": first_data - started,
+    }))
+
+
+asyncio.run(main())
+"""
+
+
+def run_once() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    samples = [run_once() for _ in range(args.runs)]
+    for key in samples[0]:
+        values = [sample[key] * 1000 for sample in samples]
+        print(
+            f"{key:>24}: median {statistics.median(values):8.2f} ms"
+            f"  min {min(values):8.2f} ms  max {max(values):8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
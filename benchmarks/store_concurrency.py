@@ -0,0 +1,115 @@
+"""Concurrent mutation stress test for the sharded store.
+
+Hammers the profile update paths from many threads and fails loudly on any
+lost update. On free-threaded builds the distinct-user run also shows how
+throughput scales with the shard count.
+
+    python -m benchmarks.store_concurrency --threads 8 --updates 20000
+"""
+
+import argparse
+import threading
+import time
+from typing import Callable, List
+
+from fastapi import HTTPException
+
+from app.models.schemas import UserCreateIn
+from app.services.game_service import GameService
+from app.services.progress_service import ProgressService
+from app.services.user_service import UserService
+from app.storage.memory import MemoryStore
+
+
+def _run_threads(count: int, target: Callable[[int], None]) -> float:
+    barrier = threading.Barrier(count)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def shared_user(shards: int, threads: int, updates: int) -> float:
+    store = MemoryStore(shards=shards)
+    users = UserService(store)
+    progress = ProgressService(store)
+    users.create_profile("shared", UserCreateIn())
+
+    def work(_: int) -> None:
+        for _ in range(updates):
+            progress.update("shared", 1, None)
+
+    elapsed = _run_threads(threads, work)
+    xp = progress.get("shared").xp
+    assert xp == threads * updates, f"lost updates: xp={xp}, expected {threads * updates}"
+    return elapsed
+
+
+def distinct_users(shards: int, threads: int, updates: int) -> float:
+    store = MemoryStore(shards=shards)
+    users = UserService(store)
+    progress = ProgressService(store)
+    for index in range(threads):
+        users.create_profile(f"user-{index}", UserCreateIn())
+
+    def work(index: int) -> None:
+        user_id = f"user-{index}"
+        for _ in range(updates):
+            progress.update(user_id, 1, None)
+
+    elapsed = _run_threads(threads, work)
+    for index in range(threads):
+        xp = progress.get(f"user-{index}").xp
+        assert xp == updates, f"lost updates for user-{index}: xp={xp}"
+    return elapsed
+
+
+def double_finish(threads: int, rounds: int) -> None:
+    store = MemoryStore()
+    users = UserService(store)
+    game = GameService(store)
+    users.create_profile("player", UserCreateIn())
+    for _ in range(rounds):
+        session = game.start("player", 1, 4)
+        for question in session.questions:
+            game.answer(session.session_id, question.id, "0")
+        outcomes: List[str] = []
+
+        def work(_: int) -> None:
+            try:
+                game.finish(session.session_id)
+                outcomes.append("ok")
+            except HTTPException as exc:
+                outcomes.append(str(exc.status_code))
+
+        _run_threads(threads, work)
+        assert outcomes.count("ok") == 1, f"session finished {outcomes.count('ok')} times"
+    assert users.get_stats("player").games_played == rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--updates", type=int, default=20_000)
+    args = parser.parse_args()
+
+    total = args.threads * args.updates
+    for shards in (1, 16):
+        elapsed = shared_user(shards, args.threads, args.updates)
+        print(f"shared user,    {shards:>2} shards: {total / elapsed:10.0f} updates/s")
+        elapsed = distinct_users(shards, args.threads, args.updates)
+        print(f"distinct users, {shards:>2} shards: {total / elapsed:10.0f} updates/s")
+    double_finish(args.threads, 200)
+    print("no lost updates, no double finishes")
+
+
+if __name__ == "__main__":
+    main()
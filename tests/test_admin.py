@@ -0,0 +1,66 @@
+from typing import Dict, Iterator, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.settings import get_settings
+from app.main import create_app
+
+OPERATOR_PATHS = (
+    "/export/ranking",
+    "/export/profiles",
+    "/export/logs",
+    "/debug/memory",
+    "/debug/events",
+    "/logs/query",
+    "/logs/errors/top",
+)
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, token: Optional[str]) -> Iterator[TestClient]:
+    if token is None:
+        monkeypatch.delenv("MYTHICMATH_DEBUG_TOKEN", raising=False)
+    else:
+        monkeypatch.setenv("MYTHICMATH_DEBUG_TOKEN", token)
+    get_settings.cache_clear()
+    try:
+        with TestClient(create_app()) as client:
+            yield client
+    finally:
+        get_settings.cache_clear()
+
+
+@pytest.fixture
+def unconfigured(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    yield from _client(monkeypatch, None)
+
+
+@pytest.fixture
+def configured(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    yield from _client(monkeypatch, "s3cret")
+
+
+@pytest.mark.parametrize("path", OPERATOR_PATHS)
+@pytest.mark.parametrize("headers", [{}, {"X-Debug-Token": "s3cret"}])
+def test_routes_do_not_exist_without_a_configured_token(
+    unconfigured: TestClient, path: str, headers: Dict[str, str]
+) -> None:
+    assert unconfigured.get(path, headers=headers).status_code == 404
+
+
+@pytest.mark.parametrize("path", OPERATOR_PATHS)
+@pytest.mark.parametrize("headers", [{}, {"X-Debug-Token": "wrong"}, {"X-Debug-Token": ""}])
+def test_missing_or_wrong_token_is_forbidden(
+    configured: TestClient, path: str, headers: Dict[str, str]
+) -> None:
+    assert configured.get(path, headers=headers).status_code == 403
+
+
+@pytest.mark.parametrize("path", OPERATOR_PATHS)
+def test_correct_token_is_let_through(configured: TestClient, path: str) -> None:
+    response = configured.get(path, headers={"X-Debug-Token": "s3cret"})
+    assert response.status_code == 200, response.text
+
+
+def test_public_routes_need_no_token(configured: TestClient) -> None:
+    assert configured.get("/health").status_code == 200
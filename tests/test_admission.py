@@ -0,0 +1,175 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.core.settings import get_settings
+from app.middleware.admission import (
+    DEFAULT,
+    AdmissionClass,
+    AdmissionController,
+    AdmissionMiddleware,
+)
+
+HIGH = AdmissionClass("high", 2, 1.0, 0.0, 8, 1.0)
+LOW = AdmissionClass("low", 1, 1.0, 0.0, 8, 1.0)
+SHORT = AdmissionClass("short", 1, 1.0, 0.0, 8, 0.05)
+
+
+async def _settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_freed_slots_go_to_the_highest_priority_waiter() -> None:
+    async def scenario() -> List[str]:
+        controller = AdmissionController(1, [HIGH, LOW])
+        assert await controller.acquire(LOW) is None
+        order: List[str] = []
+
+        async def wait(admission_class: AdmissionClass) -> None:
+            assert await controller.acquire(admission_class) is None
+            order.append(admission_class.name)
+
+        low = asyncio.create_task(wait(LOW))
+        await _settle()
+        high = asyncio.create_task(wait(HIGH))
+        await _settle()
+        assert order == []
+
+        controller.release(LOW, 0.01)
+        await _settle()
+        assert order == ["high"]
+        controller.release(HIGH, 0.01)
+        await asyncio.gather(low, high)
+        controller.release(LOW, 0.01)
+        assert controller.admitted == {"high": 1, "low": 2}
+        return order
+
+    assert asyncio.run(scenario()) == ["high", "low"]
+
+
+def test_reserve_keeps_headroom_for_higher_priority_classes() -> None:
+    reserved = AdmissionClass("reserved", 1, 1.0, 0.5, 0, 1.0)
+
+    async def scenario() -> None:
+        controller = AdmissionController(2, [HIGH, reserved])
+        assert await controller.acquire(reserved) is None
+        # Half the limit must stay free, so a second low request is refused
+        # while a high-priority one still gets in.
+        assert await controller.acquire(reserved) is not None
+        assert await controller.acquire(HIGH) is None
+        assert controller.rejected == {"high": 0, "reserved": 1}
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_is_rejected_at_its_deadline() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController(1, [SHORT])
+        assert await controller.acquire(SHORT) is None
+        retry_after = await controller.acquire(SHORT)
+        assert retry_after == SHORT.max_wait_seconds
+        assert controller.rejected == {"short": 1}
+
+        controller.release(SHORT, 0.0)
+        assert await controller.acquire(SHORT) is None
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_or_long_estimate_is_rejected_up_front() -> None:
+    tiny_queue = AdmissionClass("tiny", 1, 1.0, 0.0, 1, 10.0)
+    slow = AdmissionClass("slow", 1, 1.0, 0.0, 8, 1.0)
+
+    async def scenario() -> None:
+        controller = AdmissionController(1, [tiny_queue])
+        assert await controller.acquire(tiny_queue) is None
+        queued = asyncio.create_task(controller.acquire(tiny_queue))
+        await _settle()
+        assert await controller.acquire(tiny_queue) is not None
+        controller.release(tiny_queue, 0.0)
+        assert await queued is None
+
+        controller = AdmissionController(1, [slow])
+        assert await controller.acquire(slow) is None
+        controller.release(slow, 30.0)
+        assert await controller.acquire(slow) is None
+        # The service-time average now says one more request waits too long.
+        assert await controller.acquire(slow) is not None
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue_and_keeps_no_slot() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController(1, [HIGH])
+        assert await controller.acquire(HIGH) is None
+        waiter = asyncio.create_task(controller.acquire(HIGH))
+        await _settle()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        controller.release(HIGH, 0.0)
+        assert await asyncio.wait_for(controller.acquire(HIGH), 0.5) is None
+        controller.release(HIGH, 0.0)
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_after_its_grant_does_not_leak_the_slot() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController(1, [HIGH])
+        assert await controller.acquire(HIGH) is None
+        waiter = asyncio.create_task(controller.acquire(HIGH))
+        await _settle()
+        controller.release(HIGH, 0.0)
+        waiter.cancel()
+        try:
+            admitted = await waiter is None
+        except asyncio.CancelledError:
+            admitted = False
+        if admitted:
+            # Depending on the Python version the grant can win the race;
+            # the caller then owns the slot and releases it as usual.
+            controller.release(HIGH, 0.0)
+
+        assert await asyncio.wait_for(controller.acquire(HIGH), 0.5) is None
+
+    asyncio.run(scenario())
+
+
+def test_middleware_answers_503_with_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MYTHICMATH_ADMISSION_LIMIT", "1")
+    get_settings.cache_clear()
+    sent: List[Dict[str, Any]] = []
+
+    async def scenario() -> None:
+        unblock = asyncio.Event()
+
+        async def app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+            await unblock.wait()
+
+        async def receive() -> Dict[str, Any]:
+            return {"type": "http.request", "body": b""}
+
+        async def send(message: Dict[str, Any]) -> None:
+            sent.append(message)
+
+        middleware = AdmissionMiddleware(app)
+        scope: Dict[str, Any] = {"type": "http", "path": "/users/u1"}
+        running = asyncio.create_task(middleware(scope, receive, send))
+        await _settle()
+        await middleware(scope, receive, send)
+        unblock.set()
+        await running
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        get_settings.cache_clear()
+
+    assert sent and sent[0]["status"] == 503
+    headers = dict(sent[0]["headers"])
+    assert headers[b"retry-after"] == str(int(DEFAULT.max_wait_seconds)).encode("ascii")
@@ -0,0 +1,100 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.settings import get_settings
+from app.main import create_app
+from app.middleware.capture import Sanitizer
+
+KEY = b"k" * 32
+
+
+@pytest.mark.parametrize(
+    "field", ["password", "new_password", "id_token", "access_token", "token"]
+)
+@pytest.mark.parametrize("secret", ["hunter2", "123456", 123456, 4.5, True, None, ["a"]])
+def test_credentials_are_pseudonymized_whatever_their_type(field: str, secret: Any) -> None:
+    sanitized = Sanitizer(KEY).value({field: secret, "level": 3})
+
+    assert sanitized["level"] == 3
+    assert isinstance(sanitized[field], str) and sanitized[field].startswith("~")
+    assert json.dumps(secret) not in json.dumps(sanitized)
+
+
+def test_strings_are_pseudonymized_at_any_depth() -> None:
+    sanitized = Sanitizer(KEY).value({"user": {"name": "Ada", "tags": ["x", 7]}})
+
+    assert sanitized["user"]["name"].startswith("~")
+    assert sanitized["user"]["tags"][0].startswith("~")
+    assert sanitized["user"]["tags"][1] == 7
+    assert "Ada" not in json.dumps(sanitized)
+
+
+def test_emails_keep_their_shape_but_not_their_value() -> None:
+    pseudonym = Sanitizer(KEY).text("ada@example.com")
+
+    assert pseudonym.endswith("@example.invalid")
+    assert "ada" not in pseudonym
+
+
+def test_pseudonyms_are_stable_per_key_only() -> None:
+    first, second = Sanitizer(KEY), Sanitizer(KEY)
+
+    assert first.text("u-1") == second.text("u-1")
+    assert first.text("u-1") != first.text("u-2")
+    assert Sanitizer(b"j" * 32).text("u-1") != first.text("u-1")
+
+
+@pytest.mark.parametrize("part", ["3", "-2", "120", "999999", "1.5", "0,25"])
+def test_short_numeric_url_parts_are_kept(part: str) -> None:
+    assert Sanitizer(KEY).url_part(part) == part
+
+
+@pytest.mark.parametrize("part", ["1234567", "u-1", "abc", "1e3", "12.3456789", ""])
+def test_other_url_parts_are_pseudonymized(part: str) -> None:
+    assert Sanitizer(KEY).url_part(part) == Sanitizer(KEY).text(part)
+
+
+def _capture(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> List[Dict[str, Any]]:
+    capture_file = tmp_path / "capture.jsonl.gz"
+    monkeypatch.setenv("MYTHICMATH_CAPTURE_FILE", str(capture_file))
+    get_settings.cache_clear()
+    try:
+        with TestClient(create_app()) as client:
+            token = client.post(
+                "/auth/register", json={"email": "ada@example.com", "password": "90817263"}
+            ).json()["access_token"]
+            client.get("/auth/session", headers={"Authorization": f"Bearer {token}"})
+            client.get("/questions", params={"level": "3"})
+            client.get("/questions/q-secret-id")
+            client.get("/questions/42")
+    finally:
+        get_settings.cache_clear()
+    with gzip.open(capture_file, "rt", encoding="utf-8") as handle:
+        text = handle.read()
+    for original in ("ada@example.com", "90817263", token, "q-secret-id"):
+        assert original not in text
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_capture_file_holds_no_credentials_and_keeps_short_numbers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    register, session, listing, by_id, numeric = _capture(tmp_path, monkeypatch)
+
+    assert register["route"] == "/auth/register"
+    assert register["body"]["email"].endswith("@example.invalid")
+    assert register["body"]["password"].startswith("~")
+    assert len(register["issued"]) >= 1
+
+    scheme, pseudonym = session["authorization"].split(" ")
+    assert scheme == "Bearer" and pseudonym in register["issued"]
+
+    assert listing["query"] == [["level", "3"]]
+    assert by_id["route"] == "/questions/{question_id}"
+    assert by_id["path"].startswith("/questions/~")
+    assert numeric["path"] == "/questions/42"
@@ -0,0 +1,52 @@
+import threading
+from typing import List
+
+from app.storage import changes
+from app.storage.changes import Change, ChangeFeed
+
+
+def test_slow_subscriber_drops_the_oldest_pending_changes() -> None:
+    feed = ChangeFeed(max_pending=3)
+    delivering, release = threading.Event(), threading.Event()
+    seen: List[str] = []
+
+    def slow(change: Change) -> None:
+        delivering.set()
+        release.wait(5)
+        seen.append(change.key)
+
+    feed.subscribe(slow, (changes.PROFILE,))
+    try:
+        feed.emit(changes.PROFILE, "first")
+        assert delivering.wait(5)
+        for index in range(10):
+            feed.emit(changes.PROFILE, f"key-{index}")
+        assert feed.dropped == 7
+
+        release.set()
+        assert feed.drain(5)
+        assert seen == ["first", "key-7", "key-8", "key-9"]
+    finally:
+        release.set()
+        feed.close()
+
+
+def test_listener_failures_are_counted_and_delivery_continues() -> None:
+    feed = ChangeFeed()
+    seen: List[int] = []
+
+    def failing(change: Change) -> None:
+        raise RuntimeError("boom")
+
+    feed.subscribe(failing)
+    feed.subscribe(lambda change: seen.append(change.version), (changes.PROFILE,))
+    try:
+        feed.emit(changes.PROFILE, "a", 4)
+        feed.emit(changes.RANKING, "a")
+        feed.emit(changes.PROFILE, "a", 5)
+        assert feed.drain(5)
+        assert seen == [4, 5]
+        assert feed.failed == 3
+        assert feed.dropped == 0
+    finally:
+        feed.close()
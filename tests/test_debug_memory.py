@@ -0,0 +1,34 @@
+from app.services.debug_service import DebugService
+from app.services.progress_service import ProgressService
+from app.storage.memory import MemoryStore, PlayerProfile
+
+
+def test_memory_report_covers_history_lessons_and_gameplay_stats() -> None:
+    store = MemoryStore()
+    try:
+        for index in range(40):
+            user_id = f"user-{index}"
+            store.set_profile(user_id, PlayerProfile(id=user_id))
+            ProgressService(store).update(user_id, 0, {f"lesson-{index % 5}": index})
+            store.add_game_history(user_id, f"session-{index}", 1, 3, 5, 10, 12.0, 1.0e9)
+        store.gameplay_stats.record_answer("addition", 1, True, 1.0e9)
+
+        report = DebugService(store).memory_report(sample_size=10)
+        collections = {item.name: item for item in report.collections}
+
+        history = collections["game_history"]
+        assert (history.kind, history.entries, history.sampled) == ("GameHistory", 40, 10)
+        assert history.bytes_per_entry > 0
+        lessons = collections["lessons"]
+        assert (lessons.kind, lessons.entries) == ("LessonCatalog", 5)
+        assert lessons.estimated_bytes > 0
+        stats = collections["gameplay_stats"]
+        assert (stats.kind, stats.entries) == ("GameplayStats", 2)
+        assert stats.estimated_bytes > 0
+        assert report.total_estimated_bytes == sum(
+            item.estimated_bytes for item in report.collections
+        )
+    finally:
+        store.events.close()
+        store.changes.close()
+        store.questions.close()
@@ -0,0 +1,111 @@
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.etag import etag_matches
+from app.main import create_app
+from app.storage.memory import MemoryStore, PlayerProfile, get_store
+
+PATHS = ("/users/e1", "/users/e1/stats", "/progress/e1")
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    with TestClient(create_app()) as test_client:
+        test_client.post("/users/e1", json={"display_name": "Eve"})
+        yield test_client
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_unchanged_profile_answers_304(client: TestClient, path: str) -> None:
+    first = client.get(path)
+    tag = first.headers["etag"]
+    assert first.status_code == 200 and tag.startswith('W/"')
+
+    cached = client.get(path, headers={"If-None-Match": tag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == tag
+
+
+def test_changing_write_invalidates_every_view(client: TestClient) -> None:
+    tags = {path: client.get(path).headers["etag"] for path in PATHS}
+    assert client.patch("/users/e1", json={"display_name": "Eve 2"}).status_code == 200
+
+    for path, tag in tags.items():
+        response = client.get(path, headers={"If-None-Match": tag})
+        assert response.status_code == 200, path
+        assert response.headers["etag"] != tag
+
+
+def test_no_op_writes_keep_the_tag(client: TestClient) -> None:
+    tag = client.get("/users/e1").headers["etag"]
+    client.patch("/users/e1", json={"display_name": "Eve"})
+    client.post("/progress/update", json={"user_id": "e1", "xp_delta": 0})
+
+    assert client.get("/users/e1", headers={"If-None-Match": tag}).status_code == 304
+
+
+def test_progress_write_bumps_the_tag(client: TestClient) -> None:
+    tag = client.get("/progress/e1").headers["etag"]
+    client.post("/progress/update", json={"user_id": "e1", "progress": {"intro": 1}})
+
+    assert client.get("/progress/e1", headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_missing_profile_is_404_even_with_a_wildcard(client: TestClient) -> None:
+    assert client.get("/users/nobody", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_tags_do_not_survive_a_restart() -> None:
+    with TestClient(create_app()) as client:
+        client.post("/users/e1", json={})
+        tag = client.get("/users/e1").headers["etag"]
+    # The lifespan dropped the store, so this is a fresh process's state.
+    with TestClient(create_app()) as client:
+        client.post("/users/e1", json={})
+        response = client.get("/users/e1", headers={"If-None-Match": tag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != tag
+
+
+def test_recreated_profile_gets_a_new_tag(client: TestClient) -> None:
+    tag = client.get("/users/e1").headers["etag"]
+    get_store().set_profile("e1", PlayerProfile(id="e1", display_name="Eve"))
+
+    assert client.get("/users/e1", headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_store_versions_only_move_on_changing_writes() -> None:
+    store = MemoryStore()
+    try:
+        store.set_profile("a", PlayerProfile(id="a"))
+        store.set_profile("b", PlayerProfile(id="b"))
+        version = store.get_profile_version("a")
+
+        store.update_profile("a", lambda profile: None)
+        store.update_profile("a", lambda profile: setattr(profile, "xp", profile.xp))
+        assert store.get_profile_version("a") == version
+
+        versions = [version]
+        for mutate in (
+            lambda profile: setattr(profile, "xp", 10),
+            lambda profile: profile.progress.update({"intro": 1}),
+            lambda profile: setattr(profile.stats, "games_played", 1),
+        ):
+            store.update_profile("a", mutate)
+            versions.append(store.get_profile_version("a"))
+        assert versions == sorted(set(versions))
+        assert store.get_profile_version("b") not in versions
+    finally:
+        store.events.close()
+        store.changes.close()
+        store.questions.close()
+
+
+def test_if_none_match_uses_weak_comparison_over_a_list() -> None:
+    assert etag_matches('"x", W/"abc.3"', 'W/"abc.3"')
+    assert etag_matches("*", 'W/"abc.3"')
+    assert not etag_matches('W/"abc.2"', 'W/"abc.3"')
+    assert not etag_matches(None, 'W/"abc.3"')
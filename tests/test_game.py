@@ -0,0 +1,49 @@
+from typing import Iterator, Optional
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.game_service import GameService
+from app.storage.memory import GameSessionRecord, MemoryStore, PlayerProfile
+
+
+@pytest.fixture
+def store() -> Iterator[MemoryStore]:
+    store = MemoryStore()
+    store.set_profile("p1", PlayerProfile(id="p1", display_name="p1"))
+    yield store
+    store.events.close()
+    store.changes.close()
+    store.questions.close()
+
+
+def test_finish_of_a_session_that_vanished_is_404(
+    store: MemoryStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = GameService(store)
+    session_id = service.start("p1", 1, 3).session_id
+    get_game_session = store.get_game_session
+
+    def get_then_drop(session_id: str) -> Optional[GameSessionRecord]:
+        # The session disappears between the lookup and the finish claim.
+        session = get_game_session(session_id)
+        store.game_sessions.pop(session_id)
+        return session
+
+    monkeypatch.setattr(store, "get_game_session", get_then_drop)
+    with pytest.raises(HTTPException) as raised:
+        service.finish(session_id)
+
+    assert raised.value.status_code == 404
+    assert store.get_profile("p1").xp == 0
+
+
+def test_second_finish_is_409(store: MemoryStore) -> None:
+    service = GameService(store)
+    session_id = service.start("p1", 1, 3).session_id
+    service.finish(session_id)
+
+    with pytest.raises(HTTPException) as raised:
+        service.finish(session_id)
+
+    assert raised.value.status_code == 409
@@ -0,0 +1,223 @@
+import base64
+import hashlib
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from app.core.google_auth import (
+    CachedKeyset,
+    GoogleIdTokenVerifier,
+    InvalidIdToken,
+    KeysetUnavailable,
+)
+
+CLIENT_ID = "client-123.apps.googleusercontent.com"
+NOW = 1_700_000_000.0
+SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+def _is_probable_prime(candidate: int, rng: random.Random) -> bool:
+    if candidate < 2:
+        return False
+    for small in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if candidate % small == 0:
+            return candidate == small
+    d, r = candidate - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for _ in range(24):
+        x = pow(rng.randrange(2, candidate - 1), d, candidate)
+        if x in (1, candidate - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, candidate)
+            if x == candidate - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _prime(bits: int, rng: random.Random) -> int:
+    while True:
+        candidate = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if _is_probable_prime(candidate, rng):
+            return candidate
+
+
+class RsaKey:
+    def __init__(self, seed: int, bits: int = 1024) -> None:
+        rng = random.Random(seed)
+        self.e = 65537
+        while True:
+            p, q = _prime(bits // 2, rng), _prime(bits // 2, rng)
+            phi = (p - 1) * (q - 1)
+            if p != q and phi % self.e:
+                break
+        self.n = p * q
+        self.d = pow(self.e, -1, phi)
+
+    def sign(self, message: bytes) -> bytes:
+        size = (self.n.bit_length() + 7) // 8
+        suffix = SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+        encoded = b"\x00\x01" + b"\xff" * (size - len(suffix) - 3) + b"\x00" + suffix
+        return pow(int.from_bytes(encoded, "big"), self.d, self.n).to_bytes(size, "big")
+
+    def jwk(self, kid: str) -> Dict[str, str]:
+        return {
+            "kty": "RSA",
+            "kid": kid,
+            "alg": "RS256",
+            "n": _b64(self.n.to_bytes((self.n.bit_length() + 7) // 8, "big")),
+            "e": _b64(self.e.to_bytes(3, "big")),
+        }
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _token(key: RsaKey, kid: str = "k1", **overrides: Any) -> str:
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "1234567890",
+        "email": "player@example.com",
+        "email_verified": True,
+        "iat": int(NOW),
+        "exp": int(NOW) + 3600,
+    }
+    claims.update(overrides)
+    header = _b64(json.dumps({"alg": "RS256", "kid": kid, "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signature = key.sign(f"{header}.{payload}".encode("ascii"))
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+@pytest.fixture(scope="module")
+def key() -> RsaKey:
+    return RsaKey(seed=28)
+
+
+@pytest.fixture
+def fetches() -> List[float]:
+    return []
+
+
+@pytest.fixture
+def verifier(key: RsaKey, fetches: List[float]) -> GoogleIdTokenVerifier:
+    def fetch() -> Dict[str, Any]:
+        fetches.append(NOW)
+        return {"keys": [key.jwk("k1")]}
+
+    keyset = CachedKeyset(fetch, clock=lambda: NOW)
+    return GoogleIdTokenVerifier(keyset, [CLIENT_ID], clock=lambda: NOW)
+
+
+def test_valid_token(key: RsaKey, verifier: GoogleIdTokenVerifier) -> None:
+    claims = verifier.verify(_token(key))
+    assert claims["sub"] == "1234567890"
+    assert claims["email"] == "player@example.com"
+
+
+def test_audience_list_is_accepted(key: RsaKey, verifier: GoogleIdTokenVerifier) -> None:
+    assert verifier.verify(_token(key, aud=["other", CLIENT_ID]))["aud"][1] == CLIENT_ID
+
+
+def test_bad_signature(key: RsaKey, verifier: GoogleIdTokenVerifier) -> None:
+    header, payload, signature = _token(key).split(".")
+    tampered = _b64(json.dumps({"sub": "someone-else"}).encode())
+    with pytest.raises(InvalidIdToken, match="Invalid signature"):
+        verifier.verify(f"{header}.{tampered}.{signature}")
+
+
+def test_signature_from_another_key(verifier: GoogleIdTokenVerifier) -> None:
+    with pytest.raises(InvalidIdToken, match="Invalid signature"):
+        verifier.verify(_token(RsaKey(seed=99)))
+
+
+def test_wrong_audience(key: RsaKey, verifier: GoogleIdTokenVerifier) -> None:
+    with pytest.raises(InvalidIdToken, match="Invalid audience"):
+        verifier.verify(_token(key, aud="someone-else.apps.googleusercontent.com"))
+
+
+def test_wrong_issuer(key: RsaKey, verifier: GoogleIdTokenVerifier) -> None:
+    with pytest.raises(InvalidIdToken, match="Invalid issuer"):
+        verifier.verify(_token(key, iss="https://evil.example.com"))
+
+
+def test_expired_token(key: RsaKey, verifier: GoogleIdTokenVerifier) -> None:
+    with pytest.raises(InvalidIdToken, match="Token expired"):
+        verifier.verify(_token(key, exp=int(NOW) - 3600))
+
+
+def test_unknown_kid(
+    key: RsaKey, verifier: GoogleIdTokenVerifier, fetches: List[float]
+) -> None:
+    with pytest.raises(InvalidIdToken, match="Unknown signing key"):
+        verifier.verify(_token(key, kid="rotated"))
+    # Junk kids do not refetch the keyset within the reload window.
+    for index in range(5):
+        with pytest.raises(InvalidIdToken, match="Unknown signing key"):
+            verifier.verify(_token(key, kid=f"junk-{index}"))
+    assert len(fetches) == 1
+
+
+def test_failed_fetch_is_not_retried_within_window(key: RsaKey) -> None:
+    now = [NOW]
+    attempts = []
+
+    def fetch() -> Dict[str, Any]:
+        attempts.append(now[0])
+        raise OSError("unreachable")
+
+    keyset = CachedKeyset(fetch, min_reload_seconds=60, clock=lambda: now[0])
+    with pytest.raises(KeysetUnavailable):
+        keyset.get("k1")
+    with pytest.raises(KeysetUnavailable):
+        keyset.get("k1")
+    assert len(attempts) == 1
+    now[0] += 61
+    with pytest.raises(KeysetUnavailable):
+        keyset.get("k1")
+    assert len(attempts) == 2
+
+
+def test_rotated_key_is_picked_up_after_window(key: RsaKey) -> None:
+    now = [NOW]
+    rotated = RsaKey(seed=7)
+    documents = [{"keys": [key.jwk("k1")]}]
+
+    keyset = CachedKeyset(lambda: documents[-1], min_reload_seconds=60, clock=lambda: now[0])
+    verifier = GoogleIdTokenVerifier(keyset, [CLIENT_ID], clock=lambda: now[0])
+    verifier.verify(_token(key))
+    documents.append({"keys": [key.jwk("k1"), rotated.jwk("k2")]})
+    with pytest.raises(InvalidIdToken, match="Unknown signing key"):
+        verifier.verify(_token(rotated, kid="k2"))
+    now[0] += 61
+    assert verifier.verify(_token(rotated, kid="k2"))["sub"] == "1234567890"
+
+
+def test_unknown_kid_with_failing_reload_is_invalid_not_unavailable(key: RsaKey) -> None:
+    now = [NOW]
+    attempts = []
+
+    def fetch() -> Dict[str, Any]:
+        attempts.append(now[0])
+        if len(attempts) > 1:
+            raise OSError("unreachable")
+        return {"keys": [key.jwk("k1")]}
+
+    keyset = CachedKeyset(fetch, min_reload_seconds=60, clock=lambda: now[0])
+    verifier = GoogleIdTokenVerifier(keyset, [CLIENT_ID], clock=lambda: now[0])
+    verifier.verify(_token(key))
+    now[0] += 61
+    for index in range(3):
+        with pytest.raises(InvalidIdToken, match="Unknown signing key"):
+            verifier.verify(_token(key, kid=f"forged-{index}"))
+    assert len(attempts) == 2
+    # The keys loaded before the outage keep verifying known kids.
+    assert verifier.verify(_token(key))["sub"] == "1234567890"
@@ -0,0 +1,115 @@
+from fractions import Fraction
+
+import pytest
+
+from app.core.grading import (
+    MAX_ANSWER_LENGTH,
+    FormulaError,
+    compile_grader,
+    evaluate_formula,
+    parse_number,
+)
+
+
+@pytest.mark.parametrize(
+    "answer",
+    ["5", "5.0", "5.00", "05", "+5", " 5 ", "\t5\n", "5,0", "10/2", "10.0/2"],
+)
+def test_integer_answer_accepts_equivalent_forms(answer: str) -> None:
+    assert compile_grader("5").grade(answer)
+
+
+@pytest.mark.parametrize(
+    "answer",
+    ["1e1", "5e0", ".5", "5.", "5/0", "", "five", "5 5", "0x5", "5..0", "--5", "6", "-5", "½"],
+)
+def test_integer_answer_rejects_other_forms(answer: str) -> None:
+    assert not compile_grader("5").grade(answer)
+
+
+@pytest.mark.parametrize(
+    ("expected", "answer", "correct"),
+    [
+        ("0.5", "1/2", True),
+        ("0.5", "2/4", True),
+        ("0.5", "0,5", True),
+        ("0.5", "0.50", True),
+        ("0.5", ".5", False),
+        ("1/3", "2/6", True),
+        ("1/3", "0.333", False),
+        ("-2.5", "-5/2", True),
+        ("-2.5", "2.5", False),
+        ("-2.5", "- 2.5", False),
+        ("-7", "-7", True),
+        ("-7", "-07.0", True),
+        ("-7", "+7", False),
+    ],
+)
+def test_fraction_decimal_and_sign_answers(expected: str, answer: str, correct: bool) -> None:
+    assert compile_grader(expected).grade(answer) is correct
+
+
+@pytest.mark.parametrize(
+    ("answer", "correct"),
+    [("3.14", True), ("3.1516", True), ("3.1316", True), ("22/7", True), ("3.16", False)],
+)
+def test_tolerance_is_exact_about_its_bounds(answer: str, correct: bool) -> None:
+    grader = compile_grader("3.1416", tolerance=0.01)
+    assert grader.grade(answer) is correct
+
+
+@pytest.mark.parametrize(
+    ("formula", "answer"),
+    [("6 * 7", "42"), ("1 / 3 + 1 / 6", "1/2"), ("2 ^ 10", "1024"), ("-(3 - 5)", "2")],
+)
+def test_formula_overrides_the_stored_answer(formula: str, answer: str) -> None:
+    assert compile_grader("wrong", formula=formula).grade(answer)
+
+
+def test_invalid_formula_falls_back_to_the_stored_answer() -> None:
+    grader = compile_grader("12", formula="__import__('os')")
+    assert grader.grade("12")
+    assert not grader.grade("0")
+
+
+@pytest.mark.parametrize(
+    ("expected", "answer", "correct"),
+    [("Paris", " paris ", True), ("Paris", "PARIS", True), ("Paris", "Lyon", False)],
+)
+def test_text_answers_match_case_insensitively(expected: str, answer: str, correct: bool) -> None:
+    assert compile_grader(expected).grade(answer) is correct
+
+
+def test_overlong_answers_are_rejected_without_parsing() -> None:
+    assert parse_number("1" * (MAX_ANSWER_LENGTH + 1)) is None
+    assert not compile_grader("5").grade("0" * MAX_ANSWER_LENGTH + "5")
+
+
+@pytest.mark.parametrize(
+    ("formula", "value"),
+    [("1 + 2 * 3", Fraction(7)), ("0.1 + 0.2", Fraction(3, 10)), ("(-2) ** -2", Fraction(1, 4))],
+)
+def test_formulas_evaluate_exactly(formula: str, value: Fraction) -> None:
+    assert evaluate_formula(formula) == value
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        "__import__('os')",
+        "x + 1",
+        "1 // 2",
+        "1 / 0",
+        "2 ** 0.5",
+        "2 ** 65",
+        "9 ** 9 ** 9",
+        "True + 1",
+        "'1' + '2'",
+        "1 +",
+        "+".join(["1"] * 40),
+        "1" * 300,
+    ],
+)
+def test_unsafe_or_oversized_formulas_are_rejected(formula: str) -> None:
+    with pytest.raises(FormulaError):
+        evaluate_formula(formula)
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.progress_service import ProgressService
+from app.storage.memory import MemoryStore, PlayerProfile
+from app.storage.progress import MAX_LESSON_KEY_LENGTH, LessonCatalog, ProgressVector
+
+
+def test_full_catalog_keeps_new_keys_per_vector() -> None:
+    catalog = LessonCatalog(max_lessons=2)
+    first = ProgressVector({"a": 1, "b": 2}, catalog)
+    second = ProgressVector({"c": 3}, catalog)
+
+    assert len(catalog) == 2
+    assert second.to_dict() == {"c": 3}
+    assert second.get("c") == 3
+    assert first.get("c") is None
+
+    assert first.update({"c": 4, "a": 1}) == {"c": 4}
+    assert first.update({"c": 4}) == {}
+    assert first.version == 2
+    assert first.to_dict() == {"a": 1, "b": 2, "c": 4}
+    assert len(first) == 3
+    assert second.to_dict() == {"c": 3}
+
+
+def test_bind_moves_overflow_keys_into_a_roomier_catalog() -> None:
+    vector = ProgressVector({"a": 1, "b": 2, "c": 3}, LessonCatalog(max_lessons=1))
+    roomy = LessonCatalog()
+    vector.bind(roomy)
+
+    assert vector.to_dict() == {"a": 1, "b": 2, "c": 3}
+    assert len(roomy) == 3
+
+
+def test_invalid_keys_are_rejected_without_touching_the_catalog() -> None:
+    catalog = LessonCatalog()
+    vector = ProgressVector({"a": 1}, catalog)
+    with pytest.raises(ValueError):
+        vector.update({"b": 2, "x" * (MAX_LESSON_KEY_LENGTH + 1): 3})
+    with pytest.raises(ValueError):
+        vector.update({"": 1})
+
+    assert len(catalog) == 1
+    assert vector.to_dict() == {"a": 1}
+
+
+def test_progress_updates_keep_working_once_the_store_catalog_is_full() -> None:
+    store = MemoryStore(max_lessons=10)
+    service = ProgressService(store)
+    for index in range(3):
+        store.set_profile(f"user-{index}", PlayerProfile(id=f"user-{index}"))
+    try:
+        service.update("user-0", 0, {f"lesson-{index}": index for index in range(10)})
+        assert len(store.lessons) == 10
+
+        for user_id in ("user-1", "user-2"):
+            result = service.update(user_id, 5, {f"{user_id}-only": 7, "lesson-3": 1})
+            assert result.progress == {"lesson-3": 1, f"{user_id}-only": 7}
+            assert result.xp == 5
+        assert len(store.lessons) == 10
+        assert service.get("user-0").progress == {f"lesson-{i}": i for i in range(10)}
+
+        with pytest.raises(HTTPException) as error:
+            service.update("user-1", 0, {"": 1})
+        assert error.value.status_code == 400
+    finally:
+        store.events.close()
+        store.changes.close()
+        store.questions.close()
@@ -0,0 +1,34 @@
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.leaderboard_service import (
+    LeaderboardBroadcaster,
+    Subscription,
+    get_leaderboard_broadcaster,
+)
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+def test_failed_send_ends_the_connection(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def failing(self: Any, subscription: Subscription) -> AsyncIterator[Optional[str]]:
+        yield "first"
+        raise RuntimeError("send failed")
+
+    monkeypatch.setattr(LeaderboardBroadcaster, "messages", failing)
+    # Without the fix the route keeps reading frames and the client hangs.
+    with pytest.raises(RuntimeError, match="send failed"):
+        with client.websocket_connect("/ranking/ws") as socket:
+            assert socket.receive_text() == "first"
+            socket.receive()
+
+    assert not get_leaderboard_broadcaster()._subscribers
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Callable, List
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.schemas import UserCreateIn
+from app.services.game_service import GameService
+from app.services.user_service import UserService
+from app.storage.memory import MemoryStore, PlayerProfile, UserRecord
+
+THREADS = 8
+UPDATES = 300
+
+
+def _run_threads(count: int, target: Callable[[int], None]) -> None:
+    barrier = threading.Barrier(count)
+    errors: List[BaseException] = []
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            target(index)
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+
+def _bump_xp(profile: PlayerProfile) -> int:
+    # Yield between the read and the write so an unguarded update would
+    # lose increments.
+    xp = profile.xp
+    time.sleep(0)
+    profile.xp = xp + 1
+    return profile.xp
+
+
+def _bump_hash(record: UserRecord) -> str:
+    count = int(record.password_hash or "0")
+    time.sleep(0)
+    record.password_hash = str(count + 1)
+    return record.password_hash
+
+
+@pytest.mark.parametrize("shards", [1, 16])
+def test_update_profile_shared_key_loses_nothing(shards: int) -> None:
+    store = MemoryStore(shards=shards)
+    store.set_profile("shared", PlayerProfile(id="shared"))
+    start_version = store.get_profile_version("shared")
+
+    def work(_: int) -> None:
+        for _ in range(UPDATES):
+            store.update_profile("shared", _bump_xp)
+
+    _run_threads(THREADS, work)
+
+    assert store.get_profile("shared").xp == THREADS * UPDATES
+    assert store.get_profile_version("shared") == start_version + THREADS * UPDATES
+
+
+@pytest.mark.parametrize("shards", [1, 16])
+def test_update_profile_across_shards(shards: int) -> None:
+    store = MemoryStore(shards=shards)
+    user_ids = [f"user-{index}" for index in range(64)]
+    for user_id in user_ids:
+        store.set_profile(user_id, PlayerProfile(id=user_id))
+
+    def work(index: int) -> None:
+        for step in range(UPDATES):
+            store.update_profile(user_ids[(index + step) % len(user_ids)], _bump_xp)
+
+    _run_threads(THREADS, work)
+
+    assert sum(store.get_profile(user_id).xp for user_id in user_ids) == THREADS * UPDATES
+
+
+@pytest.mark.parametrize("shards", [1, 16])
+def test_update_user_across_shards(shards: int) -> None:
+    store = MemoryStore(shards=shards)
+    emails = [f"player{index}@example.com" for index in range(16)]
+    for email in emails:
+        store.add_user(email, UserRecord(id=email, provider="password"))
+
+    def work(index: int) -> None:
+        for step in range(UPDATES):
+            store.update_user(emails[(index * 7 + step) % len(emails)], _bump_hash)
+
+    _run_threads(THREADS, work)
+
+    total = sum(int(store.get_user(email).password_hash or "0") for email in emails)
+    assert total == THREADS * UPDATES
+
+
+def test_session_finishes_once_under_contention() -> None:
+    store = MemoryStore()
+    users = UserService(store)
+    game = GameService(store)
+    users.create_profile("player", UserCreateIn())
+    rounds = 20
+    try:
+        for _ in range(rounds):
+            session = game.start("player", 1, 4)
+            outcomes: List[str] = []
+
+            def work(_: int) -> None:
+                try:
+                    game.finish(session.session_id)
+                    outcomes.append("ok")
+                except HTTPException as error:
+                    outcomes.append(str(error.status_code))
+
+            _run_threads(THREADS, work)
+            assert outcomes.count("ok") == 1
+            assert outcomes.count("409") == THREADS - 1
+        assert users.get_stats("player").games_played == rounds
+    finally:
+        store.events.close()
+        store.changes.close()
@@ -0,0 +1,67 @@
+import json
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.core import tracing
+from app.core.tracing import FileExporter, Trace, Tracer
+
+
+class _Collector:
+    def __init__(self) -> None:
+        self.traces: List[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+
+def _trace() -> Trace:
+    collector = _Collector()
+    with Tracer(1.0, collector).trace("GET /health"):
+        pass
+    return collector.traces[0]
+
+
+def test_file_exporter_writes_every_trace_by_close(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    exporter = FileExporter(str(path))
+    traces = [_trace() for _ in range(300)]
+    for trace in traces:
+        exporter.export(trace)
+    exporter.close()
+
+    documents = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    trace_ids = [
+        document["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"]
+        for document in documents
+    ]
+    assert trace_ids == [trace.trace_id for trace in traces]
+    assert exporter.dropped == 0
+
+
+def test_file_exporter_drops_instead_of_blocking_on_a_stalled_writer(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(tracing, "EXPORT_BATCH_SIZE", 1)
+    flushing, release = threading.Event(), threading.Event()
+    flushed: List[int] = []
+
+    def stalled_flush(self: FileExporter, batch: List[Trace]) -> None:
+        flushing.set()
+        release.wait(5)
+        flushed.append(len(batch))
+
+    monkeypatch.setattr(FileExporter, "_flush", stalled_flush)
+    exporter = FileExporter(str(tmp_path / "traces.jsonl"), max_pending=2)
+    exporter.export(_trace())
+    assert flushing.wait(5)
+
+    for _ in range(5):
+        exporter.export(_trace())
+    assert exporter.dropped == 3
+
+    release.set()
+    exporter.close()
+    assert sum(flushed) == 3
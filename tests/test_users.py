@@ -0,0 +1,66 @@
+from typing import Iterable, Iterator, List
+
+import pytest
+
+from app.models.schemas import UserBatchUpdateItemIn, UserUpdateIn
+from app.services.user_service import UserService
+from app.storage.memory import MemoryStore, PlayerProfile, RankingEntry
+
+
+@pytest.fixture
+def store() -> Iterator[MemoryStore]:
+    store = MemoryStore()
+    for user_id in ("ranked-1", "ranked-2", "unranked"):
+        store.set_profile(user_id, PlayerProfile(id=user_id, display_name=user_id))
+    for user_id in ("ranked-1", "ranked-2"):
+        store.set_ranking_entry(
+            RankingEntry(user_id=user_id, display_name=user_id, xp=0, level=1, updated_at="t0")
+        )
+    yield store
+    store.events.close()
+    store.changes.close()
+    store.questions.close()
+
+
+def test_single_update_refreshes_the_ranking_entry(store: MemoryStore) -> None:
+    UserService(store).update_profile("ranked-1", UserUpdateIn(display_name="Ada", xp=250))
+
+    entry = store.get_ranking_entry("ranked-1")
+    assert (entry.display_name, entry.xp) == ("Ada", 250)
+    assert entry.updated_at != "t0"
+
+
+def test_batch_update_matches_single_update_and_syncs_once(
+    store: MemoryStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: List[List[str]] = []
+    sync = store.sync_ranking_entries
+
+    def counting_sync(user_ids: Iterable[str], updated_at: str, create: bool = True) -> int:
+        calls.append(list(user_ids))
+        return sync(calls[-1], updated_at, create)
+
+    monkeypatch.setattr(store, "sync_ranking_entries", counting_sync)
+    result = UserService(store).batch_update(
+        [
+            UserBatchUpdateItemIn(user_id="ranked-1", display_name="Ada"),
+            UserBatchUpdateItemIn(user_id="ranked-2", xp=400),
+            UserBatchUpdateItemIn(user_id="ranked-1", xp=90),
+            UserBatchUpdateItemIn(user_id="unranked", xp=10),
+            UserBatchUpdateItemIn(user_id="missing", xp=10),
+        ]
+    )
+
+    assert [error.user_id for error in result.errors] == ["missing"]
+    assert calls == [["ranked-1", "ranked-2", "unranked"]]
+    first, second = store.get_ranking_entry("ranked-1"), store.get_ranking_entry("ranked-2")
+    assert (first.display_name, first.xp) == ("Ada", 90)
+    assert second.xp == 400
+    assert first.updated_at == second.updated_at
+    assert store.get_ranking_entry("unranked") is None
+
+
+def test_unchanged_entries_are_not_rewritten(store: MemoryStore) -> None:
+    UserService(store).update_profile("ranked-1", UserUpdateIn(language="fr"))
+
+    assert store.get_ranking_entry("ranked-1").updated_at == "t0"